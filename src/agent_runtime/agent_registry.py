@@ -0,0 +1,217 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from fastapi import Depends, Request
+
+from agent_runtime.azure_clients import get_project_client
+
+if TYPE_CHECKING:
+    from azure.ai.agents.models import Agent
+    from semantic_kernel.agents import AzureAIAgent
+
+# Process-wide registry of Azure AI agents.
+# Agents are long-lived service resources: creating one per conversation (and getting it
+# again on every turn) costs control-plane round trips and leaks agents that are never
+# deleted. The registry keeps one definition per agent profile, identified by a hash of
+# its name, model, instructions, sampling and tools that is stored in the agent's
+# metadata. A profile is looked up among the existing agents once per process, so
+# restarts reuse the agents created before, and created only when none matches.
+# Built AzureAIAgent wrappers are kept by agent id and plugin set; per-conversation
+# state lives in the threads only.
+
+# Metadata key holding the profile hash of an agent created by the registry
+PROFILE_METADATA_KEY = "profile_hash"
+
+
+@dataclass(frozen=True)
+class AgentProfile:
+    name: str
+    description: str
+    instructions: str
+    # Model deployment, AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME by default
+    model: Optional[str] = None
+    temperature: float = 0.1
+    top_p: float = 0.1
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return self.model or os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME")
+
+
+def _as_dict(value: Any) -> Any:
+    # azure-ai-agents models are mappings, SK and plain objects are serialized as they are
+    if isinstance(value, list):
+        return [_as_dict(item) for item in value]
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    return value
+
+
+def profile_hash(profile: AgentProfile, tools: Optional[List[Any]] = None, tool_resources: Optional[Any] = None) -> str:
+    """
+    Hash identifying an agent definition, any change of the profile or its tools gives a new agent.
+
+    Args:
+        profile (AgentProfile): The agent profile
+        tools (Optional[List[Any]]): Tool definitions of the agent
+        tool_resources (Optional[Any]): Tool resources of the agent
+
+    Returns:
+        str: Hex digest of the profile
+    """
+    payload = {
+        **asdict(profile),
+        "model": profile.model_name,
+        "tools": _as_dict(tools or []),
+        "tool_resources": _as_dict(tool_resources),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+class AgentRegistry:
+    """
+    Agent definitions and AzureAIAgent wrappers shared by all requests of a server.
+    """
+
+    def __init__(self, client: Any):
+        """
+        Create an empty registry.
+
+        Args:
+            client (Any): The shared AIProjectClient
+        """
+        self.client = client
+        self.created = 0
+        self.reused = 0
+        self.fetched = 0
+        self._profiles: Dict[str, "Agent"] = {}
+        self._definitions: Dict[str, "Agent"] = {}
+        self._wrappers: Dict[Tuple[str, Tuple[int, ...]], "AzureAIAgent"] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def agent(
+        self,
+        profile: AgentProfile,
+        plugins: Optional[List[Any]] = None,
+        tools: Optional[List[Any]] = None,
+        tool_resources: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> "AzureAIAgent":
+        """
+        Return the agent of a profile, created on the service only if no matching agent exists.
+
+        Args:
+            profile (AgentProfile): The agent profile
+            plugins (Optional[List[Any]]): Kernel plugins of the agent, e.g. the pooled MCP plugins
+            tools (Optional[List[Any]]): Tool definitions stored in the agent definition
+            tool_resources (Optional[Any]): Tool resources stored in the agent definition
+            kwargs (Any): Passed on to create_agent, e.g. headers
+
+        Returns:
+            AzureAIAgent: The shared agent wrapper
+        """
+        key = profile_hash(profile, tools, tool_resources)
+        definition = self._profiles.get(key)
+        if definition is None:
+            definition = await self._single_flight(key, lambda: self._find_or_create(key, profile, tools, tool_resources, **kwargs))
+            self._profiles[key] = definition
+        return self._wrapper(definition, plugins)
+
+    async def agent_by_id(self, agent_id: str, plugins: Optional[List[Any]] = None) -> "AzureAIAgent":
+        """
+        Return an existing agent, its definition is fetched once per process.
+
+        Args:
+            agent_id (str): The agent id, e.g. sent back by a client for a follow-up turn
+            plugins (Optional[List[Any]]): Kernel plugins of the agent
+
+        Returns:
+            AzureAIAgent: The shared agent wrapper
+        """
+        definition = self._definitions.get(agent_id)
+        if definition is None:
+            definition = await self._single_flight(agent_id, lambda: self._fetch(agent_id))
+        return self._wrapper(definition, plugins)
+
+    async def _single_flight(self, key: str, load) -> "Agent":
+        # Concurrent first requests of the same agent share one control-plane call
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(load())
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, agent_id: str) -> "Agent":
+        definition = await self.client.agents.get_agent(agent_id=agent_id)
+        self._definitions[definition.id] = definition
+        self.fetched += 1
+        return definition
+
+    async def _find_or_create(
+        self,
+        key: str,
+        profile: AgentProfile,
+        tools: Optional[List[Any]],
+        tool_resources: Optional[Any],
+        **kwargs: Any,
+    ) -> "Agent":
+        async for existing in self.client.agents.list_agents():
+            if existing.name == profile.name and (existing.metadata or {}).get(PROFILE_METADATA_KEY) == key:
+                logging.info(f"Reusing agent {existing.id} for profile {profile.name}")
+                self._definitions[existing.id] = existing
+                self.reused += 1
+                return existing
+
+        definition = await self.client.agents.create_agent(
+            model=profile.model_name,
+            name=profile.name,
+            description=profile.description,
+            instructions=profile.instructions,
+            temperature=profile.temperature,
+            top_p=profile.top_p,
+            tools=tools,
+            tool_resources=tool_resources,
+            metadata={PROFILE_METADATA_KEY: key},
+            **kwargs,
+        )
+        logging.info(f"Created agent {definition.id} for profile {profile.name}")
+        self._definitions[definition.id] = definition
+        self.created += 1
+        return definition
+
+    def _wrapper(self, definition: "Agent", plugins: Optional[List[Any]]) -> "AzureAIAgent":
+        from semantic_kernel.agents import AzureAIAgent
+
+        # Pooled plugins are long-lived objects, so their identity selects the wrapper
+        key = (definition.id, tuple(id(plugin) for plugin in plugins or []))
+        agent = self._wrappers.get(key)
+        if agent is None:
+            agent = AzureAIAgent(client=self.client, definition=definition, plugins=plugins or None)
+            self._wrappers[key] = agent
+        return agent
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "profiles": len(self._profiles),
+            "definitions": len(self._definitions),
+            "wrappers": len(self._wrappers),
+            "created": self.created,
+            "reused": self.reused,
+            "fetched": self.fetched,
+        }
+
+
+def get_agent_registry(request: Request, client=Depends(get_project_client)) -> AgentRegistry:
+    """FastAPI dependency returning the agent registry of the app's shared project client."""
+    registry = getattr(request.app.state, "agent_registry", None)
+    if registry is None or registry.client is not client:
+        registry = request.app.state.agent_registry = AgentRegistry(client)
+    return registry
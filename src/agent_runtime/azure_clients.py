@@ -0,0 +1,210 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+
+from agent_runtime.settings import AgentRuntimeSettings, get_settings
+
+if TYPE_CHECKING:
+    from azure.ai.projects.aio import AIProjectClient
+    from azure.core.credentials import AccessToken
+
+# Long-lived Azure credential and AI Foundry project client.
+# Creating a DefaultAzureCredential and an AIProjectClient per request means a token
+# acquisition (an `az` call or an IMDS round trip) and a new TLS connection every time.
+# AzureClients creates both once, in the FastAPI lifespan, on top of one pooled aiohttp
+# session. Tokens are cached by RefreshingCredential and refreshed in the background
+# before they expire, so no request waits for a token once the first one is fetched.
+# Endpoints receive the client through the get_project_client dependency.
+
+# Scope used by the AI Foundry project and agents clients
+AI_FOUNDRY_SCOPE = "https://ai.azure.com/.default"
+
+# Delay before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = 30
+
+
+class RefreshingCredential:
+    """
+    Async token credential that caches the tokens of a wrapped credential per scope
+    and refreshes them in the background `refresh_margin` seconds before they expire.
+    """
+
+    def __init__(self, credential: Any, refresh_margin: float = 300):
+        """
+        Wrap a credential.
+
+        Args:
+            credential (Any): Async credential, e.g. azure.identity.aio.DefaultAzureCredential
+            refresh_margin (float): Seconds before expiry at which a token is refreshed
+        """
+        self.credential = credential
+        self.refresh_margin = refresh_margin
+        self.acquired = 0
+        self.refresh_errors = 0
+        self._tokens: Dict[Tuple[str, ...], "AccessToken"] = {}
+        self._pending: Dict[Tuple[str, ...], asyncio.Task] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> "AccessToken":
+        # Claims challenges and tenant overrides need a fresh token from the wrapped credential
+        if kwargs.get("claims") or kwargs.get("tenant_id"):
+            return await self.credential.get_token(*scopes, **kwargs)
+        key = tuple(scopes)
+        token = self._tokens.get(key)
+        if token is not None and token.expires_on - time.time() > self.refresh_margin:
+            return token
+        if token is not None and token.expires_on > time.time():
+            # Still valid: serve it and let the refresher renew it
+            self._wake.set()
+            return token
+        return await self._acquire(key)
+
+    async def _acquire(self, key: Tuple[str, ...]) -> "AccessToken":
+        # Concurrent callers of the same scopes share one token request, a cancelled caller does not cancel it
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(key))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, key: Tuple[str, ...]) -> "AccessToken":
+        token = await self.credential.get_token(*key)
+        self._tokens[key] = token
+        self.acquired += 1
+        return token
+
+    def start(self, *scopes: str) -> None:
+        """
+        Start the background refresh, fetching a token for the scopes right away.
+
+        Args:
+            scopes (str): Scopes to fetch before the first request asks for them
+        """
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop(tuple(scopes)))
+
+    async def _refresh_loop(self, initial: Tuple[str, ...]) -> None:
+        keys: Set[Tuple[str, ...]] = {initial} if initial else set()
+        while True:
+            keys.update(self._tokens)
+            delay = None
+            for key in keys:
+                token = self._tokens.get(key)
+                if token is None or token.expires_on - time.time() <= self.refresh_margin:
+                    try:
+                        token = await self._acquire(key)
+                    except Exception as e:
+                        self.refresh_errors += 1
+                        logging.error(f"Error refreshing the Azure access token for {key}: {str(e)}")
+                        delay = REFRESH_RETRY_SECONDS if delay is None else min(delay, REFRESH_RETRY_SECONDS)
+                        continue
+                wait = max(token.expires_on - time.time() - self.refresh_margin, 1.0)
+                delay = wait if delay is None else min(delay, wait)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "acquired": self.acquired,
+            "refresh_errors": self.refresh_errors,
+            "expires_in_seconds": {" ".join(key): token.expires_on - now for key, token in self._tokens.items()},
+        }
+
+    async def close(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        await self.credential.close()
+
+    async def __aenter__(self) -> "RefreshingCredential":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+class AzureClients:
+    """
+    The credential and AI Foundry project client shared by all requests of a server.
+    """
+
+    def __init__(self, settings: Optional[AgentRuntimeSettings] = None):
+        """
+        Prepare the clients, nothing is created before start().
+
+        Args:
+            settings (Optional[AgentRuntimeSettings]): Settings to use, the cached settings by default
+        """
+        self.settings = settings or get_settings()
+        self.credential: Optional[RefreshingCredential] = None
+        self.client: Optional["AIProjectClient"] = None
+        self._session = None
+        self.error: Optional[str] = None
+
+    async def start(self) -> "AzureClients":
+        """Create the credential, the pooled HTTP session and the project client, and start refreshing tokens."""
+        import aiohttp
+        from azure.core.pipeline.transport import AioHttpTransport
+        from azure.identity.aio import DefaultAzureCredential
+        from semantic_kernel.agents import AzureAIAgent
+
+        self.credential = RefreshingCredential(DefaultAzureCredential(), self.settings.token_refresh_margin_seconds)
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.settings.http_pool_size))
+        try:
+            self.client = AzureAIAgent.create_client(
+                credential=self.credential,
+                transport=AioHttpTransport(session=self._session, session_owner=False),
+            )
+        except Exception as e:
+            # Keep serving what does not need Azure, such as FAQ hits; agent endpoints answer 503
+            self.error = str(e)
+            logging.error(f"Error creating the Azure AI project client: {str(e)}")
+            await self.close()
+            return self
+        # The first token is fetched in the background, startup does not wait for it
+        self.credential.start(AI_FOUNDRY_SCOPE)
+        logging.info(f"Created the shared Azure AI project client with {self.settings.http_pool_size} pooled connections")
+        return self
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "started": self.client is not None,
+            "error": self.error,
+            "pool_size": self.settings.http_pool_size,
+            "credential": self.credential.stats() if self.credential is not None else None,
+        }
+
+    async def close(self) -> None:
+        """Close the client, the HTTP session and the credential."""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.credential is not None:
+            await self.credential.close()
+            self.credential = None
+
+
+def get_project_client(request: Request) -> "AIProjectClient":
+    """FastAPI dependency returning the project client created in the app's lifespan."""
+    client = request.app.state.azure_clients.client
+    if client is None:
+        raise HTTPException(status_code=503, detail="Azure AI project client is not available")
+    return client
@@ -0,0 +1,225 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import anyio
+from fastapi import Request
+from semantic_kernel.connectors.mcp import MCPStreamableHttpPlugin
+
+from agent_runtime.settings import AgentRuntimeSettings, get_settings
+
+# Long-lived MCP plugin sessions shared by all requests.
+# Opening an MCPStreamableHttpPlugin per request costs an MCP handshake and a tool
+# listing per server. The pool connects to every server once at startup and keeps the
+# sessions open; an MCP session multiplexes concurrent calls, so requests borrow the
+# same connected plugins. Each server has a supervisor task that pings the session every
+# `health_interval` seconds and reconnects with backoff when the ping or a tool call
+# fails. The tool schemas are listed on the first connection only and reused on
+# reconnect. The MCP transport runs in anyio task groups, which must be entered and
+# left by the same task and nest with every other cancel scope, so only the supervisor
+# connects and closes its plugin, and connect() is bounded by the plugin's HTTP timeout
+# rather than wrapped in wait_for (another task) or fail_after (a scope it outlives).
+
+
+@dataclass(frozen=True)
+class MCPServer:
+    name: str
+    description: str
+    url: str
+
+
+# MCP servers started by the launcher
+MCP_SERVERS = [
+    MCPServer("Weather", "Get current weather information", "http://localhost:8086/mcp"),
+    MCPServer("GetSystemLocalTime", "System local time plugin for retrieving current system time", "http://localhost:8087/mcp"),
+    MCPServer("SystemLogRepository", "System log repository for monitoring and debugging", "http://localhost:8089/mcp"),
+]
+
+
+class PooledMCPPlugin(MCPStreamableHttpPlugin):
+    """
+    MCPStreamableHttpPlugin that lists tools and prompts once and keeps them across reconnects,
+    and reports failed tool calls so the pool checks the session right away.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.tools_loaded = False
+        self.prompts_loaded = False
+        self.on_error = None
+
+    async def load_tools(self):
+        if self.tools_loaded:
+            return
+        await super().load_tools()
+        # The listing errors are swallowed by the base class, only stop listing once tools were found
+        self.tools_loaded = any(hasattr(value, "__kernel_function__") for value in vars(self).values())
+
+    async def load_prompts(self):
+        if self.prompts_loaded:
+            return
+        await super().load_prompts()
+        self.prompts_loaded = True
+
+    async def call_tool(self, tool_name: str, **kwargs: Any):
+        try:
+            return await super().call_tool(tool_name, **kwargs)
+        except Exception:
+            if self.on_error is not None:
+                self.on_error()
+            raise
+
+
+class _PooledServer:
+    def __init__(self, server: MCPServer, timeout: float):
+        self.server = server
+        self.plugin = PooledMCPPlugin(name=server.name, description=server.description, url=server.url, timeout=timeout)
+        self.plugin.on_error = self.check
+        self.connected = False
+        self.attempted = asyncio.Event()
+        self.wake = asyncio.Event()
+        self.connects = 0
+        self.failures = 0
+        self.last_ok: Optional[float] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def check(self) -> None:
+        """Run the health check now instead of waiting for the next interval."""
+        self.wake.set()
+
+
+class MCPSessionPool:
+    """
+    Connected MCP plugins, kept alive by health checks and automatic reconnects.
+    """
+
+    def __init__(self, servers: Sequence[MCPServer] = MCP_SERVERS, settings: Optional[AgentRuntimeSettings] = None):
+        """
+        Prepare the pool, nothing connects before start().
+
+        Args:
+            servers (Sequence[MCPServer]): The MCP servers to connect to
+            settings (Optional[AgentRuntimeSettings]): Settings to use, the cached settings by default
+        """
+        self.settings = settings or get_settings()
+        self._servers = [_PooledServer(server, self.settings.mcp_connect_timeout_seconds) for server in servers]
+        self._closing = False
+
+    def start(self) -> "MCPSessionPool":
+        """Start one supervisor task per server, connecting in the background."""
+        for entry in self._servers:
+            if entry.task is None:
+                entry.task = asyncio.create_task(self._supervise(entry))
+        return self
+
+    async def plugins(self) -> List[MCPStreamableHttpPlugin]:
+        """
+        Borrow the connected plugins.
+        Right after startup this waits, at most the connect timeout, for the first connection
+        attempts; servers that are down are left out instead of failing the request.
+
+        Returns:
+            List[MCPStreamableHttpPlugin]: The plugins whose session is up, in server order
+        """
+        pending = [entry.attempted.wait() for entry in self._servers if not entry.attempted.is_set()]
+        if pending:
+            try:
+                await asyncio.wait_for(asyncio.gather(*pending), timeout=self.settings.mcp_connect_timeout_seconds)
+            except asyncio.TimeoutError:
+                pass
+        plugins = []
+        for entry in self._servers:
+            if entry.connected:
+                plugins.append(entry.plugin)
+            else:
+                logging.warning(f"MCP server {entry.server.name} at {entry.server.url} is not connected: {entry.error}")
+        return plugins
+
+    async def _supervise(self, entry: _PooledServer) -> None:
+        plugin = entry.plugin
+        delay = 1.0
+        while True:
+            try:
+                await plugin.connect()
+                entry.connected = True
+                entry.connects += 1
+                entry.error = None
+                entry.last_ok = time.time()
+                entry.attempted.set()
+                delay = 1.0
+                logging.info(f"Connected to MCP server {entry.server.name} at {entry.server.url}")
+                while True:
+                    entry.wake.clear()
+                    try:
+                        await asyncio.wait_for(entry.wake.wait(), timeout=self.settings.mcp_health_interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    with anyio.fail_after(self.settings.mcp_connect_timeout_seconds):
+                        await plugin.session.send_ping()
+                    entry.last_ok = time.time()
+            except asyncio.CancelledError:
+                # A failing transport cancels its task group's host task, which is this one
+                if self._closing:
+                    await self._close_plugin(entry)
+                    raise
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            was_connected = entry.connected
+            entry.connected = False
+            entry.failures += 1
+            entry.attempted.set()
+            # The transport's own error surfaces when its task group is closed
+            cause = await self._close_plugin(entry)
+            entry.error = error or cause or "connection lost"
+            # Report the outage once, not every reconnect attempt
+            log = logging.error if was_connected or entry.connects == 0 and entry.failures == 1 else logging.debug
+            log(f"MCP server {entry.server.name} at {entry.server.url} failed, reconnecting in {delay:.0f}s: {entry.error}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.settings.mcp_reconnect_max_seconds)
+
+    async def _close_plugin(self, entry: _PooledServer) -> Optional[str]:
+        try:
+            await entry.plugin.close()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError) and self._closing:
+                raise
+            # Unwrap task group exception groups to the first underlying error
+            while getattr(e, "exceptions", None):
+                e = e.exceptions[0]
+            return str(e) or type(e).__name__
+        return None
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            entry.server.name: {
+                "url": entry.server.url,
+                "connected": entry.connected,
+                "connects": entry.connects,
+                "failures": entry.failures,
+                "seconds_since_ok": time.time() - entry.last_ok if entry.last_ok is not None else None,
+                "error": entry.error,
+            }
+            for entry in self._servers
+        }
+
+    async def close(self) -> None:
+        """Stop the supervisors, each one closes its own session."""
+        self._closing = True
+        tasks = [entry.task for entry in self._servers if entry.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for entry in self._servers:
+            entry.task = None
+            entry.connected = False
+
+
+def get_mcp_pool(request: Request) -> MCPSessionPool:
+    """FastAPI dependency returning the MCP session pool created in the app's lifespan."""
+    return request.app.state.mcp_pool
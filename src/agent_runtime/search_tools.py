@@ -0,0 +1,122 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, Request
+
+from agent_runtime.azure_clients import get_project_client
+from agent_runtime.settings import AgentRuntimeSettings, get_settings
+
+if TYPE_CHECKING:
+    from azure.ai.agents.models import AzureAISearchTool
+
+# Cached Azure AI Search connection discovery.
+# Finding the AI Search connection of the project pages through every connection, so it
+# is done once and the built AzureAISearchTool (definitions and resources) is kept for
+# `ttl_seconds`. Concurrent refreshes share one listing. When a refresh fails the last
+# known tool keeps being served, and callers invalidate() the cache when a run using the
+# tool fails, so the next request looks the connection up again.
+
+# Delay before a failed refresh is retried while the last known tool is served
+RETRY_SECONDS = 30
+
+
+class SearchToolCache:
+    """
+    AzureAISearchTool of the project's Azure AI Search connection, kept in a TTL cache.
+    """
+
+    def __init__(self, client: Any, index_name: Optional[str] = None, settings: Optional[AgentRuntimeSettings] = None):
+        """
+        Create an empty cache.
+
+        Args:
+            client (Any): The shared AIProjectClient
+            index_name (Optional[str]): Search index of the tool, AZURE_SEARCH_INDEX by default
+            settings (Optional[AgentRuntimeSettings]): Settings to use, the cached settings by default
+        """
+        self.client = client
+        self.index_name = index_name or os.getenv("AZURE_SEARCH_INDEX")
+        self.settings = settings or get_settings()
+        self.lookups = 0
+        self.failures = 0
+        self._tool: Optional["AzureAISearchTool"] = None
+        self._connection_id: Optional[str] = None
+        self._loaded_at = 0.0
+        self._pending: Optional[asyncio.Task] = None
+
+    async def tool(self) -> "AzureAISearchTool":
+        """
+        Return the AzureAISearchTool, looking the connection up when the cache is empty or expired.
+
+        Returns:
+            AzureAISearchTool: The tool, its definitions and resources are passed to the agent
+
+        Raises:
+            HTTPException: When no Azure AI Search connection exists and none was found before
+        """
+        if self._tool is not None and time.monotonic() - self._loaded_at < self.settings.search_connection_ttl_seconds:
+            return self._tool
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._refresh())
+            self._pending.add_done_callback(self._on_refresh_done)
+        try:
+            return await asyncio.shield(self._pending)
+        except Exception as e:
+            if self._tool is None:
+                raise HTTPException(status_code=500, detail=f"Azure AI Search connection not found: {str(e)}")
+            logging.error(f"Error refreshing the Azure AI Search connection, using {self._connection_id}: {str(e)}")
+            return self._tool
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._pending = None
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+            if self._tool is not None:
+                # Keep serving the last tool and retry the lookup a little later, not on every request
+                self._loaded_at = time.monotonic() - self.settings.search_connection_ttl_seconds + RETRY_SECONDS
+
+    async def _refresh(self) -> "AzureAISearchTool":
+        from azure.ai.agents.models import AzureAISearchTool
+        from azure.ai.projects.models import ConnectionType
+
+        self.lookups += 1
+        connection_id = None
+        async for connection in self.client.connections.list():
+            if connection.type == ConnectionType.AZURE_AI_SEARCH:
+                connection_id = connection.id
+                break
+        if not connection_id:
+            raise LookupError("the project has no Azure AI Search connection")
+
+        if connection_id != self._connection_id:
+            logging.info(f"Found Azure AI Search connection: {connection_id}, index {self.index_name}")
+        self._tool = AzureAISearchTool(index_connection_id=connection_id, index_name=self.index_name)
+        self._connection_id = connection_id
+        self._loaded_at = time.monotonic()
+        return self._tool
+
+    def invalidate(self) -> None:
+        """Look the connection up again on the next request, e.g. after a run using the tool failed."""
+        self._loaded_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connection_id": self._connection_id,
+            "index_name": self.index_name,
+            "age_seconds": time.monotonic() - self._loaded_at if self._tool is not None else None,
+            "lookups": self.lookups,
+            "failures": self.failures,
+        }
+
+
+def get_search_tools(request: Request, client=Depends(get_project_client)) -> SearchToolCache:
+    """FastAPI dependency returning the AI Search tool cache of the app's shared project client."""
+    cache = getattr(request.app.state, "search_tools", None)
+    if cache is None or cache.client is not client:
+        cache = request.app.state.search_tools = SearchToolCache(client)
+    return cache
@@ -0,0 +1,56 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Configuration of the long-lived Azure clients, MCP sessions and background queues shared by the backend servers.
+# Like memory.settings, nothing is read at import time: the environment is only
+# consulted on the first call to get_settings(), and the result is cached.
+
+
+@dataclass(frozen=True)
+class AgentRuntimeSettings:
+    # Connections kept open to the Azure AI Foundry project, shared by all requests
+    http_pool_size: int = 100
+    # Access tokens are refreshed in the background this long before they expire
+    token_refresh_margin_seconds: float = 300
+    # Pooled MCP plugin sessions: ping interval, connect/ping timeout and the longest reconnect backoff
+    mcp_health_interval_seconds: float = 30
+    mcp_connect_timeout_seconds: float = 10
+    mcp_reconnect_max_seconds: float = 30
+    # Azure AI Search connection discovery is cached this long
+    search_connection_ttl_seconds: float = 3600
+    # Write-behind queue of thread messages: queue bound, writes per batch and retries of a failed write
+    thread_write_queue_size: int = 1000
+    thread_write_batch_size: int = 20
+    thread_write_max_retries: int = 3
+
+    @classmethod
+    def from_env(cls) -> "AgentRuntimeSettings":
+        """Read the settings from environment variables."""
+        return cls(
+            http_pool_size=int(os.getenv("AZURE_HTTP_POOL_SIZE", "100")),
+            token_refresh_margin_seconds=float(os.getenv("AZURE_TOKEN_REFRESH_MARGIN_SECONDS", "300")),
+            mcp_health_interval_seconds=float(os.getenv("MCP_HEALTH_INTERVAL_SECONDS", "30")),
+            mcp_connect_timeout_seconds=float(os.getenv("MCP_CONNECT_TIMEOUT_SECONDS", "10")),
+            mcp_reconnect_max_seconds=float(os.getenv("MCP_RECONNECT_MAX_SECONDS", "30")),
+            search_connection_ttl_seconds=float(os.getenv("AZURE_SEARCH_CONNECTION_TTL_SECONDS", "3600")),
+            thread_write_queue_size=int(os.getenv("THREAD_WRITE_QUEUE_SIZE", "1000")),
+            thread_write_batch_size=int(os.getenv("THREAD_WRITE_BATCH_SIZE", "20")),
+            thread_write_max_retries=int(os.getenv("THREAD_WRITE_MAX_RETRIES", "3")),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> AgentRuntimeSettings:
+    """
+    Load the .env file and return the agent runtime settings, once per process.
+
+    Returns:
+        AgentRuntimeSettings: The cached settings
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()  # Load environment variables from .env file
+    return AgentRuntimeSettings.from_env()
@@ -0,0 +1,135 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import json
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+# Server-sent events for the streaming chat endpoints.
+# /chat waits for the whole agent run before answering; /chat/stream forwards the run as
+# it happens, built on the agent's invoke_stream:
+#   token        {"text"}               text delta of the answer
+#   code         {"text"}               code interpreter input delta
+#   tool_call    {"name", "arguments"}  a function or tool the agent called
+#   tool_result  {"name", "result"}     its result (truncated)
+#   done         {"response", "thread_id", "agent_id", "cached"}
+#   error        {"detail"}             the run failed after the stream started
+# Errors before the stream starts (no client, unknown agent) are still plain HTTP errors.
+
+# Longest tool result sent in a tool_result event
+MAX_TOOL_RESULT_CHARS = 500
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format one server-sent event.
+
+    Args:
+        event (str): The event name
+        data (Dict[str, Any]): The JSON payload
+
+    Returns:
+        str: The encoded event
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterable[str]) -> StreamingResponse:
+    """Stream events with the headers that keep proxies from buffering them."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def stream_cached_answer(answer: str, thread_id: Optional[str], agent_id: Optional[str]) -> AsyncIterator[str]:
+    """
+    Stream an FAQ cache hit: the whole answer is sent as the first token.
+
+    Args:
+        answer (str): The cached answer
+        thread_id (Optional[str]): Thread of the conversation
+        agent_id (Optional[str]): Agent of the conversation
+
+    Yields:
+        str: The token and done events
+    """
+    yield sse_event("token", {"text": answer})
+    yield sse_event("done", {"response": answer, "thread_id": thread_id, "agent_id": agent_id, "cached": True})
+
+
+def _tool_events(message: Any) -> Iterator[str]:
+    from semantic_kernel.contents.function_call_content import FunctionCallContent
+    from semantic_kernel.contents.function_result_content import FunctionResultContent
+
+    for item in message.items:
+        if isinstance(item, FunctionCallContent):
+            yield sse_event("tool_call", {"name": item.name, "arguments": item.arguments})
+        elif isinstance(item, FunctionResultContent):
+            yield sse_event("tool_result", {"name": item.name, "result": str(item.result)[:MAX_TOOL_RESULT_CHARS]})
+
+
+async def stream_agent_response(
+    agent: Any,
+    message: Any,
+    thread: Optional[Any] = None,
+    on_done: Optional[Callable[[str, str, bool], None]] = None,
+    on_error: Optional[Callable[[Exception], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    Run the agent with invoke_stream and forward tokens and tool progress as server-sent events.
+
+    Args:
+        agent (Any): The AzureAIAgent
+        message (Any): The user message
+        thread (Optional[Any]): The conversation thread, a new one is created when None
+        on_done (Optional[Callable[[str, str, bool], None]]): Called with the answer, the thread id and
+            whether the run called tools, once the run completed
+        on_error (Optional[Callable[[Exception], None]]): Called when the run failed
+
+    Yields:
+        str: The encoded events, ending with done or error
+    """
+    # Function calls and results arrive through on_intermediate_message, which invoke_stream
+    # awaits right before yielding the next chunk, so they are sent ahead of that chunk
+    intermediate = []
+    used_tools = False
+
+    async def on_intermediate_message(content: Any) -> None:
+        nonlocal used_tools
+        used_tools = True
+        intermediate.append(content)
+
+    answer = []
+    try:
+        async for response in agent.invoke_stream(messages=message, thread=thread, on_intermediate_message=on_intermediate_message):
+            thread = response.thread
+            while intermediate:
+                for event in _tool_events(intermediate.pop(0)):
+                    yield event
+            text = response.message.content
+            if not text:
+                continue
+            if response.message.metadata.get("code"):
+                used_tools = True
+                yield sse_event("code", {"text": text})
+            else:
+                answer.append(text)
+                yield sse_event("token", {"text": text})
+        for content in intermediate:
+            for event in _tool_events(content):
+                yield event
+    except Exception as e:
+        logging.error(f"Error streaming the agent response: {str(e)}")
+        if on_error is not None:
+            on_error(e)
+        yield sse_event("error", {"detail": str(e)})
+        return
+
+    response_text = "".join(answer)
+    thread_id = thread.id if thread is not None else None
+    if on_done is not None:
+        on_done(response_text, thread_id, used_tools)
+    yield sse_event("done", {"response": response_text, "thread_id": thread_id, "agent_id": str(agent.id), "cached": False})
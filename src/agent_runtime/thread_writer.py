@@ -0,0 +1,191 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+
+from agent_runtime.settings import AgentRuntimeSettings, get_settings
+
+# Write-behind queue of agent thread messages.
+# A question answered from the FAQ cache still belongs to the conversation, so it and its
+# answer are added to the agent thread; awaiting those writes would make every cache hit
+# pay two control-plane round trips. Requests submit() the messages and return, a worker
+# drains the queue in batches: the writes of different threads run concurrently, those of
+# one thread in order, and a failed message is retried with backoff before it is dropped.
+# A request about to run the agent on a thread first flush()es that thread, so the run
+# sees the cached exchange and never races one of its writes. The queue is bounded; when
+# it is full the messages are dropped rather than slowing down the requests.
+
+# First retry delay of a failed write, doubled on each further retry
+RETRY_DELAY_SECONDS = 0.5
+
+
+@dataclass
+class _ThreadWrite:
+    thread_id: str
+    messages: List[Any]
+    # Messages of the write already added to the thread, a retry resumes after them
+    written: int = 0
+
+
+class ThreadWriteQueue:
+    """
+    Background writer adding messages to agent threads, batched and retried.
+    """
+
+    def __init__(self, azure_clients: Any, settings: Optional[AgentRuntimeSettings] = None):
+        """
+        Create the queue, nothing is written before start().
+
+        Args:
+            azure_clients (Any): The AzureClients whose project client writes the messages
+            settings (Optional[AgentRuntimeSettings]): Settings to use, the cached settings by default
+        """
+        self.azure_clients = azure_clients
+        self.settings = settings or get_settings()
+        self.submitted = 0
+        self.written = 0
+        self.retries = 0
+        self.dropped = 0
+        self.batches = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.settings.thread_write_queue_size)
+        self._pending: Dict[str, int] = {}
+        self._idle: Dict[str, asyncio.Event] = {}
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> "ThreadWriteQueue":
+        """Start the background worker."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        return self
+
+    def submit(self, thread_id: str, messages: List[Any]) -> bool:
+        """
+        Queue messages to be added to a thread, without waiting for the write.
+
+        Args:
+            thread_id (str): The thread
+            messages (List[Any]): ChatMessageContent messages, added in order
+
+        Returns:
+            bool: False when the queue is full and the messages were dropped
+        """
+        try:
+            self._queue.put_nowait(_ThreadWrite(thread_id, list(messages)))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logging.error(f"Thread write queue is full, dropping {len(messages)} messages for thread {thread_id}")
+            return False
+        self.submitted += 1
+        self._pending[thread_id] = self._pending.get(thread_id, 0) + 1
+        self._idle.setdefault(thread_id, asyncio.Event()).clear()
+        return True
+
+    async def flush(self, thread_id: str, timeout: float = 10.0) -> None:
+        """
+        Wait until the queued writes of a thread are done, before the agent runs on it.
+
+        Args:
+            thread_id (str): The thread
+            timeout (float): Longest wait in seconds, the run goes ahead afterwards
+        """
+        idle = self._idle.get(thread_id)
+        if idle is None:
+            return
+        try:
+            await asyncio.wait_for(idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Queued writes of thread {thread_id} are still pending after {timeout}s")
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.settings.thread_write_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            by_thread: Dict[str, List[_ThreadWrite]] = {}
+            for write in batch:
+                by_thread.setdefault(write.thread_id, []).append(write)
+            await asyncio.gather(*(self._write_thread(writes) for writes in by_thread.values()))
+            self.batches += 1
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _write_thread(self, writes: List[_ThreadWrite]) -> None:
+        for write in writes:
+            try:
+                await self._write(write)
+            except Exception as e:
+                self.dropped += 1
+                logging.error(f"Error adding {len(write.messages) - write.written} messages to thread {write.thread_id}, dropping them: {str(e)}")
+            finally:
+                self._done(write.thread_id)
+
+    async def _write(self, write: _ThreadWrite) -> None:
+        from semantic_kernel.agents import AzureAIAgentThread
+
+        attempt = 0
+        while True:
+            try:
+                client = self.azure_clients.client
+                if client is None:
+                    raise RuntimeError("Azure AI project client is not available")
+                thread = AzureAIAgentThread(client=client, thread_id=write.thread_id)
+                while write.written < len(write.messages):
+                    await thread.on_new_message(write.messages[write.written])
+                    write.written += 1
+                self.written += 1
+                return
+            except Exception:
+                if attempt >= self.settings.thread_write_max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(RETRY_DELAY_SECONDS * 2 ** attempt)
+                attempt += 1
+
+    def _done(self, thread_id: str) -> None:
+        remaining = self._pending.get(thread_id, 1) - 1
+        if remaining > 0:
+            self._pending[thread_id] = remaining
+            return
+        self._pending.pop(thread_id, None)
+        idle = self._idle.pop(thread_id, None)
+        if idle is not None:
+            idle.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "written": self.written,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        Write what is still queued, at most `timeout` seconds, and stop the worker.
+
+        Args:
+            timeout (float): Longest wait for the queued writes in seconds
+        """
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.error(f"Stopping the thread write queue with {self._queue.qsize()} writes left")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+def get_thread_writer(request: Request) -> ThreadWriteQueue:
+    """FastAPI dependency returning the thread write queue created in the app's lifespan."""
+    return request.app.state.thread_writer
@@ -1,12 +1,11 @@
 import sys
 import os
 import logging
-from fastapi import FastAPI, HTTPException
-from azure.identity.aio import DefaultAzureCredential
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
 from typing import Optional
 from dotenv import load_dotenv
-from azure.ai.agents.models import AzureAISearchTool
-from azure.ai.projects.models import ConnectionType
 from semantic_kernel.agents import AzureAIAgent, AzureAIAgentThread, AzureAIAgentSettings
 from semantic_kernel.contents.chat_history import ChatHistory
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
@@ -15,13 +14,33 @@ from semantic_kernel.contents.utils.author_role import AuthorRole
 from pydantic import BaseModel
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from memory.faq_memory import FAQMemory
+from agent_runtime.azure_clients import get_project_client, AzureClients
+from agent_runtime.agent_registry import get_agent_registry, AgentProfile
+from agent_runtime.search_tools import get_search_tools
+from agent_runtime.streaming import sse_response, stream_agent_response, stream_cached_answer
 
 
 logging.basicConfig(level=logging.ERROR)
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the FAQ memory and create the shared Azure credential and project client at startup,
+    so requests do not pay for loading the FAQ, token acquisition or connection setup.
+    """
+    warm_up = faq_memory.warm_up()
+    app.state.azure_clients = await AzureClients().start()
+    yield
+    if not warm_up.done():
+        warm_up.cancel()
+    await app.state.azure_clients.close()
+    await faq_memory.close()
+
+
+app = FastAPI(lifespan=lifespan)
 """
 Create dependency injection for the agent
 This is a simple chat application using FastAPI and Semantic Kernel.
@@ -34,7 +53,11 @@ class ChatRequest(BaseModel):
     chat_history: Optional[ChatHistory] = None
 
 AGENT_NAME = "AI-Agent-rag"   
-AZURE_AI_SEARCH_INDEX_NAME = os.getenv("AZURE_SEARCH_INDEX")
+AGENT_PROFILE = AgentProfile(
+    name=AGENT_NAME,
+    description="An agent that can answer questions for user.",
+    instructions="You are an assistant Agent for answering questions. Your conversation is grounded in the context of the user query and data from search or knowledge base. outside of that. Do not make up answers. If you do not know the answer, say 'I don't know'.",
+)
 
 ai_agent_settings = AzureAIAgentSettings()
 faq_memory = FAQMemory()
@@ -42,40 +65,61 @@ faq_memory = FAQMemory()
 async def get_faq_memory(query: str = None, category: str = None, limit: int = 1, score: float = 0.21):
     """Get the FAQ memory instance."""
     if query is not None:
-        results = await faq_memory.search_faq(query, category, limit, score)
-        if results is None or len(results) == 0:
+        result = await faq_memory.search_faq_scored(query, category, limit, score)
+        if not result.matches:
+            if result.best_distance is not None:
+                logging.info(f"No FAQ match for '{query}', closest distance {result.best_distance:.3f} (threshold {score})")
             return None
+        results = result.records
     else:
         results = None
     return results
 
+@app.get("/health")
+async def health(request: Request):
+    """
+    Readiness check, returns 503 until the FAQ memory is initialized.
+    """
+    faq = faq_memory.health()
+    registry = getattr(request.app.state, "agent_registry", None)
+    search_tools = getattr(request.app.state, "search_tools", None)
+    return JSONResponse(
+        status_code=200 if faq["ready"] else 503,
+        content={
+            "status": "ready" if faq["ready"] else "starting",
+            "faq_memory": faq,
+            "azure_clients": request.app.state.azure_clients.health(),
+            "agent_registry": registry.stats() if registry is not None else None,
+            "search_tools": search_tools.stats() if search_tools is not None else None,
+        },
+    )
+
+
+@app.post("/faq/reload")
+async def reload_faq_memory():
+    """
+    Reload the FAQ JSON file into the FAQ memory.
+    Only new or changed items are embedded; searches keep running on the previous index until the new one is ready.
+    """
+    logging.info("Reloading FAQ memory")
+    return await faq_memory.reload()
+
+
 @app.post("/reset_agent_thread_id")
-async def delete_agent_thread(agent_id:Optional[str] = None, thread_id:Optional[str] = None):
+async def delete_agent_thread(agent_id:Optional[str] = None, thread_id:Optional[str] = None, client=Depends(get_project_client)):
     """
     Reset the agent thread ID.
     This is useful for starting a new conversation with the agent.
     """
     logging.info("Resetting agent thread ID")
     
-    async with (
-        # 1. Login to Azure and create a Azure AI Project Client
-        DefaultAzureCredential() as creds,
-        AzureAIAgent.create_client(credential=creds) as client,
-    ):
-        logging.info("Deleting thread with ID: %s for agent ID: %s", thread_id, agent_id)
-        if (agent_id is None) or (thread_id is None):
-            raise HTTPException(status_code=400, detail="Agent ID is required to reset thread.")
-        else:
-            # Second call with existing agent and thread
-            agent_def = await client.agents.get_agent(agent_id=agent_id)
-            agent = AzureAIAgent(
-                client=client,
-                definition=agent_def
-            )
-            logging.info("Using existing agent: %s", agent.id)
-
-            await client.agents.threads.delete(thread_id=thread_id)
-            await client.agents.delete_agent(agent_id=agent_id)
+    # The Azure AI Project Client is created once in the lifespan and shared by all requests
+    logging.info("Deleting thread with ID: %s for agent ID: %s", thread_id, agent_id)
+    if (agent_id is None) or (thread_id is None):
+        raise HTTPException(status_code=400, detail="Agent ID is required to reset thread.")
+    else:
+        # The agent is shared by all conversations and kept in the agent registry, only the thread is deleted
+        await client.agents.threads.delete(thread_id=thread_id)
     return {
         "message": "Agent thread reset successfully.",
         "agent_id": agent_id,
@@ -83,8 +127,36 @@ async def delete_agent_thread(agent_id:Optional[str] = None, thread_id:Optional[
     }
     
 
+async def resolve_agent(http_request: Request, agent_id: Optional[str]):
+    """
+    Return the project client, the agent and the search tool cache for a request the FAQ cache
+    did not answer: the shared agent of the profile for a first call, or the agent of a
+    follow-up call. All Azure setup happens here, after the FAQ lookup.
+    """
+    # The Azure AI Project Client is created once in the lifespan and shared by all requests
+    client = get_project_client(http_request)
+    agent_registry = get_agent_registry(http_request, client)
+    search_tools = get_search_tools(http_request, client)
+    if agent_id is None:
+        # Initial call, the agent of the profile is created once and shared by all conversations
+        # The AI Search connection is looked up once and cached, not on every request
+        ai_search = await search_tools.tool()
+        agent = await agent_registry.agent(
+            AGENT_PROFILE,
+            tools=ai_search.definitions,
+            tool_resources=ai_search.resources,
+            headers={"x-ms-enable-preview": "true"},
+        )
+        logging.info("Using shared agent: %s", agent.id)
+    else:
+        # Second call with existing agent and thread
+        agent = await agent_registry.agent_by_id(agent_id)
+        logging.info("Using existing agent: %s", agent.id)
+    return client, agent, search_tools
+
+
 @app.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     user_input = request.user_input
     agent_id = request.agent_id
     thread_id = request.thread_id
@@ -103,87 +175,92 @@ async def chat(request: ChatRequest):
     
     print("No cache search result found, proceeding with agent response...")
 
-    async with (
-        # 1. Login to Azure and create a Azure AI Project Client
-        DefaultAzureCredential() as creds,
-        AzureAIAgent.create_client(credential=creds) as client,
-    ): 
-        ai_search_conn_id = ""
-        async for connection in client.connections.list():
-            if connection.type == ConnectionType.AZURE_AI_SEARCH:
-                ai_search_conn_id = connection.id
-                print(f"Found Azure AI Search connection: {connection.id}")
-                break
-
-        ai_search = AzureAISearchTool(index_connection_id=ai_search_conn_id, index_name=AZURE_AI_SEARCH_INDEX_NAME)
-        print(f"Using Azure AI Search index: {AZURE_AI_SEARCH_INDEX_NAME}")
-
-        if agent_id is None:
-            # Initial call
-            agent = AzureAIAgent(
-                client=client,
-                definition = await client.agents.create_agent(
-                    model=os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME"),
-                    name=AGENT_NAME,
-                    description="An agent that can answer questions for user.",
-                    instructions="You are an assistant Agent for answering questions. Your conversation is grounded in the context of the user query and data from search or knowledge base. outside of that. Do not make up answers. If you do not know the answer, say 'I don't know'.",
-                    temperature=0.1,
-                    top_p=0.1,                            
-                ),
-                tools=ai_search.definitions,
-                tool_resources=ai_search.resources,
-                headers={"x-ms-enable-preview": "true"},
-            )
-            logging.info("Created new agent: %s", agent.id)
-        else:
-            # Second call with existing agent and thread
-            agent_def = await client.agents.get_agent(agent_id=agent_id)
-            agent = AzureAIAgent(
-                client=client,
-                definition=agent_def,
-                tools=ai_search.definitions,
-                tool_resources=ai_search.resources,
-                headers={"x-ms-enable-preview": "true"},
-            )
-            logging.info("Using existing agent: %s", agent.id)
-
-        # Create user message
-        user_message = ChatMessageContent(
-            role=AuthorRole.USER,
-            items=[
-                TextContent(text=user_input),
-            ]
-        )
-        
-        # Get response from agent, passing the user message
-        logging.info("Getting response from agent...")
-        thread = None
-        # If thread_id is not provided in the request, try to get it from the singleton manager
-        if thread_id is not None:            
-            logging.info("Using thread ID from request: %s", thread_id)
-            thread = AzureAIAgentThread(client=client, thread_id=thread_id)
-            logging.info("Retrieved existing thread: %s", thread.id if thread else "None")
-        
-        # Let agent handle thread creation if needed
-        if thread_id:
-            try:
-                logging.info("Attempting to use thread ID: %s", thread_id)
-                response = await agent.get_response(messages=user_message, thread=thread)
-            except Exception as e:
-                logging.error("Error with existing thread ID %s: %s", thread_id, str(e))
-                raise HTTPException(status_code=500, detail=f"Error with existing thread ID {thread_id}: {str(e)}")
-        else:
-            logging.info("No thread ID available, creating new thread")
+    client, agent, search_tools = await resolve_agent(http_request, agent_id)
+
+    # Create user message
+    user_message = ChatMessageContent(
+        role=AuthorRole.USER,
+        items=[
+            TextContent(text=user_input),
+        ]
+    )
+    
+    # Get response from agent, passing the user message
+    logging.info("Getting response from agent...")
+    thread = None
+    # If thread_id is not provided in the request, try to get it from the singleton manager
+    if thread_id is not None:            
+        logging.info("Using thread ID from request: %s", thread_id)
+        thread = AzureAIAgentThread(client=client, thread_id=thread_id)
+        logging.info("Retrieved existing thread: %s", thread.id if thread else "None")
+    
+    # Let agent handle thread creation if needed
+    if thread_id:
+        try:
+            logging.info("Attempting to use thread ID: %s", thread_id)
+            response = await agent.get_response(messages=user_message, thread=thread)
+        except Exception as e:
+            logging.error("Error with existing thread ID %s: %s", thread_id, str(e))
+            raise HTTPException(status_code=500, detail=f"Error with existing thread ID {thread_id}: {str(e)}")
+    else:
+        logging.info("No thread ID available, creating new thread")
+        try:
             response = await agent.get_response(messages=user_message)
-                
-        logging.info("Response received from agent.")
-        logging.info("Agent response: %s", response.content.content if hasattr(response.content, 'content') else response.content)
-        
-        return {    
-            "response": response.content.content if hasattr(response.content, 'content') else response.content,
-            "thread_id": response.thread.id,
-            "agent_id": str(agent.id) if agent else None,
-        }
+        except Exception:
+            # The search connection may have changed, look it up again on the next request
+            search_tools.invalidate()
+            raise
+            
+    answer = response.content.content if hasattr(response.content, 'content') else response.content
+    logging.info("Response received from agent.")
+    logging.info("Agent response: %s", answer)
+    
+    if not thread_id:
+        # Cache answers to standalone questions in the FAQ memory, follow-ups depend on the thread
+        faq_memory.write_back(user_input, str(answer))
+    
+    return {    
+        "response": answer,
+        "thread_id": response.thread.id,
+        "agent_id": str(agent.id) if agent else None,
+    }
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    Streaming variant of /chat, answering with server-sent events: token deltas as the agent
+    generates them, tool_call/tool_result progress for the AI Search calls, and a final done
+    event with the response, thread_id and agent_id. FAQ cache hits are streamed right away.
+    """
+    user_input = request.user_input
+    agent_id = request.agent_id
+    thread_id = request.thread_id
+
+    logging.info("Streaming user input: %s", user_input)
+
+    cache_search_result = await get_faq_memory(query=user_input, category=None, limit=1, score=0.25)
+    if cache_search_result is not None:
+        return sse_response(stream_cached_answer(cache_search_result[0].answer, thread_id, agent_id))
+
+    client, agent, search_tools = await resolve_agent(http_request, agent_id)
+    thread = AzureAIAgentThread(client=client, thread_id=thread_id) if thread_id else None
+    user_message = ChatMessageContent(
+        role=AuthorRole.USER,
+        items=[TextContent(text=user_input)]
+    )
+
+    def on_done(answer: str, response_thread_id: str, used_tools: bool):
+        if not thread_id:
+            # Cache answers to standalone questions in the FAQ memory, follow-ups depend on the thread
+            faq_memory.write_back(user_input, answer)
+
+    def on_error(error: Exception):
+        if not thread_id:
+            # The search connection may have changed, look it up again on the next request
+            search_tools.invalidate()
+
+    return sse_response(stream_agent_response(agent, user_message, thread, on_done=on_done, on_error=on_error))
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,8 +1,9 @@
 import sys
 import os
 import logging
-from fastapi import FastAPI, HTTPException
-from azure.identity.aio import DefaultAzureCredential
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
 from typing import Optional
 from dotenv import load_dotenv
 from semantic_kernel.agents import AzureAIAgent, AzureAIAgentThread, AzureAIAgentSettings
@@ -11,10 +12,14 @@ from semantic_kernel.contents.chat_history import ChatHistory
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
 from semantic_kernel.contents.text_content import TextContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
-from semantic_kernel.connectors.mcp import MCPStreamableHttpPlugin
 from pydantic import BaseModel
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from memory.faq_memory import FAQMemory
+from agent_runtime.azure_clients import get_project_client, AzureClients
+from agent_runtime.agent_registry import get_agent_registry, AgentProfile
+from agent_runtime.mcp_pool import get_mcp_pool, MCPSessionPool
+from agent_runtime.streaming import sse_response, stream_agent_response, stream_cached_answer
+from agent_runtime.thread_writer import get_thread_writer, ThreadWriteQueue
 from semantic_kernel.functions import kernel_function
 
 
@@ -22,7 +27,28 @@ logging.basicConfig(level=logging.ERROR)
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the FAQ memory, create the shared Azure credential and project client, connect
+    the MCP session pool and start the thread write queue at startup, so requests do not pay
+    for loading the FAQ, token acquisition, connection setup or MCP handshakes.
+    """
+    warm_up = faq_memory.warm_up()
+    app.state.azure_clients = await AzureClients().start()
+    app.state.mcp_pool = MCPSessionPool().start()
+    app.state.thread_writer = ThreadWriteQueue(app.state.azure_clients).start()
+    yield
+    if not warm_up.done():
+        warm_up.cancel()
+    await app.state.thread_writer.close()
+    await app.state.mcp_pool.close()
+    await app.state.azure_clients.close()
+    await faq_memory.close()
+
+
+app = FastAPI(lifespan=lifespan)
 """
 Create dependency injection for the agent
 This is a simple chat application using FastAPI and Semantic Kernel.
@@ -36,6 +62,11 @@ class ChatRequest(BaseModel):
 
 
 AGENT_NAME = "AI-Agent-with-MCP"   
+AGENT_PROFILE = AgentProfile(
+    name=AGENT_NAME,
+    description="An agent that can answer questions about system monitoring, weather, and current time.",
+    instructions="You are an assistant Agent for answering questions about system monitoring, weather, and current time. You can use the SystemLogRepository plugin to log system events and retrieve logs. Use the Weather plugin to get current weather information and the GetSystemLocalTime plugin to retrieve the current system time.",
+)
 faq_memory = FAQMemory()
 
 @kernel_function(
@@ -45,41 +76,62 @@ faq_memory = FAQMemory()
 async def get_faq_memory(query: str = None, category: str = None, limit: int = 1, score: float = 0.21):
     """Get the FAQ memory instance."""
     if query is not None:
-        results = await faq_memory.search_faq(query, category, limit, score)
-        if results is None or len(results) == 0:
+        result = await faq_memory.search_faq_scored(query, category, limit, score)
+        if not result.matches:
+            if result.best_distance is not None:
+                logging.info(f"No FAQ match for '{query}', closest distance {result.best_distance:.3f} (threshold {score})")
             return None
+        results = result.records
     else:
         results = None
     return results
 
 
+@app.get("/health")
+async def health(request: Request):
+    """
+    Readiness check, returns 503 until the FAQ memory is initialized.
+    """
+    faq = faq_memory.health()
+    registry = getattr(request.app.state, "agent_registry", None)
+    return JSONResponse(
+        status_code=200 if faq["ready"] else 503,
+        content={
+            "status": "ready" if faq["ready"] else "starting",
+            "faq_memory": faq,
+            "azure_clients": request.app.state.azure_clients.health(),
+            "agent_registry": registry.stats() if registry is not None else None,
+            "mcp": request.app.state.mcp_pool.health(),
+            "thread_writer": request.app.state.thread_writer.stats(),
+        },
+    )
+
+
+@app.post("/faq/reload")
+async def reload_faq_memory():
+    """
+    Reload the FAQ JSON file into the FAQ memory.
+    Only new or changed items are embedded; searches keep running on the previous index until the new one is ready.
+    """
+    logging.info("Reloading FAQ memory")
+    return await faq_memory.reload()
+
+
 @app.post("/reset_agent_thread_id")
-async def delete_agent_thread(agent_id:Optional[str] = None, thread_id:Optional[str] = None):
+async def delete_agent_thread(agent_id:Optional[str] = None, thread_id:Optional[str] = None, client=Depends(get_project_client)):
     """
     Reset the agent thread ID.
     This is useful for starting a new conversation with the agent.
     """
     logging.info("Resetting agent thread ID")
     
-    async with (
-        # 1. Login to Azure and create a Azure AI Project Client
-        DefaultAzureCredential() as creds,
-        AzureAIAgent.create_client(credential=creds) as client,
-    ):
-        logging.info("Deleting thread with ID: %s for agent ID: %s", thread_id, agent_id)
-        if (agent_id is None) or (thread_id is None):
-            raise HTTPException(status_code=400, detail="Agent ID is required to reset thread.")
-        else:
-            # Second call with existing agent and thread
-            agent_def = await client.agents.get_agent(agent_id=agent_id)
-            agent = AzureAIAgent(
-                client=client,
-                definition=agent_def
-            )
-            logging.info("Using existing agent: %s", agent.id)
-
-            await client.agents.threads.delete(thread_id=thread_id)
-            await client.agents.delete_agent(agent_id=agent_id)
+    # The Azure AI Project Client is created once in the lifespan and shared by all requests
+    logging.info("Deleting thread with ID: %s for agent ID: %s", thread_id, agent_id)
+    if (agent_id is None) or (thread_id is None):
+        raise HTTPException(status_code=400, detail="Agent ID is required to reset thread.")
+    else:
+        # The agent is shared by all conversations and kept in the agent registry, only the thread is deleted
+        await client.agents.threads.delete(thread_id=thread_id)
     return {
         "message": "Agent thread reset successfully.",
         "agent_id": agent_id,
@@ -87,8 +139,91 @@ async def delete_agent_thread(agent_id:Optional[str] = None, thread_id:Optional[
     }
     
 
+def queue_cached_answer(thread_writer: ThreadWriteQueue, thread_id: Optional[str], user_input: str, answer: str) -> None:
+    """
+    Queue a question answered from the FAQ cache and its answer for the conversation thread.
+    The write happens in the background, the response does not wait for it.
+    """
+    if thread_id is None:
+        # No conversation yet: a thread created here would never be referenced again
+        return
+    # add user question and answer from the cache to the thread
+    thread_writer.submit(thread_id, [
+        ChatMessageContent(
+            role=AuthorRole.USER,
+            items=[TextContent(text=user_input)]
+        ),
+        ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            items=[TextContent(text=answer)]
+        ),
+    ])
+
+
+async def resolve_agent(http_request: Request, agent_id: Optional[str], thread_id: Optional[str]):
+    """
+    Return the project client and the agent for a request the FAQ cache did not answer:
+    the shared agent of the profile for a first call, or the agent of a follow-up call.
+    All Azure and MCP setup happens here, after the FAQ lookup.
+    """
+    # 1. The Azure AI Project Client is created once in the lifespan and shared by all requests
+    client = get_project_client(http_request)
+    agent_registry = get_agent_registry(http_request, client)
+    # 2. Borrow the MCP plugins, connected once at startup
+    mcp_plugins = await get_mcp_pool(http_request).plugins()
+    if thread_id:
+        # The run must see the cached answers still queued for this thread
+        await get_thread_writer(http_request).flush(thread_id)
+
+    logging.info("Using MCP plugins: %s", [plugin.name for plugin in mcp_plugins])
+    if agent_id is None:
+        # Initial call, the agent of the profile is created once and shared by all conversations
+        code_interpreter = CodeInterpreterTool()
+        agent = await agent_registry.agent(
+            AGENT_PROFILE,
+            plugins=mcp_plugins,
+            tools=code_interpreter.definitions,
+            tool_resources=code_interpreter.resources
+        )
+        logging.info("Using shared agent: %s", agent.id)
+    else:
+        # Second call with existing agent and thread
+        agent = await agent_registry.agent_by_id(
+            agent_id,
+            plugins=mcp_plugins, # Important, it need to be added again
+        )
+        logging.info("Using existing agent: %s", agent.id)
+    return client, agent
+
+
+async def get_agent_response(agent: AzureAIAgent, user_message: ChatMessageContent, thread: Optional[AzureAIAgentThread] = None):
+    """
+    Get the agent response like agent.get_response, and tell whether the run called tools.
+
+    Returns:
+        Tuple[AgentResponseItem, bool]: The final response and whether a tool or function was called
+    """
+    used_tools = False
+
+    async def on_intermediate_message(message: ChatMessageContent):
+        # Only function calls, their results and other tool steps are intermediate messages
+        nonlocal used_tools
+        used_tools = True
+
+    response = None
+    async for item in agent.invoke(messages=user_message, thread=thread, on_intermediate_message=on_intermediate_message):
+        if item.message.metadata.get("code"):
+            # Code interpreter input
+            used_tools = True
+        else:
+            response = item
+    if response is None:
+        raise HTTPException(status_code=500, detail="No response messages were returned from the agent.")
+    return response, used_tools
+
+
 @app.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request, thread_writer=Depends(get_thread_writer)):
     user_input = request.user_input
     agent_id = request.agent_id
     thread_id = request.thread_id
@@ -97,121 +232,98 @@ async def chat(request: ChatRequest):
     logging.info("Agent ID: %s", agent_id)
     logging.info("Thread ID: %s", thread_id)      
 
-    async with (
-        # 1. Login to Azure and create a Azure AI Project Client
-        DefaultAzureCredential() as creds,
-        AzureAIAgent.create_client(credential=creds) as client,
-        # 2. Create the MCP plugins
-        MCPStreamableHttpPlugin(
-            name="Weather",
-            description="Get current weather information",
-            url="http://localhost:8086/mcp"
-        ) as current_weather_plugin,
-        MCPStreamableHttpPlugin(
-            name="GetSystemLocalTime",
-            description="System local time plugin for retrieving current system time",
-            url="http://localhost:8087/mcp"
-        ) as current_time_plugin,
-        MCPStreamableHttpPlugin(
-            name="SystemLogRepository",
-            description="System log repository for monitoring and debugging",
-            
-            url="http://localhost:8089/mcp"
-        ) as sys_log_ads_plugin,
-    ): 
-        code_interpreter = CodeInterpreterTool()
+    # FAQ hits are answered before any Azure or MCP work, only the embedding lookup is awaited
+    cache_search_result = await get_faq_memory(query=user_input, category=None, limit=1, score=0.25)
 
-        cache_search_result = await get_faq_memory(query=user_input, category=None, limit=1, score=0.25)
-
-        logging.info("Cache search result: %s", cache_search_result)
-        if cache_search_result is not None:
-            thread = AzureAIAgentThread(client=client, thread_id=thread_id)
-            # add user question and answer from the cache to the thread
-            await thread.on_new_message(
-                ChatMessageContent(
-                    role=AuthorRole.USER,
-                    items=[TextContent(text=user_input)]
-                )            
-            )
-            await thread.on_new_message(
-                ChatMessageContent(
-                    role=AuthorRole.ASSISTANT,
-                    items=[TextContent(text=cache_search_result[0].answer)]
-                )
-            )
-            return {    
-                "response": cache_search_result[0].answer,
-                "thread_id": thread_id,
-                "agent_id": agent_id
-            }  
-        
-        if agent_id is None:
-            # Initial call
-            logging.info("Created new plugin: %s", sys_log_ads_plugin.name)
-            agent = AzureAIAgent(
-                client=client,
-                definition = await client.agents.create_agent(
-                    model=os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME"),
-                    name=AGENT_NAME,
-                    description="An agent that can answer questions about system monitoring, weather, and current time.",
-                    instructions="You are an assistant Agent for answering questions about system monitoring, weather, and current time. You can use the SystemLogRepository plugin to log system events and retrieve logs. Use the Weather plugin to get current weather information and the GetSystemLocalTime plugin to retrieve the current system time.",
-                    temperature=0.1,
-                    top_p=0.1,                            
-                ),
-                plugins=[sys_log_ads_plugin, current_weather_plugin, current_time_plugin],
-                tools=code_interpreter.definitions,
-                tool_resources=code_interpreter.resources
-            )
-            logging.info("Created new agent: %s", agent.id)
-        else:
-            # Second call with existing agent and thread
-            agent_def = await client.agents.get_agent(agent_id=agent_id)
-            agent = AzureAIAgent(
-                client=client,
-                definition=agent_def,
-                plugins=[sys_log_ads_plugin, current_weather_plugin, current_time_plugin], # Important, it need to be added again
-                tools=code_interpreter.definitions,
-                tool_resources=code_interpreter.resources
-            )
-            logging.info("Using existing agent: %s", agent.id)
-
-        # Create user message
-        user_message = ChatMessageContent(
-            role=AuthorRole.USER,
-            items=[
-                TextContent(text=user_input),
-            ]
-        )
-        
-        # Get response from agent, passing the user message
-        logging.info("Getting response from agent...")
-        thread = None
-        # If thread_id is not provided in the request, try to get it from the singleton manager
-        if thread_id is not None:            
-            logging.info("Using thread ID from request: %s", thread_id)
-            thread = AzureAIAgentThread(client=client, thread_id=thread_id)
-            logging.info("Retrieved existing thread: %s", thread.id if thread else "None")
-        
-        # Let agent handle thread creation if needed
-        if thread_id:
-            try:
-                logging.info("Attempting to use thread ID: %s", thread_id)
-                response = await agent.get_response(messages=user_message, thread=thread)
-            except Exception as e:
-                logging.error("Error with existing thread ID %s: %s", thread_id, str(e))
-                raise HTTPException(status_code=500, detail=f"Error with existing thread ID {thread_id}: {str(e)}")
-        else:
-            logging.info("No thread ID available, creating new thread")
-            response = await agent.get_response(messages=user_message)
-                
-        logging.info("Response received from agent.")
-        logging.info("Agent response: %s", response.content.content if hasattr(response.content, 'content') else response.content)
-        
+    logging.info("Cache search result: %s", cache_search_result)
+    if cache_search_result is not None:
+        queue_cached_answer(thread_writer, thread_id, user_input, cache_search_result[0].answer)
         return {    
-            "response": response.content.content if hasattr(response.content, 'content') else response.content,
-            "thread_id": response.thread.id,
-            "agent_id": str(agent.id) if agent else None,
-        }
+            "response": cache_search_result[0].answer,
+            "thread_id": thread_id,
+            "agent_id": agent_id
+        }  
+    
+    client, agent = await resolve_agent(http_request, agent_id, thread_id)
+
+    # Create user message
+    user_message = ChatMessageContent(
+        role=AuthorRole.USER,
+        items=[
+            TextContent(text=user_input),
+        ]
+    )
+    
+    # Get response from agent, passing the user message
+    logging.info("Getting response from agent...")
+    thread = None
+    # If thread_id is not provided in the request, try to get it from the singleton manager
+    if thread_id is not None:            
+        logging.info("Using thread ID from request: %s", thread_id)
+        thread = AzureAIAgentThread(client=client, thread_id=thread_id)
+        logging.info("Retrieved existing thread: %s", thread.id if thread else "None")
+    
+    # Let agent handle thread creation if needed
+    if thread_id:
+        try:
+            logging.info("Attempting to use thread ID: %s", thread_id)
+            response, used_tools = await get_agent_response(agent, user_message, thread)
+        except Exception as e:
+            logging.error("Error with existing thread ID %s: %s", thread_id, str(e))
+            raise HTTPException(status_code=500, detail=f"Error with existing thread ID {thread_id}: {str(e)}")
+    else:
+        logging.info("No thread ID available, creating new thread")
+        response, used_tools = await get_agent_response(agent, user_message)
+            
+    answer = response.content.content if hasattr(response.content, 'content') else response.content
+    logging.info("Response received from agent.")
+    logging.info("Agent response: %s", answer)
+    
+    if not thread_id and not used_tools:
+        # Cache answers to standalone questions in the FAQ memory, follow-ups depend on the thread
+        # and answers built from tool calls (weather, time, logs) are live data
+        faq_memory.write_back(user_input, str(answer))
+    
+    return {    
+        "response": answer,
+        "thread_id": response.thread.id,
+        "agent_id": str(agent.id) if agent else None,
+    }
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request, thread_writer=Depends(get_thread_writer)):
+    """
+    Streaming variant of /chat, answering with server-sent events: token deltas as the agent
+    generates them, tool_call/tool_result progress, and a final done event with the response,
+    thread_id and agent_id. FAQ cache hits are streamed right away.
+    """
+    user_input = request.user_input
+    agent_id = request.agent_id
+    thread_id = request.thread_id
+
+    logging.info("Streaming user input: %s", user_input)
+
+    # FAQ hits are answered before any Azure or MCP work, only the embedding lookup is awaited
+    cache_search_result = await get_faq_memory(query=user_input, category=None, limit=1, score=0.25)
+    if cache_search_result is not None:
+        queue_cached_answer(thread_writer, thread_id, user_input, cache_search_result[0].answer)
+        return sse_response(stream_cached_answer(cache_search_result[0].answer, thread_id, agent_id))
+
+    client, agent = await resolve_agent(http_request, agent_id, thread_id)
+    thread = AzureAIAgentThread(client=client, thread_id=thread_id) if thread_id else None
+    user_message = ChatMessageContent(
+        role=AuthorRole.USER,
+        items=[TextContent(text=user_input)]
+    )
+
+    def on_done(answer: str, response_thread_id: str, used_tools: bool):
+        if not thread_id and not used_tools:
+            # Cache answers to standalone questions in the FAQ memory, follow-ups depend on the thread
+            # and answers built from tool calls (weather, time, logs) are live data
+            faq_memory.write_back(user_input, answer)
+
+    return sse_response(stream_agent_response(agent, user_message, thread, on_done=on_done))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,76 @@
+"""
+Recall vs latency benchmark of the IVF-flat FAQ index against exact search.
+Runs on synthetic clustered vectors, no Azure services are needed.
+
+    python benchmarks/ann_recall.py --records 100000 --dimensions 384 --nprobe 1 4 8 16 32
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.faq_index import FAQVectorIndex
+from memory.faq_ann import IVFFlatIndex
+
+
+def synthetic_vectors(count: int, dimensions: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Vectors scattered around random cluster centers, like embeddings of related questions."""
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    labels = rng.integers(clusters, size=count)
+    return centers[labels] + 0.6 * rng.standard_normal((count, dimensions)).astype(np.float32)
+
+
+def timed_search(index: FAQVectorIndex, queries: np.ndarray, limit: int):
+    """Run every query through the index and return the result ids and per-query latencies in ms."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        matches = index.search(query, limit=limit, score=2.0)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([record.id for record, _ in matches])
+    return results, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(args.records, args.dimensions, args.clusters, rng)
+    records = [SimpleNamespace(id=str(i), question="") for i in range(args.records)]
+    queries = vectors[rng.choice(args.records, args.queries, replace=False)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    exact = FAQVectorIndex(dimensions=args.dimensions)
+    exact.build(records, vectors)
+    truth, exact_latencies = timed_search(exact, queries, args.limit)
+
+    start = time.perf_counter()
+    ivf = IVFFlatIndex(dimensions=args.dimensions, nlist=args.nlist, min_train_size=0)
+    ivf.build(records, vectors)
+    print(f"{args.records} records x {args.dimensions} dims, IVF build {time.perf_counter() - start:.2f}s")
+    print(f"{'index':<14}{'recall@' + str(args.limit):>12}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{'exact':<14}{1.0:>12.3f}{np.percentile(exact_latencies, 50):>10.3f}{np.percentile(exact_latencies, 99):>10.3f}")
+
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        found, latencies = timed_search(ivf, queries, args.limit)
+        recall = np.mean([len(set(f) & set(t)) / max(len(t), 1) for f, t in zip(found, truth)])
+        label = f"ivf nprobe={nprobe}"
+        print(f"{label:<14}{recall:>12.3f}{np.percentile(latencies, 50):>10.3f}{np.percentile(latencies, 99):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Concurrent query embedding with and without the EmbeddingCoalescer.
+The embedding service is the local HashEmbedding behind a simulated network round
+trip, so no Azure services are needed. Each run fires --requests single-query
+embeddings from --concurrency concurrent callers and reports embedding calls, caller
+latency and throughput for every coalescing window.
+
+    python benchmarks/embedding_coalescing.py --requests 2000 --concurrency 64 --windows 0 1 2 5 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.embedding_coalescer import EmbeddingCoalescer
+from memory.local_embedding import HashEmbedding
+
+
+class RemoteEmbedding(HashEmbedding):
+    """HashEmbedding with the latency of an HTTP call: a fixed round trip plus a cost per text."""
+
+    def __init__(self, round_trip_ms: float, per_text_ms: float):
+        super().__init__()
+        self.round_trip = round_trip_ms / 1000
+        self.per_text = per_text_ms / 1000
+
+    async def generate_embeddings(self, texts, settings=None, batch_size=None, **kwargs):
+        await asyncio.sleep(self.round_trip + self.per_text * len(texts))
+        return await super().generate_embeddings(texts)
+
+
+async def run_window(window_ms: float, args) -> dict:
+    remote = RemoteEmbedding(args.round_trip_ms, args.per_text_ms)
+    embedder = EmbeddingCoalescer(remote, window_ms=window_ms, max_batch_size=args.max_batch) if window_ms > 0 else remote
+    queries = [f"question number {i % args.distinct}" for i in range(args.requests)]
+    latencies = []
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def call(query: str):
+        async with slots:
+            start = time.perf_counter()
+            await embedder.generate_embeddings([query])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    return {
+        "window_ms": window_ms,
+        "calls": remote.calls,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "qps": args.requests / elapsed,
+    }
+
+
+async def run(args):
+    print(f"{args.requests} requests, {args.concurrency} concurrent, round trip {args.round_trip_ms:.0f} ms")
+    print(f"{'window ms':>10}{'calls':>8}{'p50 ms':>10}{'p99 ms':>10}{'qps':>10}")
+    for window_ms in args.windows:
+        result = await run_window(window_ms, args)
+        label = "off" if window_ms <= 0 else f"{window_ms:g}"
+        print(f"{label:>10}{result['calls']:>8}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['qps']:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--distinct", type=int, default=1000, help="Distinct query texts")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 1, 2, 5, 10])
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--round-trip-ms", type=float, default=30.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
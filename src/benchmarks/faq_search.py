@@ -0,0 +1,261 @@
+"""
+Offline benchmark of FAQMemory.search_faq: latency, throughput, memory and hit quality.
+Runs on synthetic FAQ corpora with the deterministic local HashEmbedding, so no Azure
+services are needed and every run embeds the same texts to the same vectors.
+
+For each corpus size a FAQ JSON file is generated and loaded into a FAQMemory. The
+queries are paraphrases of sampled questions (the order shuffled, and a word dropped
+or a filler word added), whose expected answer is the source record, and unrelated
+"miss" queries that should not match anything. Reported per size:
+
+- build time, index and process memory
+- p50/p99 search_faq latency and sequential QPS
+- recall@k of the paraphrases and false-positive rate of the misses, per score threshold
+
+Results are written as JSON; --compare flags regressions against an earlier run.
+
+    python benchmarks/faq_search.py --sizes 10 100 1000 10000 100000 --output faq-search.json
+    python benchmarks/faq_search.py --compare faq-search.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.embedding_cache import QueryEmbeddingCache
+from memory.local_embedding import HashEmbedding
+
+CATEGORIES = ["coffee", "tea", "food", "rewards", "stores", "orders", "payments", "general"]
+TAGS = ["menu", "hot", "cold", "seasonal", "app", "delivery", "account", "allergens"]
+FILLERS = ["please", "exactly", "actually", "today"]
+SYLLABLES = ["ka", "lo", "mi", "ne", "su", "ta", "ri", "po", "de", "ga", "vu", "be", "zo", "fi", "ha", "ju"]
+
+
+def vocabulary(size: int, rng: np.random.Generator) -> list:
+    """Distinct pseudo-words of two to four syllables."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, rng.integers(2, 5))))
+    return sorted(words)
+
+
+def sample_words(words: list, count: int, rng: np.random.Generator) -> list:
+    # Like real questions: a quarter of the words come from a small set of common ones
+    common = rng.random(count) < 0.25
+    ranks = np.where(common, rng.integers(0, 50, count), rng.integers(0, len(words), count))
+    return [words[r] for r in ranks]
+
+
+def write_corpus(path: str, size: int, words: list, rng: np.random.Generator) -> list:
+    """Write a FAQ JSON file of `size` synthetic items and return their questions."""
+    items, questions = [], []
+    for i in range(size):
+        question = " ".join(sample_words(words, int(rng.integers(6, 11)), rng)) + "?"
+        questions.append(question)
+        items.append({
+            "id": str(i),
+            "question": question,
+            "answer": " ".join(sample_words(words, 12, rng)),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "tags": list(rng.choice(TAGS, 2, replace=False)),
+        })
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(items, file)
+    return questions
+
+
+def paraphrase(question: str, rng: np.random.Generator) -> str:
+    """Shuffle the words and either drop one or add a filler word."""
+    words = question.rstrip("?").split()
+    rng.shuffle(words)
+    if rng.random() < 0.5:
+        del words[int(rng.integers(len(words)))]
+    else:
+        words.insert(int(rng.integers(len(words) + 1)), str(rng.choice(FILLERS)))
+    return " ".join(words)
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB, the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def bench_size(size: int, args, words: list, workdir: str) -> dict:
+    from memory.faq_memory import FAQMemory
+
+    rng = np.random.default_rng(args.seed + size)
+    corpus_path = os.path.join(workdir, f"faq-{size}.json")
+    questions = write_corpus(corpus_path, size, words, rng)
+
+    # No query cache, so every search pays for its embedding like a first-time question
+    faq_memory = FAQMemory(json_file_path=corpus_path, query_cache=QueryEmbeddingCache(max_size=0))
+    faq_memory.embedder = HashEmbedding(seed=args.seed)
+    start = time.perf_counter()
+    await faq_memory.initialize()
+    build_seconds = time.perf_counter() - start
+
+    sources = rng.choice(size, min(args.queries, size), replace=False)
+    queries = [paraphrase(questions[i], rng) for i in sources]
+    misses = [" ".join(sample_words(words, 8, rng)) for _ in range(args.misses)]
+
+    for query in queries[:args.warmup]:
+        await faq_memory.search_faq(query, limit=max(args.k), score=args.score)
+    latencies = []
+    for query in queries + misses:
+        start = time.perf_counter()
+        await faq_memory.search_faq(query, limit=max(args.k), score=args.score)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+
+    # Quality from the same index, with the distances so every threshold is evaluated at once
+    index = faq_memory.collection
+    hits = [index.search(v, limit=max(args.k), score=np.inf) for v in await faq_memory.embedder.generate_embeddings(queries)]
+    miss_hits = [index.search(v, limit=1, score=np.inf) for v in await faq_memory.embedder.generate_embeddings(misses)]
+    quality = {}
+    for threshold in args.thresholds:
+        entry = {}
+        for k in args.k:
+            found = [
+                any(record.id == str(source) for record, distance in matches[:k] if distance < threshold)
+                for source, matches in zip(sources, hits)
+            ]
+            entry[f"recall@{k}"] = float(np.mean(found))
+        entry["false_positive_rate"] = float(np.mean([bool(m) and m[0][1] < threshold for m in miss_hits])) if misses else 0.0
+        quality[str(threshold)] = entry
+
+    result = {
+        "size": size,
+        "queries": len(queries),
+        "misses": len(misses),
+        "build_seconds": build_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "qps": float(len(latencies) / (latencies.sum() / 1000)),
+        "index_mb": index.nbytes / 2**20,
+        "rss_mb": rss_mb(),
+        "quality": quality,
+    }
+    await faq_memory.close()
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, tolerance: float, threshold: str) -> bool:
+    """Print the change of every size present in both runs, return False on a regression."""
+    previous = {result["size"]: result for result in baseline["results"]}
+    print(f"\nCompared with {baseline.get('revision', '?')} ({baseline.get('timestamp', '?')}), threshold {threshold}")
+    print(f"{'size':>9}{'p50':>10}{'p99':>10}{'qps':>10}{'recall':>10}")
+    ok = True
+    for result in current["results"]:
+        before = previous.get(result["size"])
+        if before is None:
+            continue
+        change = {name: result[name] / before[name] - 1 for name in ("p50_ms", "p99_ms", "qps")}
+        recall_key = f"recall@{min(int(key.split('@')[1]) for key in result['quality'][threshold] if key.startswith('recall@'))}"
+        recall_change = result["quality"][threshold][recall_key] - before["quality"].get(threshold, {}).get(recall_key, 0.0)
+        regressed = (
+            change["p50_ms"] > tolerance or change["p99_ms"] > tolerance
+            or change["qps"] < -tolerance or recall_change < -0.01
+        )
+        ok = ok and not regressed
+        print(
+            f"{result['size']:>9}{change['p50_ms']:>+10.1%}{change['p99_ms']:>+10.1%}"
+            f"{change['qps']:>+10.1%}{recall_change:>+10.3f}{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+async def run(args) -> int:
+    # The index configuration is read from the settings on first use
+    if args.storage:
+        os.environ["FAQ_VECTOR_STORAGE"] = args.storage
+    if args.index:
+        os.environ["FAQ_INDEX_KIND"] = args.index
+
+    words = vocabulary(args.vocabulary, np.random.default_rng(args.seed))
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'size':>9}{'build s':>10}{'p50 ms':>10}{'p99 ms':>10}{'qps':>10}{'index MB':>10}{'rss MB':>10}"
+              f"{'recall@' + str(min(args.k)):>10}{'fp rate':>10}")
+        for size in args.sizes:
+            result = await bench_size(size, args, words, workdir)
+            results.append(result)
+            gc.collect()
+            quality = result["quality"][str(args.score)]
+            print(
+                f"{size:>9}{result['build_seconds']:>10.2f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                f"{result['qps']:>10.0f}{result['index_mb']:>10.1f}{result['rss_mb']:>10.0f}"
+                f"{quality['recall@' + str(min(args.k))]:>10.3f}{quality['false_positive_rate']:>10.3f}"
+            )
+
+    report = {
+        "benchmark": "faq_search",
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        if not compare(baseline, report, args.tolerance, str(args.score)):
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000],
+                        help="Corpus sizes, 1000000 needs several GB of memory at 1536 float32 dimensions")
+    parser.add_argument("--queries", type=int, default=500, help="Paraphrase queries per size")
+    parser.add_argument("--misses", type=int, default=100, help="Unrelated queries per size")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--score", type=float, default=0.25, help="Threshold passed to search_faq, as in /chat")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.1, 0.2, 0.25, 0.3, 0.35, 0.4, 0.5])
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--storage", choices=["float32", "float16", "int8"], help="FAQ_VECTOR_STORAGE override")
+    parser.add_argument("--index", choices=["exact", "ivf"], help="FAQ_INDEX_KIND override")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Earlier JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative latency/QPS regression")
+    args = parser.parse_args()
+    if args.score not in args.thresholds:
+        args.thresholds.append(args.score)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
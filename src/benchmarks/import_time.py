@@ -0,0 +1,79 @@
+"""
+Import-time budget check for the FAQ memory modules.
+Each module is imported in a fresh interpreter that has already imported the Semantic
+Kernel vector-store module it cannot avoid. The check fails (exit code 1) when the
+remaining import takes longer than the budget, or when it loads the OpenAI connector
+or the Cosmos DB connector at import time.
+
+    python benchmarks/import_time.py --budget-ms 100
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULES = ["memory.faq_memory", "memory.faq_memory_cosmosdb"]
+BASELINE = "semantic_kernel.data.vector"
+
+# Modules that must not be loaded just by importing the memory modules
+FORBIDDEN = [
+    "semantic_kernel.connectors.ai.open_ai",
+    "semantic_kernel.connectors.azure_cosmos_db",
+    "azure.cosmos",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {baseline}
+baseline = time.perf_counter() - start
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"baseline": baseline, "seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    """Import a module in fresh interpreters and return the best times and any forbidden modules it loaded."""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(baseline=BASELINE, module=module, forbidden=FORBIDDEN)],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "baseline": min(run["baseline"] for run in runs),
+        "seconds": min(run["seconds"] for run in runs),
+        "loaded": runs[0]["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Allowed import time on top of the baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'module':<32}{BASELINE + ' ms':>34}{'own ms':>10}  forbidden imports")
+    failed = False
+    for module in MODULES:
+        result = measure(module, args.repeat)
+        own = result["seconds"] * 1000
+        over_budget = own > args.budget_ms
+        failed = failed or over_budget or bool(result["loaded"])
+        flag = " !" if over_budget else ""
+        print(f"{module:<32}{result['baseline'] * 1000:>34.1f}{own:>10.1f}{flag:<2}  {', '.join(result['loaded']) or '-'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
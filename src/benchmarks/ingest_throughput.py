@@ -0,0 +1,165 @@
+"""
+Bulk ingest of the Cosmos DB FAQ memory against local stand-ins, no Azure services are needed.
+The fake embedder and container add latency and answer a share of the calls with 429
+(with a retry-after hint) or 503; records whose id ends with the --poison suffix are
+always rejected, and an embedding request over --token-limit words is rejected with 400
+the way Azure OpenAI rejects one over its token limit. The run checks that every other record lands in the container, that
+the poisoned ones are in the failure report, and that resuming retries only those,
+or nothing at all when no record failed and the run left no report.
+It compares against the previous sequential ingest of batches of 5.
+
+    python benchmarks/ingest_throughput.py --records 5000 --throttle 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.cosmos_ingest import bulk_ingest
+
+
+class ServiceError(Exception):
+    """Error shaped like the Azure SDK errors: a status code and response headers."""
+
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeServices:
+    """Embedding service and Cosmos container stand-ins with latency and throttling."""
+
+    def __init__(self, throttle: float, latency_ms: float, poison: str, seed: int, token_limit: int = 0):
+        self.throttle = throttle
+        self.token_limit = token_limit
+        self.latency = latency_ms / 1000
+        self.poison = poison
+        self.rng = random.Random(seed)
+        self.container = {}
+        self.embedding_calls = 0
+        self.upsert_calls = 0
+        self.throttled = 0
+
+    async def _call(self):
+        await asyncio.sleep(self.latency)
+        roll = self.rng.random()
+        if roll < self.throttle:
+            self.throttled += 1
+            raise ServiceError(429, {"x-ms-retry-after-ms": "5"})
+        if roll < self.throttle * 1.2:
+            raise ServiceError(503)
+
+    async def embed(self, texts):
+        self.embedding_calls += 1
+        await self._call()
+        if self.token_limit and sum(len(text.split()) for text in texts) > self.token_limit:
+            raise ServiceError(400)
+        return np.ones((len(texts), 8), dtype=np.float32)
+
+    async def upsert(self, records):
+        self.upsert_calls += 1
+        await self._call()
+        if any(record.id.endswith(self.poison) for record in records):
+            raise ServiceError(400)
+        for record in records:
+            self.container[record.id] = record
+        return [record.id for record in records]
+
+
+async def sequential_ingest(records, services):
+    """The previous ingest: batches of 5, embedded one batch at a time, errors skipped."""
+    for i in range(0, len(records), 5):
+        batch = records[i:i + 5]
+        try:
+            vectors = await services.embed([record.content for record in batch])
+            for record, vector in zip(batch, vectors):
+                record.embedding = vector.tolist()
+            await services.upsert(batch)
+        except Exception:
+            continue
+
+
+async def run(args):
+    records = [SimpleNamespace(id=f"{i:07d}", content=f"Question {i}", embedding=None) for i in range(args.records)]
+    poisoned = {record.id for record in records if record.id.endswith(args.poison)}
+    report_path = os.path.join(tempfile.mkdtemp(), "ingest-report.json")
+
+    baseline = FakeServices(args.throttle, args.latency_ms, args.poison, args.seed)
+    start = time.perf_counter()
+    await sequential_ingest(records, baseline)
+    sequential_seconds = time.perf_counter() - start
+
+    services = FakeServices(args.throttle, args.latency_ms, args.poison, args.seed, args.token_limit)
+    start = time.perf_counter()
+    report = await bulk_ingest(
+        records,
+        embed=services.embed,
+        upsert=services.upsert,
+        embedding_batch_size=args.embedding_batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+        concurrency=args.concurrency,
+        max_attempts=10,
+        report_path=report_path,
+    )
+    bulk_seconds = time.perf_counter() - start
+
+    # Resuming only retries the reported records, which fail again
+    services.rng.seed(args.seed)
+    resumed = await bulk_ingest(
+        records, embed=services.embed, upsert=services.upsert, upsert_batch_size=1, report_path=report_path, resume=True,
+    )
+
+    print(f"{args.records} records, {args.throttle:.0%} throttled calls, {args.latency_ms:.0f} ms per call")
+    print(f"{'ingest':<12}{'seconds':>10}{'records/s':>12}{'stored':>10}{'calls':>8}")
+    print(f"{'sequential':<12}{sequential_seconds:>10.2f}{args.records / sequential_seconds:>12.0f}"
+          f"{len(baseline.container):>10}{baseline.embedding_calls + baseline.upsert_calls:>8}")
+    print(f"{'bulk':<12}{bulk_seconds:>10.2f}{args.records / bulk_seconds:>12.0f}"
+          f"{len(services.container):>10}{services.embedding_calls + services.upsert_calls:>8}")
+    print(f"throttled calls retried: {services.throttled}, reported failures: {len(report.failed)}")
+
+    # A clean run removes the report, resuming after it must not ingest everything again
+    calls = services.embedding_calls
+    resumed_clean = await bulk_ingest(
+        records, embed=services.embed, upsert=services.upsert, report_path=report_path + ".missing", resume=True,
+    )
+
+    lost = {record.id for record in records} - poisoned - set(services.container)
+    problems = []
+    if lost:
+        problems.append(f"lost {len(lost)} records")
+    if not set(report.failed) >= poisoned:
+        problems.append(f"{len(poisoned - set(report.failed))} poisoned records not reported")
+    if set(resumed.failed) != poisoned or resumed.total != len(report.failed):
+        problems.append(f"resume retried {resumed.total} records for {len(report.failed)} reported")
+    if resumed_clean.total or services.embedding_calls != calls:
+        problems.append(f"resume without a report ingested {resumed_clean.total} records")
+    print("check:", "FAILED, " + "; ".join(problems) if problems else "ok")
+    return not problems
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--throttle", type=float, default=0.1, help="Share of calls answered with 429")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--poison", default="777", help="Records whose id ends with this always fail")
+    parser.add_argument("--embedding-batch-size", type=int, default=2048)
+    parser.add_argument("--token-limit", type=int, default=1000, help="Words per embedding request before it is rejected, 0 for none")
+    parser.add_argument("--upsert-batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
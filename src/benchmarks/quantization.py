@@ -0,0 +1,57 @@
+"""
+Memory and recall of quantized FAQ index storage (float16, int8) against float32.
+Runs on synthetic clustered vectors, no Azure services are needed.
+
+    python benchmarks/quantization.py --records 100000 --dimensions 1536 --rerank 4
+"""
+import argparse
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.faq_index import FAQVectorIndex
+from benchmarks.ann_recall import synthetic_vectors, timed_search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(args.records, args.dimensions, args.clusters, rng)
+    records = [SimpleNamespace(id=str(i), question="") for i in range(args.records)]
+    queries = vectors[rng.choice(args.records, args.queries, replace=False)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    baseline = FAQVectorIndex(dimensions=args.dimensions)
+    baseline.build(records, vectors)
+    truth, _ = timed_search(baseline, queries, args.limit)
+
+    print(f"{args.records} records x {args.dimensions} dims")
+    print(f"{'storage':<18}{'MB':>10}{'recall@' + str(args.limit):>12}{'p50 ms':>10}{'p99 ms':>10}")
+    configurations = [("float32", 0), ("float16", 0), ("int8", 0), ("float16", args.rerank), ("int8", args.rerank)]
+    for storage, rerank in configurations:
+        index = FAQVectorIndex(dimensions=args.dimensions, storage=storage, rerank=rerank)
+        index.build(records, vectors)
+        found, latencies = timed_search(index, queries, args.limit)
+        recall = np.mean([len(set(f) & set(t)) / max(len(t), 1) for f, t in zip(found, truth)])
+        label = f"{storage} rerank={rerank}" if rerank else storage
+        print(
+            f"{label:<18}{index.nbytes / 2**20:>10.1f}{recall:>12.3f}"
+            f"{np.percentile(latencies, 50):>10.3f}{np.percentile(latencies, 99):>10.3f}"
+        )
+    print("MB counts the in-memory vector buffers; re-ranking from a memory-mapped sidecar adds none.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import json
+import logging
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+# Bulk ingest of FAQ records into the Cosmos DB collection.
+# Records are embedded in batches of up to EMBEDDING_BATCH_MAX texts and about
+# EMBEDDING_BATCH_MAX_TOKENS tokens, the Azure OpenAI limits per embeddings request, and
+# upserted in smaller chunks. Token counts are estimated from the text length; a batch the
+# service still rejects is halved until the offending record is isolated. At most `concurrency`
+# embedding calls and `concurrency` upsert calls are in flight at a time. Throttled
+# (429) and transient failures are retried with exponential backoff and jitter,
+# honouring the retry-after hint of the service when it sends one. Records that still
+# fail are written to a JSON failure report; ingesting again with resume=True only
+# retries the records listed in it, and ingests nothing once a run left no report.
+
+T = TypeVar("T")
+
+# Maximum number of inputs per Azure OpenAI embeddings request
+EMBEDDING_BATCH_MAX = 2048
+
+# Maximum number of tokens summed over the inputs of an Azure OpenAI embeddings request
+EMBEDDING_BATCH_MAX_TOKENS = 300_000
+
+# Characters per token of the estimate, on the low side so batches rarely exceed the limit
+CHARS_PER_TOKEN = 3
+
+# HTTP status codes worth retrying: timeouts, throttling, Cosmos "retry with" and server errors
+RETRYABLE_STATUS = {408, 429, 449, 500, 502, 503, 504}
+
+# Retry-after headers of Cosmos DB (milliseconds) and Azure OpenAI (seconds)
+_RETRY_AFTER_MS_HEADERS = ("x-ms-retry-after-ms", "retry-after-ms")
+_RETRY_AFTER_HEADERS = ("retry-after",)
+
+
+def _exception_chain(exc: BaseException):
+    # Connectors wrap the SDK errors, the status code is usually on the cause
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status code of an exception or of the error it wraps, if any."""
+    for error in _exception_chain(exc):
+        for name in ("status_code", "status"):
+            code = getattr(error, name, None)
+            if isinstance(code, int):
+                return code
+    return None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Return the delay in seconds the service asked for before retrying, if any."""
+    for error in _exception_chain(exc):
+        headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+        try:
+            for name in _RETRY_AFTER_MS_HEADERS:
+                if headers.get(name) is not None:
+                    return float(headers.get(name)) / 1000
+            for name in _RETRY_AFTER_HEADERS:
+                if headers.get(name) is not None:
+                    return float(headers.get(name))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a failed call is worth retrying."""
+    if isinstance(exc, (ConnectionError, asyncio.TimeoutError)):
+        return True
+    return status_code(exc) in RETRYABLE_STATUS
+
+
+async def with_retry(
+    operation: Callable[[], Awaitable[T]],
+    max_attempts: int = 6,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+) -> T:
+    """
+    Run an async operation, retrying throttled and transient failures with exponential backoff.
+
+    Args:
+        operation (Callable[[], Awaitable[T]]): Creates the call to make, once per attempt
+        max_attempts (int): Attempts before the last error is raised
+        base_delay (float): Delay before the first retry in seconds, doubled on every retry
+        max_delay (float): Upper bound of a single delay in seconds
+
+    Returns:
+        T: The result of the operation
+    """
+    attempt = 1
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt >= max_attempts or not is_retryable(e):
+                raise
+            # Full jitter, unless the service said how long to wait
+            delay = retry_after(e)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            logging.warning(f"Retrying after {type(e).__name__} (status {status_code(e)}), attempt {attempt} in {delay:.2f}s")
+            await asyncio.sleep(min(delay, max_delay))
+            attempt += 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text without a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def embedding_batches(records: Sequence[Any], max_size: int, max_tokens: int) -> List[List[Any]]:
+    """
+    Split records into embedding batches capped by their count and their estimated tokens.
+
+    Args:
+        records (Sequence[Any]): Records exposing a ``content`` attribute
+        max_size (int): Records per batch
+        max_tokens (int): Estimated tokens per batch, a longer record gets a batch of its own
+
+    Returns:
+        List[List[Any]]: The batches, in record order
+    """
+    batches: List[List[Any]] = []
+    batch: List[Any] = []
+    tokens = 0
+    for record in records:
+        record_tokens = estimate_tokens(record.content)
+        if batch and (len(batch) >= max_size or tokens + record_tokens > max_tokens):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(record)
+        tokens += record_tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+@dataclass
+class IngestReport:
+    """Outcome of a bulk ingest; failed maps record ids to their last error."""
+
+    total: int = 0
+    succeeded: int = 0
+    skipped: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    def save(self, path: str) -> None:
+        """Write the report as JSON, atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(asdict(self), file, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IngestReport"]:
+        """Read a report written by save, or return None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(**json.load(file))
+
+
+async def bulk_ingest(
+    records: Sequence[Any],
+    embed: Callable[[List[str]], Awaitable[Any]],
+    upsert: Callable[[List[Any]], Awaitable[Any]],
+    vector_field: str = "embedding",
+    embedding_batch_size: int = EMBEDDING_BATCH_MAX,
+    embedding_batch_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    upsert_batch_size: int = 20,
+    concurrency: int = 8,
+    max_attempts: int = 6,
+    report_path: Optional[str] = None,
+    resume: bool = False,
+) -> IngestReport:
+    """
+    Embed and upsert records with bounded concurrency and retries.
+
+    Args:
+        records (Sequence[Any]): Records exposing ``id`` and ``content`` attributes
+        embed (Callable[[List[str]], Awaitable[Any]]): Embeds a list of texts, one vector per text
+        upsert (Callable[[List[Any]], Awaitable[Any]]): Upserts a list of records carrying their vectors
+        vector_field (str): Record attribute the vector is stored in
+        embedding_batch_size (int): Texts per embedding request, at most EMBEDDING_BATCH_MAX
+        embedding_batch_tokens (int): Estimated tokens per embedding request, at most EMBEDDING_BATCH_MAX_TOKENS
+        upsert_batch_size (int): Records per upsert call
+        concurrency (int): Maximum embedding calls, and upsert calls, in flight
+        max_attempts (int): Attempts per call before its records are reported as failed
+        report_path (Optional[str]): Where the failure report is written, and read from when resuming
+        resume (bool): Only ingest the records that failed in the report at report_path,
+            nothing when there is no report
+
+    Returns:
+        IngestReport: Counts and the failed record ids with their errors
+    """
+    if resume and report_path:
+        previous = IngestReport.load(report_path)
+        if previous is None:
+            # No report: the last ingest went through, or none ran, either way nothing failed
+            logging.info(f"No ingest report at {report_path}, nothing to resume")
+            return IngestReport(total=0)
+        records = [record for record in records if record.id in previous.failed]
+        logging.info(f"Resuming ingest of {len(records)} failed records from {report_path}")
+
+    report = IngestReport(total=len(records))
+    embed_slots = asyncio.Semaphore(concurrency)
+    upsert_slots = asyncio.Semaphore(concurrency)
+    embedding_batch_size = max(1, min(embedding_batch_size, EMBEDDING_BATCH_MAX))
+    embedding_batch_tokens = max(1, min(embedding_batch_tokens, EMBEDDING_BATCH_MAX_TOKENS))
+
+    def fail(batch: Sequence[Any], error: Exception) -> None:
+        for record in batch:
+            report.failed[record.id] = f"{type(error).__name__}: {error}"
+
+    async def upsert_chunk(chunk: List[Any]) -> None:
+        async with upsert_slots:
+            try:
+                await with_retry(lambda: upsert(chunk), max_attempts=max_attempts)
+                report.succeeded += len(chunk)
+                return
+            except Exception as e:
+                error = e
+        if len(chunk) > 1 and not is_retryable(error):
+            # A rejected record fails the whole chunk, upsert one by one to isolate it
+            await asyncio.gather(*(upsert_chunk([record]) for record in chunk))
+            return
+        logging.error(f"Error upserting {len(chunk)} records: {str(error)}")
+        fail(chunk, error)
+
+    async def ingest_batch(batch: List[Any]) -> None:
+        async with embed_slots:
+            try:
+                vectors = await with_retry(lambda: embed([record.content for record in batch]), max_attempts=max_attempts)
+                error = None
+            except Exception as e:
+                error = e
+        if error is not None:
+            if len(batch) > 1 and not is_retryable(error):
+                # Rejected, e.g. over the token limit the estimate missed: halve the batch until it passes
+                half = len(batch) // 2
+                await asyncio.gather(ingest_batch(batch[:half]), ingest_batch(batch[half:]))
+                return
+            logging.error(f"Error embedding {len(batch)} records: {str(error)}")
+            fail(batch, error)
+            return
+        for record, vector in zip(batch, vectors):
+            setattr(record, vector_field, vector.tolist() if hasattr(vector, "tolist") else list(vector))
+        await asyncio.gather(*(
+            upsert_chunk(batch[i:i + upsert_batch_size]) for i in range(0, len(batch), upsert_batch_size)
+        ))
+
+    await asyncio.gather(*(
+        ingest_batch(batch) for batch in embedding_batches(records, embedding_batch_size, embedding_batch_tokens)
+    ))
+
+    if report_path:
+        if report.failed:
+            report.save(report_path)
+            logging.error(f"{len(report.failed)} records failed to ingest, see {report_path}")
+        elif os.path.exists(report_path):
+            # Everything went through, a stale report would resume nothing useful
+            os.remove(report_path)
+    return report
@@ -0,0 +1,171 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from memory.cosmos_ingest import with_retry
+from memory.faq_index import FAQVectorIndex, ScoredMatches
+
+# Local in-process mirror of the Cosmos DB FAQ container.
+# The FAQ corpus is small and changes rarely, so reads can be served from a local
+# FAQVectorIndex instead of a network round trip per search. The mirror follows the
+# container like a change feed: every poll fetches the documents whose `_ts` (last
+# modified, in seconds) is at or after the newest one already seen. Deletes do not
+# show up that way, so every `reconcile_every` polls the stored ids are compared with
+# the mirrored ones. The mirror is only used while its last successful sync is within
+# the staleness bound; before the first sync (cold start) and whenever syncing fails
+# for too long, searches go to Cosmos DB.
+
+DOCUMENTS_SINCE_QUERY = "SELECT * FROM c WHERE c._ts >= @since"
+IDS_QUERY = "SELECT c.id FROM c"
+
+
+class CosmosMirror:
+    """
+    FAQVectorIndex kept in sync with a Cosmos DB container by incremental polling.
+    """
+
+    def __init__(
+        self,
+        container: Any,
+        to_record: Callable[[Dict[str, Any]], Any],
+        index: Optional[FAQVectorIndex] = None,
+        vector_field: str = "embedding",
+        poll_interval: float = 5.0,
+        max_staleness_seconds: float = 60.0,
+        reconcile_every: int = 12,
+    ):
+        """
+        Create an empty mirror, call sync or run to fill it.
+
+        Args:
+            container (Any): Cosmos DB container client (azure.cosmos.aio.ContainerProxy)
+            to_record (Callable[[Dict[str, Any]], Any]): Converts a stored document to a record
+            index (Optional[FAQVectorIndex]): Index holding the mirrored records, exhaustive float32 by default
+            vector_field (str): Document property holding the embedding
+            poll_interval (float): Seconds between two polls of run()
+            max_staleness_seconds (float): Age of the last successful sync after which the mirror is not used
+            reconcile_every (int): Polls between two checks for deleted documents
+        """
+        self.container = container
+        self.to_record = to_record
+        self.index = index if index is not None else FAQVectorIndex()
+        self.vector_field = vector_field
+        self.poll_interval = poll_interval
+        self.max_staleness_seconds = max_staleness_seconds
+        self.reconcile_every = reconcile_every
+        self.last_ts = 0
+        self.synced_at: Optional[float] = None
+        self.syncs = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the mirror has synced at least once and recently enough to serve reads."""
+        return self.synced_at is not None and time.monotonic() - self.synced_at <= self.max_staleness_seconds
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """Seconds since the last successful sync, None before the first one."""
+        return None if self.synced_at is None else time.monotonic() - self.synced_at
+
+    async def _query(self, query: str, parameters: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        async def run_query():
+            return [item async for item in self.container.query_items(query=query, parameters=parameters)]
+
+        return await with_retry(run_query)
+
+    async def sync(self) -> int:
+        """
+        Apply the documents changed since the last sync.
+        `_ts` has a resolution of one second, so documents of the newest second already
+        seen are fetched again; applying them twice is harmless.
+
+        Returns:
+            int: Number of documents applied
+        """
+        started = time.monotonic()
+        documents = await self._query(DOCUMENTS_SINCE_QUERY, [{"name": "@since", "value": self.last_ts}])
+        for document in documents:
+            vector = document.get(self.vector_field)
+            if not vector:
+                continue
+            self.index.add(self.to_record(document), np.asarray(vector, dtype=np.float32))
+            self.last_ts = max(self.last_ts, int(document.get("_ts", 0)))
+        self.synced_at = started
+        self.syncs += 1
+        return len(documents)
+
+    async def reconcile(self) -> int:
+        """
+        Drop mirrored records whose documents were deleted from the container.
+
+        Returns:
+            int: Number of records removed
+        """
+        stored = {item["id"] for item in await self._query(IDS_QUERY)}
+        deleted = [record.id for record in list(self.index.records) if record.id not in stored]
+        for record_id in deleted:
+            self.index.remove(record_id)
+        return len(deleted)
+
+    async def run(self):
+        """
+        Keep the mirror in sync until the task is cancelled.
+        Errors are logged and retried on the next poll; reads fall back to Cosmos DB once
+        the mirror is older than the staleness bound.
+        """
+        polls = 0
+        while True:
+            try:
+                changed = await self.sync()
+                removed = await self.reconcile() if polls % self.reconcile_every == 0 and polls else 0
+                if changed or removed:
+                    logging.info(f"FAQ mirror synced: {changed} changed, {removed} removed, {len(self.index)} records")
+            except Exception as e:
+                logging.error(f"Error syncing the FAQ mirror: {str(e)}")
+            polls += 1
+            await asyncio.sleep(self.poll_interval)
+
+    def add(self, record: Any, vector: Any) -> None:
+        """Apply a local write right away, so it is readable before the next poll."""
+        self.index.add(record, np.asarray(vector, dtype=np.float32))
+
+    def search(
+        self,
+        query_vector: Any,
+        limit: int = 3,
+        score: float = 0.19,
+        category: Optional[str] = None,
+        item_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> ScoredMatches:
+        """
+        Search the mirrored records.
+
+        Args:
+            query_vector (Any): The query embedding
+            limit (int): Maximum number of results
+            score (float): Cosine distance threshold, only closer records are returned
+            category (Optional[str]): Required category
+            item_type (Optional[str]): Required item type
+            tags (Optional[List[str]]): Records must carry at least one of these tags
+
+        Returns:
+            ScoredMatches: Matching records and their cosine distance, closest first
+        """
+        rows = self.index.filter_rows(category, item_type, tags)
+        if rows is not None and rows.size == 0:
+            return ScoredMatches([])
+        return self.index.search_scored(query_vector, limit=limit, score=score, rows=rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self.index),
+            "fresh": self.is_fresh,
+            "staleness_seconds": self.staleness,
+            "syncs": self.syncs,
+        }
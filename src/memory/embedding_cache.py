@@ -0,0 +1,191 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Query embedding cache.
+# Maps normalized query text to its embedding so repeated questions skip the
+# embedding round trip. Entries are evicted least-recently-used once the cache
+# is full and expire after a time-to-live. The cache can be saved to an .npz file
+# and loaded again on the next start; the file records the embedding model and
+# dimensions, and a file written for another model is ignored.
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for cache lookups: case-folded with collapsed whitespace."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache with TTL mapping normalized query text to an embedding vector.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        ttl_seconds: Optional[float] = 3600,
+        persist_path: Optional[str] = None,
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None,
+    ):
+        """
+        Create the cache.
+
+        Args:
+            max_size (int): Maximum number of cached queries, 0 disables the cache
+            ttl_seconds (Optional[float]): Seconds an entry stays valid, None to never expire
+            persist_path (Optional[str]): .npz file used by ``load`` and ``save``
+            model (Optional[str]): Embedding model of the vectors, a saved file of another model is not loaded
+            dimensions (Optional[int]): Embedding dimensions, a saved file of other dimensions is not loaded
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self.model = model
+        self.dimensions = dimensions
+        self.hits = 0
+        self.misses = 0
+        # key -> (vector, wall-clock time the vector was stored)
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Return the cached embedding of a query, or None on a miss.
+
+        Args:
+            text (str): The query text
+
+        Returns:
+            Optional[np.ndarray]: The cached vector
+        """
+        key = normalize_query(text)
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry[1]):
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, text: str, vector) -> None:
+        """
+        Store the embedding of a query, evicting the least recently used entries if full.
+
+        Args:
+            text (str): The query text
+            vector: Its embedding
+        """
+        if self.max_size <= 0:
+            return
+        key = normalize_query(text)
+        self._entries[key] = (np.asarray(vector, dtype=np.float32), time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def embed(self, texts: List[str], embed: Callable[[List[str]], Awaitable]) -> np.ndarray:
+        """
+        Embed queries, calling ``embed`` once for the texts that are not cached.
+
+        Args:
+            texts (List[str]): The query texts
+            embed (Callable[[List[str]], Awaitable]): Coroutine function embedding a list of texts
+
+        Returns:
+            np.ndarray: One vector per query, in the same order
+        """
+        vectors: List[Optional[np.ndarray]] = [self.get(text) for text in texts]
+        # Embed every distinct missing query once
+        missing: Dict[str, List[int]] = {}
+        for position, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(normalize_query(texts[position]), []).append(position)
+        if missing:
+            positions = list(missing.values())
+            embedded = await embed([texts[group[0]] for group in positions])
+            for group, vector in zip(positions, embedded):
+                self.put(texts[group[0]], vector)
+                for position in group:
+                    vectors[position] = np.asarray(vector, dtype=np.float32)
+        return np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the size and hit/miss counters of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+
+    def save(self) -> None:
+        """Write the unexpired entries to ``persist_path``, if configured."""
+        if not self.persist_path:
+            return
+        entries = [(key, vector, stored) for key, (vector, stored) in self._entries.items() if not self._expired(stored)]
+        if not entries:
+            return
+        keys, vectors, stored = zip(*entries)
+        tmp_path = self.persist_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            keys=np.array(keys),
+            vectors=np.stack(vectors),
+            stored=np.array(stored),
+            model=np.array(self.model or ""),
+        )
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self) -> int:
+        """
+        Load entries saved by ``save``, skipping expired ones.
+        A file saved for another embedding model or dimensions is ignored.
+
+        Returns:
+            int: Number of entries loaded
+        """
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return 0
+        try:
+            with np.load(self.persist_path) as data:
+                keys, vectors, stored = data["keys"], data["vectors"], data["stored"]
+                model = str(data["model"])
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Could not load query embedding cache: {str(e)}")
+            return 0
+        if model != (self.model or "") or (self.dimensions is not None and vectors.ndim == 2 and vectors.shape[1] != self.dimensions):
+            # Vectors of another model would be compared with the index silently
+            logging.warning(f"Ignoring query embedding cache built for model {model or 'unknown'} with {vectors.shape[-1]} dimensions")
+            return 0
+        loaded = 0
+        for key, vector, stored_at in zip(keys.tolist(), vectors, stored.tolist()):
+            if not self._expired(stored_at):
+                self._entries[key] = (vector, stored_at)
+                loaded += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return loaded
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
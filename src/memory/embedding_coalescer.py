@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Micro-batching of concurrent embedding requests.
+# Under load every concurrent search embeds its query with a separate HTTP call. The
+# coalescer holds requests for at most `window_ms`, or until `max_batch_size` texts are
+# waiting, sends all of their texts in one embedding call (identical texts only once)
+# and hands each caller its own rows. Requests that are already large batches, such as
+# embedding the corpus, go straight to the embedder.
+
+
+class EmbeddingCoalescer:
+    """
+    Drop-in wrapper of an embedding service that merges concurrent generate_embeddings calls.
+    """
+
+    def __init__(self, embedder: Any, window_ms: float = 5.0, max_batch_size: int = 64):
+        """
+        Wrap an embedding service.
+
+        Args:
+            embedder (Any): Service with an async generate_embeddings(texts) method, e.g. AzureTextEmbedding
+            window_ms (float): Longest time a request waits for others to join its batch
+            max_batch_size (int): Texts that trigger an immediate call; larger requests bypass the coalescer
+        """
+        self.embedder = embedder
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.embedded = 0
+        self.largest_batch = 0
+        self.bypassed = 0
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._calls: Set[asyncio.Task] = set()
+
+    async def generate_embeddings(self, texts: List[str], settings: Optional[Any] = None, batch_size: Optional[int] = None, **kwargs: Any) -> np.ndarray:
+        """
+        Embed texts, batched together with the concurrent requests of the same window.
+
+        Args:
+            texts (List[str]): The texts
+            settings (Optional[Any]): Embedding settings; requests with settings are not coalesced
+            batch_size (Optional[int]): Passed on to the embedder for requests that bypass the coalescer
+
+        Returns:
+            np.ndarray: One embedding per text
+        """
+        texts = list(texts)
+        if not texts or len(texts) >= self.max_batch_size or settings is not None or kwargs:
+            self.bypassed += 1
+            return await self.embedder.generate_embeddings(texts, settings=settings, batch_size=batch_size, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_texts += len(texts)
+        self.requests += 1
+        self.texts += len(texts)
+        if self._pending_texts >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_texts = self._pending, [], 0
+        if batch:
+            call = asyncio.ensure_future(self._embed_batch(batch))
+            self._calls.add(call)
+            call.add_done_callback(self._calls.discard)
+
+    async def _embed_batch(self, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        # Identical texts of different callers are embedded once
+        positions: Dict[str, int] = {}
+        for texts, _ in batch:
+            for text in texts:
+                positions.setdefault(text, len(positions))
+        self.batches += 1
+        self.embedded += len(positions)
+        self.largest_batch = max(self.largest_batch, len(positions))
+        try:
+            vectors = np.asarray(await self.embedder.generate_embeddings(list(positions)))
+        except Exception as e:
+            logging.error(f"Error embedding a batch of {len(positions)} texts for {len(batch)} requests: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for texts, future in batch:
+            # A caller may have been cancelled while waiting
+            if not future.done():
+                future.set_result(vectors[[positions[text] for text in texts]])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "embedded": self.embedded,
+            "mean_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "bypassed": self.bypassed,
+        }
@@ -0,0 +1,192 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from memory.faq_index import FAQVectorIndex, ScoredMatches, normalize_rows
+
+# Approximate nearest neighbour index for large FAQ collections.
+# IVF-flat: the normalized vectors are clustered with spherical k-means into `nlist`
+# inverted lists. A query is compared against the centroids first and only the rows
+# of the `nprobe` closest lists are scored exactly. Raising `nprobe` trades latency for
+# recall; nprobe == nlist is equivalent to the exhaustive FAQVectorIndex.
+
+
+class IVFFlatIndex(FAQVectorIndex):
+    """
+    FAQVectorIndex that restricts scoring to the inverted lists closest to the query.
+    Until the index holds `min_train_size` records it behaves like the exhaustive index.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = 1536,
+        storage: str = "float32",
+        rerank: int = 0,
+        nlist: int = 256,
+        nprobe: int = 8,
+        min_train_size: Optional[int] = None,
+        train_iterations: int = 10,
+        seed: int = 0,
+    ):
+        """
+        Create an empty IVF index.
+
+        Args:
+            dimensions (int): Size of the embedding vectors
+            storage (str): Vector storage, "float32", "float16" or "int8"
+            rerank (int): Full-precision re-ranking factor for quantized storage
+            nlist (int): Number of inverted lists (k-means clusters)
+            nprobe (int): Number of lists scored per query
+            min_train_size (Optional[int]): Records needed before clustering, defaults to 39 * nlist
+            train_iterations (int): k-means iterations used when training
+            seed (int): Seed of the k-means initialization
+        """
+        super().__init__(dimensions, storage, rerank)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size if min_train_size is not None else 39 * nlist
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._assignments: List[int] = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def build(self, records: Sequence[Any], vectors: Any, full_vectors: Optional[np.ndarray] = None) -> None:
+        super().build(records, vectors, full_vectors)
+        self.centroids = None
+        if len(self.records) >= self.min_train_size:
+            self.train()
+
+    def train(self) -> None:
+        """Cluster the indexed vectors and rebuild the inverted lists."""
+        matrix = self.vectors()
+        if matrix.shape[0] == 0:
+            return
+        nlist = min(self.nlist, matrix.shape[0])
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(matrix.shape[0], 256 * nlist)
+        sample = matrix[rng.choice(matrix.shape[0], sample_size, replace=False)]
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if members.shape[0]:
+                    centroids[c] = members.sum(axis=0)
+                else:
+                    # Re-seed empty clusters with a random sample
+                    centroids[c] = sample[rng.integers(sample_size)]
+            centroids = normalize_rows(centroids)
+
+        self.centroids = centroids
+        assignments = self._assign(matrix)
+        self._assignments = assignments.tolist()
+        self._lists = [[] for _ in range(nlist)]
+        for position, c in enumerate(self._assignments):
+            self._lists[c].append(position)
+        self._list_arrays = {}
+        logging.info(f"Trained IVF index with {nlist} lists over {matrix.shape[0]} records")
+
+    def add(self, record: Any, vector: Any) -> int:
+        position = super().add(record, vector)
+        if not self.is_trained:
+            if len(self.records) >= self.min_train_size:
+                self.train()
+            return position
+
+        c = int(self._assign(self.vectors(np.array([position])))[0])
+        if position < len(self._assignments):
+            # Replaced record: move it to its new list
+            previous = self._assignments[position]
+            if previous == c:
+                return position
+            self._lists[previous].remove(position)
+            self._list_arrays.pop(previous, None)
+            self._assignments[position] = c
+        else:
+            self._assignments.append(c)
+        self._lists[c].append(position)
+        self._list_arrays.pop(c, None)
+        return position
+
+    def remove(self, record_id: str) -> bool:
+        position = self._positions.get(record_id)
+        if position is not None and self.is_trained:
+            # Mirror the move of the last row into the removed position
+            last = len(self.records) - 1
+            removed = self._assignments[position]
+            self._lists[removed].remove(position)
+            self._list_arrays.pop(removed, None)
+            if position != last:
+                moved = self._assignments[last]
+                members = self._lists[moved]
+                members[members.index(last)] = position
+                self._list_arrays.pop(moved, None)
+                self._assignments[position] = moved
+            self._assignments.pop()
+        return super().remove(record_id)
+
+    def candidates(self, query_vectors: Any) -> List[np.ndarray]:
+        """
+        Return the rows of the `nprobe` lists closest to each query.
+
+        Args:
+            query_vectors (Any): One query embedding per row
+
+        Returns:
+            List[np.ndarray]: Sorted candidate rows for each query
+        """
+        queries = normalize_rows(query_vectors)
+        nprobe = min(self.nprobe, self.centroids.shape[0])
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        return [np.sort(np.concatenate([self._list_rows(int(c)) for c in probe])) for probe in probes]
+
+    def search_scored(
+        self,
+        query_vector: Any,
+        limit: int = 3,
+        score: float = 0.19,
+        rows: Optional[np.ndarray] = None,
+    ) -> ScoredMatches:
+        if not self.is_trained:
+            return super().search_scored(query_vector, limit, score, rows)
+        candidates = self._restrict(self.candidates(query_vector)[0], rows)
+        return super().search_scored(query_vector, limit, score, candidates)
+
+    def search_many(
+        self,
+        query_vectors: Any,
+        limit: int = 3,
+        score: float = 0.19,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[Any, float]]]:
+        if not self.is_trained:
+            return super().search_many(query_vectors, limit, score, rows)
+        queries = normalize_rows(query_vectors)
+        return [
+            super(IVFFlatIndex, self).search_scored(query, limit, score, self._restrict(candidates, rows)).matches
+            for query, candidates in zip(queries, self.candidates(queries))
+        ]
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _list_rows(self, c: int) -> np.ndarray:
+        rows = self._list_arrays.get(c)
+        if rows is None:
+            rows = np.asarray(self._lists[c], dtype=np.int64)
+            self._list_arrays[c] = rows
+        return rows
+
+    @staticmethod
+    def _restrict(candidates: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        return candidates if rows is None else np.intersect1d(candidates, rows, assume_unique=True)
@@ -0,0 +1,211 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.faq_index import normalize_rows
+
+# Precomputed embedding sidecar for the FAQ corpus.
+# The embeddings of cosmosdb-qna-items.json are stored next to it as a .npy matrix
+# plus a JSON manifest mapping every record id to its row and content hash.
+# FAQMemory memory-maps the matrix on startup and only embeds records whose hash changed.
+
+SIDECAR_VERSION = 1
+
+
+def content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest identifying a record's embedded content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def sidecar_paths(json_file_path: str) -> Tuple[str, str]:
+    """
+    Return the sidecar file paths for a FAQ JSON file.
+
+    Args:
+        json_file_path (str): Path of the FAQ JSON file
+
+    Returns:
+        Tuple[str, str]: Paths of the ``.npy`` vectors and of the JSON manifest
+    """
+    base, _ = os.path.splitext(json_file_path)
+    return f"{base}.embeddings.npy", f"{base}.embeddings.json"
+
+
+def load_sidecar(
+    json_file_path: str,
+    model: Optional[str],
+    dimensions: int,
+) -> Optional[Tuple[np.ndarray, Dict[str, Tuple[int, str]]]]:
+    """
+    Memory-map the embedding sidecar of a FAQ JSON file.
+
+    Args:
+        json_file_path (str): Path of the FAQ JSON file
+        model (Optional[str]): Embedding deployment the vectors must come from
+        dimensions (int): Expected vector size
+
+    Returns:
+        Optional[Tuple[np.ndarray, Dict[str, Tuple[int, str]]]]: The read-only vector matrix and
+        a map of record id to ``(row, content hash)``, or None if the sidecar is missing or stale
+    """
+    vectors_path, manifest_path = sidecar_paths(json_file_path)
+    if not (os.path.exists(vectors_path) and os.path.exists(manifest_path)):
+        return None
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get("version") != SIDECAR_VERSION:
+            logging.warning(f"Ignoring embedding sidecar with version {manifest.get('version')}")
+            return None
+        if manifest.get("model") != model or manifest.get("dimensions") != dimensions:
+            logging.warning(f"Ignoring embedding sidecar built for model {manifest.get('model')}")
+            return None
+
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if vectors.ndim != 2 or vectors.shape[1] != dimensions or vectors.shape[0] != len(manifest["items"]):
+            logging.warning(f"Ignoring embedding sidecar with shape {vectors.shape}")
+            return None
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Could not load embedding sidecar: {str(e)}")
+        return None
+
+    entries = {item["id"]: (row, item["hash"]) for row, item in enumerate(manifest["items"])}
+    return vectors, entries
+
+
+def write_sidecar(
+    json_file_path: str,
+    records: Sequence,
+    vectors: np.ndarray,
+    model: Optional[str],
+) -> None:
+    """
+    Write the embedding sidecar of a FAQ JSON file.
+    Both files are written to temporary paths first and moved into place, so readers never see
+    a partially written sidecar.
+
+    Args:
+        json_file_path (str): Path of the FAQ JSON file
+        records (Sequence): Records exposing ``id`` and ``content`` attributes
+        vectors (np.ndarray): One embedding per record, in the same order, stored normalized
+        model (Optional[str]): Embedding deployment the vectors come from
+    """
+    vectors_path, manifest_path = sidecar_paths(json_file_path)
+    vectors = normalize_rows(vectors)
+    manifest = {
+        "version": SIDECAR_VERSION,
+        "model": model,
+        "dimensions": int(vectors.shape[1]),
+        "items": [{"id": record.id, "hash": content_hash(record.content)} for record in records],
+    }
+
+    with open(vectors_path + ".tmp", 'wb') as file:
+        np.save(file, vectors)
+    with open(manifest_path + ".tmp", 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(vectors_path + ".tmp", vectors_path)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def split_by_sidecar(
+    records: Sequence,
+    sidecar: Optional[Tuple[np.ndarray, Dict[str, Tuple[int, str]]]],
+    dimensions: int,
+) -> Tuple[np.ndarray, List[int]]:
+    """
+    Fill a vector matrix from the sidecar and report the records that still need embedding.
+
+    Args:
+        records (Sequence): Records exposing ``id`` and ``content`` attributes
+        sidecar: Result of ``load_sidecar``, or None
+        dimensions (int): Vector size
+
+    Returns:
+        Tuple[np.ndarray, List[int]]: Matrix with one row per record, and the positions of
+        the records whose rows are missing because they are new or their content changed
+    """
+    vectors = np.empty((len(records), dimensions), dtype=np.float32)
+    missing = []
+    cached_vectors, entries = sidecar if sidecar is not None else (None, {})
+    for position, record in enumerate(records):
+        entry = entries.get(record.id)
+        if entry is not None and entry[1] == content_hash(record.content):
+            vectors[position] = cached_vectors[entry[0]]
+        else:
+            missing.append(position)
+    return vectors, missing
+
+
+def aligned_sidecar_vectors(
+    records: Sequence,
+    sidecar: Optional[Tuple[np.ndarray, Dict[str, Tuple[int, str]]]],
+) -> Optional[np.ndarray]:
+    """
+    Return the memory-mapped sidecar matrix if its rows are exactly the records, in order and unchanged.
+    Quantized FAQ indexes re-rank from it without holding a full-precision copy in memory.
+
+    Args:
+        records (Sequence): Records exposing ``id`` and ``content`` attributes
+        sidecar: Result of ``load_sidecar``, or None
+
+    Returns:
+        Optional[np.ndarray]: The sidecar matrix, or None if it does not line up with the records
+    """
+    if sidecar is None:
+        return None
+    vectors, entries = sidecar
+    if vectors.shape[0] != len(records):
+        return None
+    for position, record in enumerate(records):
+        entry = entries.get(record.id)
+        if entry is None or entry[0] != position or entry[1] != content_hash(record.content):
+            return None
+    return vectors
+
+
+async def build(json_file_path: Optional[str] = None, force: bool = False) -> int:
+    """
+    Embed the FAQ corpus and write its sidecar, reusing unchanged vectors unless forced.
+
+    Args:
+        json_file_path (Optional[str]): FAQ JSON file, defaults to the one used by FAQMemory
+        force (bool): Re-embed every record even if the sidecar already has it
+
+    Returns:
+        int: Number of records that were embedded
+    """
+    from memory.faq_memory import EMBEDDING_DIMENSIONS, FAQMemory
+    from memory.settings import get_settings
+
+    embedding_model = get_settings().embedding_model
+
+    faq_memory = FAQMemory(json_file_path) if json_file_path else FAQMemory()
+    json_file_path = faq_memory.json_file_path
+    sidecar = None if force else load_sidecar(json_file_path, embedding_model, EMBEDDING_DIMENSIONS)
+    vectors, missing = split_by_sidecar(faq_memory.records, sidecar, EMBEDDING_DIMENSIONS)
+    if missing:
+        embedded = await faq_memory._embed([faq_memory.records[i].content for i in missing])
+        vectors[missing] = np.asarray(embedded, dtype=np.float32)
+
+    write_sidecar(json_file_path, faq_memory.records, vectors, embedding_model)
+    print(f"Embedded {len(missing)} of {len(faq_memory.records)} records into {sidecar_paths(json_file_path)[0]}")
+    return len(missing)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed embedding sidecar for the FAQ corpus.")
+    parser.add_argument("--json", dest="json_file_path", default=None, help="FAQ JSON file to embed")
+    parser.add_argument("--force", action="store_true", help="Re-embed every record")
+    args = parser.parse_args()
+    asyncio.run(build(args.json_file_path, args.force))
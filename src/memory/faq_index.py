@@ -0,0 +1,547 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Vectorized FAQ index.
+# All record vectors live in one contiguous float32 matrix whose rows are L2-normalized
+# up front, so cosine distance for a query is a single matrix-vector product.
+# Scores follow the InMemoryCollection convention used before: cosine *distance*,
+# lower is better, and a record matches when its distance is below the threshold.
+# Questions and their alias phrasings are also kept in a hash index of normalized
+# text, so verbatim questions are answered without embedding the query.
+# Category, item type and individual tags are kept in inverted indexes (value -> rows)
+# so filtered searches only score the matching subset.
+# Vectors can be stored as float32, float16 or int8 with a per-row scale to cut memory;
+# quantized indexes optionally re-rank their top candidates at full precision.
+# Quantized storage trades latency for memory: the rows are decoded to float32 while
+# scoring, and NumPy's float16 conversion in particular is several times slower than
+# the float32 product itself (see benchmarks/quantization.py).
+
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Rows decoded to float32 at a time when scoring a quantized matrix, small enough for the
+# decoded block to stay in cache
+SCORE_BLOCK_ROWS = 256
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+@dataclass
+class ScoredMatches:
+    """
+    Result of a thresholded top-k search.
+    matches holds ``(record, cosine distance)`` pairs, closest first, already thresholded
+    and truncated; best_distance is the distance of the closest candidate even when it
+    missed the threshold, None when nothing was scored.
+    """
+
+    matches: List[Tuple[Any, float]]
+    best_distance: Optional[float] = None
+
+    @property
+    def records(self) -> List[Any]:
+        return [record for record, _ in self.matches]
+
+
+def normalize_question(text: str) -> str:
+    """Normalize question text for exact lookups: case, punctuation and whitespace are ignored."""
+    return " ".join(_NON_WORD.sub(" ", unicodedata.normalize("NFKC", text).casefold()).split())
+
+
+def quantize_rows(matrix: np.ndarray, storage: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Encode normalized float32 rows for the given storage mode.
+
+    Args:
+        matrix (np.ndarray): 2-D float32 matrix
+        storage (str): One of "float32", "float16" or "int8"
+
+    Returns:
+        Tuple[np.ndarray, Optional[np.ndarray]]: The encoded rows and, for int8, the per-row scales
+    """
+    if storage == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    return matrix.astype(STORAGE_DTYPES[storage], copy=False), None
+
+
+def split_tags(tags: Any) -> List[str]:
+    """Return the individual tags of a record's comma-joined ``tags`` string (or list)."""
+    if not tags:
+        return []
+    items = tags.split(",") if isinstance(tags, str) else tags
+    return [tag for tag in dict.fromkeys(item.strip().casefold() for item in items) if tag]
+
+
+# Record attributes with an inverted index, and how to extract their values
+FILTER_FIELDS = {
+    "category": lambda record: [getattr(record, "category", None) or ""],
+    "item_type": lambda record: [getattr(record, "item_type", None) or ""],
+    "tag": lambda record: split_tags(getattr(record, "tags", "")),
+}
+
+
+def question_keys(record: Any) -> List[str]:
+    """Return the normalized question and alias keys of a record."""
+    texts = [getattr(record, "question", "")] + list(getattr(record, "aliases", None) or [])
+    return [key for key in dict.fromkeys(normalize_question(text) for text in texts if text) if key]
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """
+    Convert vectors to a float32 matrix with L2-normalized rows.
+
+    Args:
+        vectors (Any): A single vector or a sequence of vectors
+
+    Returns:
+        np.ndarray: 2-D float32 array with unit-length rows (zero rows are left as zeros)
+    """
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class FAQVectorIndex:
+    """
+    Exhaustive cosine index over FAQ records backed by a NumPy matrix.
+    Records are kept in insertion order; the row of a record in the matrix is its position.
+    """
+
+    def __init__(self, dimensions: int = 1536, storage: str = "float32", rerank: int = 0):
+        """
+        Create an empty index.
+
+        Args:
+            dimensions (int): Size of the embedding vectors
+            storage (str): Vector storage, "float32", "float16" or "int8" (per-row scaled);
+                quantized storage cuts memory but scores slower, float16 the most
+            rerank (int): For quantized storage, re-rank ``rerank * limit`` candidates at full
+                precision; 0 disables re-ranking and keeps no full-precision copy
+        """
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown vector storage '{storage}', expected one of {list(STORAGE_DTYPES)}")
+        self.dimensions = dimensions
+        self.storage = storage
+        self.rerank = rerank if storage != "float32" else 0
+        self.records: List[Any] = []
+        self._positions: Dict[str, int] = {}
+        # Normalized question -> rows of the records claiming it, the first one answers lookups
+        self._exact: Dict[str, List[int]] = {}
+        self._postings: Dict[str, Dict[str, Set[int]]] = {name: {} for name in FILTER_FIELDS}
+        self._matrix = np.empty((0, dimensions), dtype=STORAGE_DTYPES[storage])
+        self._scales: Optional[np.ndarray] = np.empty(0, dtype=np.float32) if storage == "int8" else None
+        self._full: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._positions
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vector buffers of the indexed records."""
+        count = len(self.records)
+        size = self._matrix[:count].nbytes
+        if self._scales is not None:
+            size += self._scales[:count].nbytes
+        if self._full is not None and not isinstance(self._full, np.memmap):
+            size += self._full[:count].nbytes
+        return size
+
+    def vectors(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return indexed vectors decoded to float32.
+
+        Args:
+            rows (Optional[np.ndarray]): Rows to decode, all rows by default
+
+        Returns:
+            np.ndarray: One normalized (or dequantized) vector per row
+        """
+        selection = slice(0, len(self.records)) if rows is None else rows
+        block = self._matrix[selection].astype(np.float32, copy=False)
+        if self._scales is not None:
+            block = block * self._scales[selection][:, None]
+        return block
+
+    def get(self, record_id: str) -> Optional[Any]:
+        """Return the record stored under the given id, if any."""
+        position = self._positions.get(record_id)
+        return self.records[position] if position is not None else None
+
+    def lookup(self, text: str) -> Optional[Any]:
+        """
+        Return the record whose question or alias matches the text after normalization.
+
+        Args:
+            text (str): The query text
+
+        Returns:
+            Optional[Any]: The matching record, or None
+        """
+        positions = self._exact.get(normalize_question(text))
+        return self.records[positions[0]] if positions else None
+
+    def filter_rows(
+        self,
+        category: Optional[str] = None,
+        item_type: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Return the rows matching every given filter, using the inverted indexes.
+        The cost is proportional to the size of the matching posting lists, not of the corpus.
+
+        Args:
+            category (Optional[str]): Required category
+            item_type (Optional[str]): Required item type
+            tags (Optional[Iterable[str]]): Rows must carry at least one of these tags
+
+        Returns:
+            Optional[np.ndarray]: Sorted matching rows, or None when no filter is given
+        """
+        postings: List[Set[int]] = []
+        if category:
+            postings.append(self._postings["category"].get(category, set()))
+        if item_type:
+            postings.append(self._postings["item_type"].get(item_type, set()))
+        if tags is not None:
+            tag_rows: Set[int] = set()
+            for tag in split_tags(list(tags)):
+                tag_rows |= self._postings["tag"].get(tag, set())
+            postings.append(tag_rows)
+        if not postings:
+            return None
+
+        postings.sort(key=len)
+        matches = [row for row in postings[0] if all(row in other for other in postings[1:])]
+        return np.array(sorted(matches), dtype=np.int64)
+
+    def _index_record(self, position: int) -> None:
+        record = self.records[position]
+        # The first record claiming a normalized question answers it, later duplicates take over on removal
+        for key in question_keys(record):
+            self._exact.setdefault(key, []).append(position)
+        for name, values in FILTER_FIELDS.items():
+            for value in values(record):
+                self._postings[name].setdefault(value, set()).add(position)
+
+    def _unindex_record(self, position: int) -> None:
+        record = self.records[position]
+        for key in question_keys(record):
+            positions = self._exact.get(key)
+            if positions is not None and position in positions:
+                positions.remove(position)
+                if not positions:
+                    del self._exact[key]
+        for name, values in FILTER_FIELDS.items():
+            for value in values(record):
+                rows = self._postings[name].get(value)
+                if rows is not None:
+                    rows.discard(position)
+                    if not rows:
+                        del self._postings[name][value]
+
+    def build(self, records: Sequence[Any], vectors: Any, full_vectors: Optional[np.ndarray] = None) -> None:
+        """
+        Replace the index content with the given records and their vectors.
+
+        Args:
+            records (Sequence[Any]): Records exposing an ``id`` attribute
+            vectors (Any): Matrix with one embedding per record, in the same order
+            full_vectors (Optional[np.ndarray]): Normalized full-precision rows to re-rank from, such as
+                a memory-mapped embedding sidecar; by default a float32 copy is kept when re-ranking
+        """
+        self.records = list(records)
+        self._positions = {record.id: i for i, record in enumerate(self.records)}
+        self._exact = {}
+        self._postings = {name: {} for name in FILTER_FIELDS}
+        for position in range(len(self.records)):
+            self._index_record(position)
+        if not self.records:
+            self._matrix = np.empty((0, self.dimensions), dtype=STORAGE_DTYPES[self.storage])
+            self._scales = np.empty(0, dtype=np.float32) if self.storage == "int8" else None
+            self._full = None
+            return
+
+        matrix = normalize_rows(vectors)
+        if matrix.shape != (len(records), self.dimensions):
+            raise ValueError(
+                f"Expected vectors of shape {(len(records), self.dimensions)}, got {matrix.shape}"
+            )
+        codes, self._scales = quantize_rows(matrix, self.storage)
+        self._matrix = np.ascontiguousarray(codes)
+        self._full = None
+        if self.rerank:
+            self._full = full_vectors if full_vectors is not None and full_vectors.shape == matrix.shape else matrix
+
+    def add(self, record: Any, vector: Any) -> int:
+        """
+        Insert or replace a single record.
+
+        Args:
+            record (Any): Record exposing an ``id`` attribute
+            vector (Any): Embedding of the record
+
+        Returns:
+            int: Row of the record in the index
+        """
+        row = normalize_rows(vector)
+        if row.shape[1] != self.dimensions:
+            raise ValueError(f"Expected a vector of {self.dimensions} dimensions, got {row.shape[1]}")
+        codes, scales = quantize_rows(row, self.storage)
+
+        position = self._positions.get(record.id)
+        if position is None:
+            position = len(self.records)
+            if position >= self._matrix.shape[0]:
+                self._grow(position)
+            self.records.append(record)
+            self._positions[record.id] = position
+        else:
+            self._unindex_record(position)
+            self.records[position] = record
+        self._index_record(position)
+        self._matrix[position] = codes[0]
+        if self._scales is not None:
+            self._scales[position] = scales[0]
+        if self._full is not None:
+            if not self._full.flags.writeable:
+                # A memory-mapped sidecar is read-only, copy it into memory before the first write
+                self._full = np.array(self._full)
+            self._full[position] = row[0]
+        return position
+
+    def remove(self, record_id: str) -> bool:
+        """
+        Remove a single record. The last row moves into its place so the matrix stays dense.
+
+        Args:
+            record_id (str): Id of the record to remove
+
+        Returns:
+            bool: Whether the record was indexed
+        """
+        position = self._positions.pop(record_id, None)
+        if position is None:
+            return False
+        last = len(self.records) - 1
+        self._unindex_record(position)
+        if position != last:
+            self._unindex_record(last)
+            self.records[position] = self.records[last]
+            self._positions[self.records[position].id] = position
+            self._matrix[position] = self._matrix[last]
+            if self._scales is not None:
+                self._scales[position] = self._scales[last]
+            if self._full is not None:
+                if not self._full.flags.writeable:
+                    self._full = np.array(self._full)
+                self._full[position] = self._full[last]
+            self._index_record(position)
+        self.records.pop()
+        return True
+
+    def _grow(self, count: int) -> None:
+        # Grow geometrically so a stream of add_faq calls stays amortized O(1)
+        capacity = max(16, self._matrix.shape[0] * 2)
+
+        def grown(array: np.ndarray) -> np.ndarray:
+            result = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            result[:count] = array[:count]
+            return result
+
+        self._matrix = grown(self._matrix)
+        if self._scales is not None:
+            self._scales = grown(self._scales)
+        if self._full is not None:
+            self._full = grown(self._full)
+
+    def rows(self, record_ids: Sequence[str]) -> np.ndarray:
+        """Return the matrix rows of the given record ids, skipping unknown ids."""
+        return np.fromiter(
+            (self._positions[record_id] for record_id in record_ids if record_id in self._positions),
+            dtype=np.int64,
+        )
+
+    def similarities(self, query_vectors: Any, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity of the queries to the indexed records.
+        Quantized matrices are decoded block by block into one reused float32 buffer.
+
+        Args:
+            query_vectors (Any): One query embedding per row
+            rows (Optional[np.ndarray]): Restrict scoring to these rows
+
+        Returns:
+            np.ndarray: Matrix of shape (queries, scored rows)
+        """
+        queries = normalize_rows(query_vectors)
+        if self.storage == "float32":
+            matrix = self._matrix[:len(self.records)] if rows is None else self._matrix[rows]
+            return queries @ matrix.T
+
+        count = len(self.records) if rows is None else rows.size
+        result = np.empty((queries.shape[0], count), dtype=np.float32)
+        decoded = np.empty((min(SCORE_BLOCK_ROWS, count), self.dimensions), dtype=np.float32)
+        for start in range(0, count, SCORE_BLOCK_ROWS):
+            stop = min(start + SCORE_BLOCK_ROWS, count)
+            block = slice(start, stop) if rows is None else rows[start:stop]
+            np.copyto(decoded[:stop - start], self._matrix[block])
+            result[:, start:stop] = queries @ decoded[:stop - start].T
+            if self._scales is not None:
+                # Scaling the scores is cheaper than dequantizing the rows
+                result[:, start:stop] *= self._scales[block]
+        return result
+
+    def distances(self, query_vector: Any, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine distance of the indexed records to the query.
+
+        Args:
+            query_vector (Any): Embedding of the query
+            rows (Optional[np.ndarray]): Restrict scoring to these rows
+
+        Returns:
+            np.ndarray: One distance per scored row, in row order
+        """
+        return 1.0 - self.similarities(query_vector, rows)[0]
+
+    def search(
+        self,
+        query_vector: Any,
+        limit: int = 3,
+        score: float = 0.19,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[Any, float]]:
+        """
+        Return the closest records whose distance is below the threshold.
+
+        Args:
+            query_vector (Any): Embedding of the query
+            limit (int): Maximum number of results to return
+            score (float): Distance threshold, only records with a smaller distance are returned
+            rows (Optional[np.ndarray]): Restrict the search to these rows
+
+        Returns:
+            List[Tuple[Any, float]]: ``(record, distance)`` pairs sorted by ascending distance
+        """
+        return self.search_scored(query_vector, limit, score, rows).matches
+
+    def search_scored(
+        self,
+        query_vector: Any,
+        limit: int = 3,
+        score: float = 0.19,
+        rows: Optional[np.ndarray] = None,
+    ) -> ScoredMatches:
+        """
+        Like search, and also report how close the best candidate was when nothing matched.
+
+        Args:
+            query_vector (Any): Embedding of the query
+            limit (int): Maximum number of results to return
+            score (float): Distance threshold, only records with a smaller distance are returned
+            rows (Optional[np.ndarray]): Restrict the search to these rows
+
+        Returns:
+            ScoredMatches: The matches, closest first, and the best distance
+        """
+        if not self.records or (rows is not None and rows.size == 0):
+            return ScoredMatches([])
+        distances = self.distances(query_vector, rows)
+        if limit <= 0:
+            matches = []
+        elif self._full is not None:
+            matches = self._rerank(query_vector, distances, limit, score, rows)
+        else:
+            matches = self._top_k(distances, limit, score, rows)
+        # Quantized storage reports the approximate distance of the best candidate on a miss
+        return ScoredMatches(matches, matches[0][1] if matches else float(distances.min()))
+
+    def search_many(
+        self,
+        query_vectors: Any,
+        limit: int = 3,
+        score: float = 0.19,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[Any, float]]]:
+        """
+        Search several queries at once with a single matrix-matrix product.
+
+        Args:
+            query_vectors (Any): Matrix with one query embedding per row
+            limit (int): Maximum number of results to return per query
+            score (float): Distance threshold, only records with a smaller distance are returned
+            rows (Optional[np.ndarray]): Restrict the search to these rows
+
+        Returns:
+            List[List[Tuple[Any, float]]]: For each query, ``(record, distance)`` pairs sorted by ascending distance
+        """
+        queries = normalize_rows(query_vectors)
+        if limit <= 0 or not self.records or (rows is not None and rows.size == 0):
+            return [[] for _ in range(queries.shape[0])]
+        distances = 1.0 - self.similarities(queries, rows)
+        if self._full is not None:
+            return [self._rerank(q, d, limit, score, rows) for q, d in zip(queries, distances)]
+
+        # Push everything outside the threshold to +inf, then select the k smallest per query
+        distances[distances >= score] = np.inf
+        k = min(limit, distances.shape[1])
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_distances = np.take_along_axis(top_distances, order, axis=1)
+
+        results = []
+        for hits, hit_distances in zip(top, top_distances):
+            found = np.isfinite(hit_distances)
+            positions = hits[found] if rows is None else rows[hits[found]]
+            results.append([(self.records[p], float(d)) for p, d in zip(positions, hit_distances[found])])
+        return results
+
+    def _rerank(
+        self,
+        query_vector: Any,
+        distances: np.ndarray,
+        limit: int,
+        score: float,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[Any, float]]:
+        """Re-score the best quantized candidates with full-precision vectors, then threshold and select."""
+        count = min(distances.size, limit * self.rerank)
+        candidates = np.argpartition(distances, count - 1)[:count] if count < distances.size else np.arange(distances.size)
+        candidate_rows = candidates if rows is None else rows[candidates]
+        query = normalize_rows(query_vector)[0]
+        exact = 1.0 - np.asarray(self._full[candidate_rows], dtype=np.float32) @ query
+        return self._top_k(exact, limit, score, candidate_rows)
+
+    def _top_k(
+        self,
+        distances: np.ndarray,
+        limit: int,
+        score: float,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[Any, float]]:
+        """Threshold, partially select and sort a distance vector."""
+        hits = np.flatnonzero(distances < score)
+        if hits.size > limit:
+            hits = hits[np.argpartition(distances[hits], limit - 1)[:limit]]
+        hits = hits[np.argsort(distances[hits], kind="stable")]
+        positions = hits if rows is None else rows[hits]
+        results = [(self.records[p], float(distances[h])) for p, h in zip(positions, hits)]
+        for record, distance in results:
+            logging.info(f"Found record: {record.id} with score: {distance}")
+        return results
@@ -1,36 +1,37 @@
 # Copyright (c) Microsoft. All rights reserved.
 
 import logging
-from azure.cosmos import CosmosClient, PartitionKey
+import sys
 import asyncio
 import json
 import os
 from collections.abc import Sequence
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Annotated, Optional, List
 from uuid import uuid4
-from dotenv import load_dotenv
-from semantic_kernel.connectors.ai.open_ai import AzureTextEmbedding
-# InMemoryCollection is used for in-memory vector store
-from semantic_kernel.connectors.in_memory import InMemoryCollection
 from semantic_kernel.data.vector import VectorStoreField, vectorstoremodel
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# FAQVectorIndex keeps all FAQ vectors in one NumPy matrix for vectorized search
+from memory.faq_index import FAQVectorIndex, ScoredMatches
+from memory.faq_ann import IVFFlatIndex
+from memory.faq_embeddings import aligned_sidecar_vectors, content_hash, load_sidecar, split_by_sidecar
+from memory.embedding_cache import QueryEmbeddingCache
+from memory.embedding_coalescer import EmbeddingCoalescer
+from memory.response_cache import SOURCE_CACHE, SOURCE_FAQ, ResponseCache
+from memory.settings import create_embedder, get_settings
 
 # This is an example of a vector store and collection using Azure OpenAI embeddings
 # Make sure to have your environment variables set up or provide credentials directly
 # Using Azure OpenAI endpoint from your Azure AI Foundry project
+# Configuration is read lazily by memory.settings.get_settings(), nothing touches
+# the environment, the .env file or the FAQ JSON file at import time.
 
-load_dotenv()
-# Load environment variables or use direct configuration
-azure_openai_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-azure_openai_api_key = os.getenv("AZURE_OPENAI_API_KEY")
-embedding_deployment = os.getenv("EMBEDDING_DEPLOYMENT_NAME")
+# Dimensions of the embedding model
+EMBEDDING_DIMENSIONS = 1536
 
-embedder = AzureTextEmbedding(
-    api_key=azure_openai_api_key,
-    deployment_name=embedding_deployment,
-    endpoint=azure_openai_endpoint,
-    service_id="azure_embedding"
-)
+# Number of texts sent per embedding request when the corpus is embedded
+EMBEDDING_BATCH_SIZE = 256
 
 # Next, you need to define your data structure
 # In this case, we are using a dataclass to define our data structure
@@ -48,23 +49,44 @@ class DataModel:
     id: Annotated[str, VectorStoreField("key")] = field(default_factory=lambda: str(uuid4()))
     vector: Annotated[
         list[float] | str | None,
-        VectorStoreField("vector", dimensions=1536),
+        VectorStoreField("vector", dimensions=EMBEDDING_DIMENSIONS),
     ] = None
     question: Annotated[str, VectorStoreField("data", is_full_text_indexed=True)] = ""
     answer: Annotated[str, VectorStoreField("data", is_full_text_indexed=True)] = ""
     category: Annotated[str, VectorStoreField("data", is_indexed=True)] = "general"
     item_type: Annotated[str, VectorStoreField("data", is_indexed=True)] = "question"
     tags: Annotated[str, VectorStoreField("data", is_indexed=True)] = ""
+    aliases: Annotated[list[str], VectorStoreField("data")] = field(default_factory=list)
+    # Provenance: SOURCE_FAQ for curated items, SOURCE_CACHE for agent answers written back
+    source: Annotated[str, VectorStoreField("data", is_indexed=True)] = SOURCE_FAQ
 
     def __post_init__(self):
         if self.vector is None:
             self.vector = self.content
 
 
+# Default FAQ corpus, embeddings are precomputed next to it by faq_embeddings.py
+FAQ_JSON_FILE_PATH = os.path.join(os.path.dirname(__file__), "cosmosdb-qna-items.json")
+
+
 # Load data from JSON file
-def load_records_from_json():
-    json_file_path = os.path.join(os.path.dirname(__file__), "cosmosdb-qna-items.json")
+def load_records_from_json(json_file_path: str = FAQ_JSON_FILE_PATH) -> List["DataModel"]:
+    """
+    Load the FAQ records of a JSON file.
+    Parsed files are cached by path and modification time, so every FAQMemory in the
+    process shares one load until the file changes.
     
+    Args:
+        json_file_path (str): FAQ JSON file
+        
+    Returns:
+        List[DataModel]: A new list of the (shared) records
+    """
+    return list(_load_records_cached(json_file_path, os.path.getmtime(json_file_path)))
+
+
+@lru_cache(maxsize=8)
+def _load_records_cached(json_file_path: str, mtime: float) -> tuple:
     with open(json_file_path, 'r', encoding='utf-8') as file:
         data = json.load(file)
     
@@ -87,11 +109,12 @@ def load_records_from_json():
             answer=answer,
             category=item.get("category", "general"),
             item_type=item.get("type", "question"),
-            tags=tags_str
+            tags=tags_str,
+            aliases=list(item.get("aliases", []))
         )
         records.append(record)
     
-    return records
+    return tuple(records)
 
 
 class FAQMemory:
@@ -100,97 +123,376 @@ class FAQMemory:
     This class provides methods to initialize, search, and manage FAQ collections.
     """
     
-    def __init__(self):
-        """Initialize the FAQ Memory with default configuration."""
+    def __init__(self, json_file_path: str = FAQ_JSON_FILE_PATH, query_cache: Optional[QueryEmbeddingCache] = None, response_cache: Optional[ResponseCache] = None):
+        """
+        Initialize the FAQ Memory with default configuration.
+        
+        Args:
+            json_file_path (str): FAQ JSON file to load the records from
+            query_cache (Optional[QueryEmbeddingCache]): Cache for query embeddings, configured from the environment by default
+            response_cache (Optional[ResponseCache]): Bookkeeping of cached agent answers, configured from the environment by default
+        """
         logging.info("Initializing FAQ Memory")
-        self.embedder = AzureTextEmbedding(
-            api_key=azure_openai_api_key,
-            deployment_name=embedding_deployment,
-            endpoint=azure_openai_endpoint,
-            service_id="azure_embedding"
-        )
+        # The embedder, records and caches are created on first use
+        self._embedder = None
+        self._records: Optional[List[DataModel]] = None
+        self._query_cache = query_cache
+        self._response_cache = response_cache
+        # Background write-backs and evictions, kept referenced until they finish
+        self._background: set = set()
         self.collection = None
-        self.records = load_records_from_json()
+        self.json_file_path = json_file_path
+        self._json_mtime = None
+        self._reload_lock = asyncio.Lock()
+        self._init_lock = asyncio.Lock()
+        self._init_error: Optional[str] = None
         self._initialized = False
     
-    async def initialize(self) -> InMemoryCollection[str, DataModel]:
+    @property
+    def is_ready(self) -> bool:
+        """Whether the FAQ memory is initialized and can serve searches."""
+        return self._initialized
+    
+    def warm_up(self) -> asyncio.Task:
         """
-        Initialize and return the FAQ collection.
-        This method sets up the vector store collection and loads the data.
+        Start initializing in the background, typically from an application's startup hook.
+        Searches arriving before it completes wait for the same initialization.
         
         Returns:
-            InMemoryCollection: The initialized collection ready for use.
+            asyncio.Task: The initialization task
         """
-        if not self._initialized:
-            self.collection = InMemoryCollection[str, DataModel](
-                record_type=DataModel,
-                create_database=True,
-                embedding_generator=self.embedder,
+        task = asyncio.create_task(self.initialize())
+        task.add_done_callback(self._on_warm_up_done)
+        return task
+    
+    def _on_warm_up_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self._init_error = str(task.exception())
+            logging.error(f"Error warming up FAQ Memory: {self._init_error}")
+    
+    def health(self) -> dict:
+        """Report readiness of the FAQ memory for health endpoints."""
+        return {
+            "ready": self._initialized,
+            "records": len(self.collection) if self._initialized else 0,
+            "error": None if self._initialized else self._init_error,
+            "embedding_coalescer": self._embedder.stats() if isinstance(self._embedder, EmbeddingCoalescer) else None,
+            "response_cache": self._response_cache.stats() if self._response_cache is not None else None,
+        }
+    
+    @property
+    def embedder(self):
+        """The embedding service, created from the settings on first use."""
+        if self._embedder is None:
+            self._embedder = create_embedder()
+        return self._embedder
+    
+    @embedder.setter
+    def embedder(self, embedder):
+        self._embedder = embedder
+    
+    @property
+    def records(self) -> List[DataModel]:
+        """The records of the FAQ JSON file, loaded on first use."""
+        if self._records is None:
+            self._json_mtime = self._read_json_mtime()
+            self._records = load_records_from_json(self.json_file_path)
+        return self._records
+    
+    @records.setter
+    def records(self, records: List[DataModel]):
+        self._records = records
+    
+    @property
+    def query_cache(self) -> QueryEmbeddingCache:
+        """The query embedding cache, configured from the settings and loaded on first use."""
+        if self._query_cache is None:
+            settings = get_settings()
+            self._query_cache = QueryEmbeddingCache(
+                max_size=settings.query_cache_size,
+                ttl_seconds=settings.query_cache_ttl_seconds,
+                persist_path=settings.query_cache_path,
+                model=settings.embedding_model,
+                dimensions=EMBEDDING_DIMENSIONS,
             )
+            self._query_cache.load()
+        return self._query_cache
+    
+    @property
+    def response_cache(self) -> ResponseCache:
+        """The response cache bookkeeping, configured from the settings on first use."""
+        if self._response_cache is None:
+            settings = get_settings()
+            self._response_cache = ResponseCache(
+                max_size=settings.response_cache_size,
+                ttl_seconds=settings.response_cache_ttl_seconds,
+                policy=settings.response_cache_policy,
+            )
+        return self._response_cache
+    
+    def _create_index(self) -> FAQVectorIndex:
+        """Create an empty index of the kind selected by FAQ_INDEX_KIND."""
+        settings = get_settings()
+        if settings.index_kind == "ivf":
+            return IVFFlatIndex(
+                dimensions=EMBEDDING_DIMENSIONS,
+                storage=settings.vector_storage,
+                rerank=settings.rerank,
+                nlist=settings.ivf_nlist,
+                nprobe=settings.ivf_nprobe,
+            )
+        return FAQVectorIndex(dimensions=EMBEDDING_DIMENSIONS, storage=settings.vector_storage, rerank=settings.rerank)
+
+    async def _embed(self, texts: List[str]):
+        """Embed texts with the configured embedder, in batches of EMBEDDING_BATCH_SIZE."""
+        return await self.embedder.generate_embeddings(texts, batch_size=EMBEDDING_BATCH_SIZE)
+
+    async def _embed_query(self, query: str):
+        """Embed a search query, going through the query embedding cache."""
+        return (await self.query_cache.embed([query], self._embed))[0]
+
+    async def initialize(self) -> FAQVectorIndex:
+        """
+        Initialize and return the FAQ index.
+        This method loads the precomputed embedding sidecar, embeds only the records
+        that are missing from it or whose content changed, and builds the vector index.
+        
+        Returns:
+            FAQVectorIndex: The initialized index ready for use.
+        """
+        if not self._initialized:
+            # Single flight: concurrent first callers wait for the initialization in progress
+            async with self._init_lock:
+                if not self._initialized:
+                    index = self._create_index()
             
-            # Ensure collection exists and add data
-            await self.collection.ensure_collection_exists()
-            
-            # Add records to the collection
-            keys = await self.collection.upsert(self.records)
-            print(f"FAQ Memory initialized with {len(keys)} records")
-            self._initialized = True
+                    # Reuse the memory-mapped sidecar vectors and embed only new or changed records
+                    sidecar = load_sidecar(self.json_file_path, get_settings().embedding_model, EMBEDDING_DIMENSIONS)
+                    vectors, missing = split_by_sidecar(self.records, sidecar, EMBEDDING_DIMENSIONS)
+                    if missing:
+                        embedded = await self._embed([self.records[i].content for i in missing])
+                        vectors[missing] = embedded
+                    index.build(self.records, vectors, full_vectors=aligned_sidecar_vectors(self.records, sidecar))
+                    self.collection = index
+                    print(f"FAQ Memory initialized with {len(index)} records ({len(missing)} embedded)")
+                    self._initialized = True
             
         return self.collection
     
-    async def get_collection(self) -> InMemoryCollection[str, DataModel]:
+    async def reload(self) -> dict:
         """
-        Get the FAQ collection, initializing it if necessary.
+        Reload the FAQ JSON file and publish a new index.
+        Records are diffed against the current index by id and content hash: only new or
+        changed items are embedded, and items removed from the file are dropped. Records
+        added at runtime with add_faq are carried over. The new index is built on the side
+        and swapped in with a single assignment, so concurrent searches keep using the old
+        index until they finish and never see a partially built one.
         
         Returns:
-            InMemoryCollection: The FAQ collection ready for use.
+            dict: Counts of added, updated (both re-embedded) and removed records and the new total
+        """
+        if not self._initialized:
+            index = await self.initialize()
+            return {"added": len(index), "updated": 0, "removed": 0, "total": len(index)}
+        
+        async with self._reload_lock:
+            mtime = self._read_json_mtime()
+            records = load_records_from_json(self.json_file_path)
+            current = self.collection
+            previous_ids = {record.id for record in self.records}
+            new_ids = {record.id for record in records}
+            
+            # Keep runtime additions that never came from the file, except cached responses that were dropped
+            carried = [
+                record for record in current.records
+                if record.id not in previous_ids and record.id not in new_ids
+                and (record.source != SOURCE_CACHE or record.id in self.response_cache)
+            ]
+            all_records = records + carried
+            
+            vectors = [None] * len(all_records)
+            missing = []
+            added = updated = 0
+            for position, record in enumerate(all_records):
+                existing = current.get(record.id)
+                if existing is not None and content_hash(existing.content) == content_hash(record.content):
+                    vectors[position] = current.vectors(current.rows([record.id]))[0]
+                else:
+                    missing.append(position)
+                    if existing is None:
+                        added += 1
+                    else:
+                        updated += 1
+            if missing:
+                embedded = await self._embed([all_records[i].content for i in missing])
+                for position, vector in zip(missing, embedded):
+                    vectors[position] = vector
+            
+            index = self._create_index()
+            sidecar = load_sidecar(self.json_file_path, get_settings().embedding_model, EMBEDDING_DIMENSIONS)
+            index.build(all_records, vectors, full_vectors=aligned_sidecar_vectors(all_records, sidecar))
+            removed = len(previous_ids - new_ids)
+            
+            # Publish the new index atomically
+            self.records = records
+            self.collection = index
+            self._json_mtime = mtime
+            logging.info(f"FAQ Memory reloaded: {added} added, {updated} updated, {removed} removed")
+            return {"added": added, "updated": updated, "removed": removed, "total": len(index)}
+    
+    async def watch(self, interval: float = 5.0):
+        """
+        Poll the FAQ JSON file and reload whenever its modification time changes.
+        Run it as a background task; it stops when the task is cancelled.
+        
+        Args:
+            interval (float): Seconds between checks
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self._initialized and self._read_json_mtime() != self._json_mtime:
+                try:
+                    await self.reload()
+                except Exception as e:
+                    logging.error(f"Error reloading FAQ Memory: {str(e)}")
+    
+    def _read_json_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.json_file_path)
+        except OSError:
+            return None
+    
+    async def get_collection(self) -> FAQVectorIndex:
+        """
+        Get the FAQ index, initializing it if necessary.
+        
+        Returns:
+            FAQVectorIndex: The FAQ index ready for use.
         """
         if not self._initialized:
             await self.initialize()
         return self.collection
 
-    async def search_faq(self, query: str, category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19) -> List[DataModel]:
+    async def search_faq(self, query: str, category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19, item_type_filter: Optional[str] = None, tags_filter: Optional[List[str]] = None) -> List[DataModel]:
         """
         Search the FAQ collection for relevant answers.
+        A query that matches a question or alias after normalizing case, punctuation and
+        whitespace is answered from the exact-match index without calling the embedder.
+        
+        Args:
+            query (str): The search query
+            category_filter (Optional[str]): Filter by category (e.g., 'coffee', 'general')
+            limit (int): Maximum number of results to return
+            score (float): Cosine distance threshold, only closer records are returned
+            item_type_filter (Optional[str]): Filter by item type (e.g., 'question')
+            tags_filter (Optional[List[str]]): Only return records carrying any of these tags
+            
+        Returns:
+            List[DataModel]: List of matching FAQ records, closest first
+        """
+        result = await self.search_faq_scored(query, category_filter, limit, score, item_type_filter, tags_filter)
+        return result.records
+    
+    async def search_faq_scored(self, query: str, category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19, item_type_filter: Optional[str] = None, tags_filter: Optional[List[str]] = None) -> ScoredMatches:
+        """
+        Search the FAQ collection and return the matches with their cosine distances.
+        The index returns the matches already thresholded, sorted and truncated to `limit`;
+        on a miss best_distance tells how close the closest record was.
         
         Args:
             query (str): The search query
             category_filter (Optional[str]): Filter by category (e.g., 'coffee', 'general')
             limit (int): Maximum number of results to return
+            score (float): Cosine distance threshold, only closer records are returned
+            item_type_filter (Optional[str]): Filter by item type (e.g., 'question')
+            tags_filter (Optional[List[str]]): Only return records carrying any of these tags
             
         Returns:
-            List[DataModel]: List of matching FAQ records
+            ScoredMatches: ``(record, distance)`` pairs, closest first, and the best distance
         """
         if not self._initialized:
             await self.initialize()
         
-        # Prepare search options
-        options = {
-            "vector_property_name": "vector",
-        }
+        index = self.collection
+        rows = index.filter_rows(category_filter, item_type_filter, tags_filter)
+        exact_match = self._exact_match(index, query, rows)
+        if exact_match is not None and self._fresh([exact_match]):
+            logging.info(f"Found exact match: {exact_match.id}")
+            return ScoredMatches([(exact_match, 0.0)] if limit > 0 else [], 0.0)
         
-        # Add category filter if specified
-        if category_filter:
-            options["filter"] = lambda x: x.category == category_filter
+        if rows is not None and rows.size == 0:
+            return ScoredMatches([])
         
-        # Perform the search
-        search_results = await self.collection.search(
-            values=query,
-            **options,
-        )
-
-        results = []
-        count = 0
-        async for result in search_results.results:
-            if result.score is not None and result.score >= score:
-                continue
-            if count >= limit:
-                break
-            results.append(result.record)
-            count += 1
-            logging.info(f"Found record: {result.record.id} with score: {result.score}")
+        query_vector = await self._embed_query(query)
+        # Cached responses are added to and removed from the live index in place, which moves
+        # rows, so the filter is applied again after the await with none before the search
+        rows = index.filter_rows(category_filter, item_type_filter, tags_filter)
+        result = index.search_scored(query_vector, limit=limit, score=score, rows=rows)
+        fresh = {id(record) for record in self._fresh(result.records)}
+        result.matches = [(record, distance) for record, distance in result.matches if id(record) in fresh]
+        return result
+    
+    async def search_faq_many(self, queries: List[str], category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19, item_type_filter: Optional[str] = None, tags_filter: Optional[List[str]] = None) -> List[List[DataModel]]:
+        """
+        Search the FAQ collection for several queries at once.
+        Exact matches are answered from the exact-match index, the remaining queries are
+        embedded in one batched request and scored together against the index.
+        
+        Args:
+            queries (List[str]): The search queries
+            category_filter (Optional[str]): Filter by category (e.g., 'coffee', 'general')
+            limit (int): Maximum number of results to return per query
+            score (float): Cosine distance threshold, only closer records are returned
+            item_type_filter (Optional[str]): Filter by item type (e.g., 'question')
+            tags_filter (Optional[List[str]]): Only return records carrying any of these tags
+            
+        Returns:
+            List[List[DataModel]]: Matching FAQ records for each query, in query order
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        index = self.collection
+        rows = index.filter_rows(category_filter, item_type_filter, tags_filter)
+        results: List[List[DataModel]] = [[] for _ in queries]
+        pending = []
+        for i, query in enumerate(queries):
+            exact_match = self._exact_match(index, query, rows)
+            if exact_match is not None and self._fresh([exact_match]):
+                results[i] = [exact_match] if limit > 0 else []
+            else:
+                pending.append(i)
+        
+        if not pending or (rows is not None and rows.size == 0):
+            return results
+        
+        query_vectors = await self.query_cache.embed([queries[i] for i in pending], self._embed)
+        # The rows may have moved while embedding, see search_faq_scored
+        rows = index.filter_rows(category_filter, item_type_filter, tags_filter)
+        for i, matches in zip(pending, index.search_many(query_vectors, limit=limit, score=score, rows=rows)):
+            results[i] = self._fresh([record for record, _ in matches])
         return results
     
+    @staticmethod
+    def _exact_match(index: FAQVectorIndex, query: str, rows) -> Optional[DataModel]:
+        """Return the exact-match record of a query if it is within the filtered rows."""
+        record = index.lookup(query)
+        if record is None or rows is None or index.rows([record.id])[0] in rows:
+            return record
+        return None
+    
+    def _fresh(self, records: List[DataModel]) -> List[DataModel]:
+        """Record hits on cached responses and drop the expired ones, which are removed in the background."""
+        fresh, expired = [], []
+        for record in records:
+            if record.source == SOURCE_CACHE and not self.response_cache.touch(record.id):
+                expired.append(record)
+            else:
+                fresh.append(record)
+        if expired:
+            self._spawn(self._remove_records([record.id for record in expired]))
+        return fresh
+    
     async def get_answer(self, query: str, category_filter: Optional[str] = None) -> Optional[str]:
         """
         Get the best answer for a query.
@@ -208,7 +510,7 @@ class FAQMemory:
             return results[0].answer
         return None
     
-    async def add_faq(self, question: str, answer: str, category: str = "general", tags: List[str] = None) -> str:
+    async def add_faq(self, question: str, answer: str, category: str = "general", tags: List[str] = None, aliases: List[str] = None, source: str = SOURCE_FAQ) -> str:
         """
         Add a new FAQ item to the collection.
         
@@ -217,6 +519,8 @@ class FAQMemory:
             answer (str): The answer
             category (str): The category (default: "general")
             tags (List[str]): List of tags
+            aliases (List[str]): Alternative phrasings of the question for exact-match lookups
+            source (str): Provenance of the item, SOURCE_CACHE marks an evictable cached response
             
         Returns:
             str: The ID of the added record
@@ -233,16 +537,87 @@ class FAQMemory:
             answer=answer,
             category=category,
             item_type="question",
-            tags=tags_str
+            tags=tags_str,
+            aliases=list(aliases or []),
+            source=source
         )
         
-        keys = await self.collection.upsert([new_record])
-        return keys[0] if keys else new_record.id
+        vector = (await self._embed([content]))[0]
+        # Wait for a running reload so the record lands in the index it publishes
+        async with self._reload_lock:
+            self.collection.add(new_record, vector)
+        return new_record.id
+    
+    async def cache_response(self, question: str, answer: str, category: str = "general", tags: List[str] = None) -> Optional[str]:
+        """
+        Store an agent answer as a cached response, so the same or a similar question is
+        answered from the FAQ memory next time. Cached responses expire after the TTL and are
+        evicted once the cache is full; curated FAQ items are never affected.
+        
+        Args:
+            question (str): The user question
+            answer (str): The agent answer
+            category (str): The category (default: "general")
+            tags (List[str]): List of tags
+            
+        Returns:
+            Optional[str]: The ID of the cached record, or None when the cache is disabled or the question is already known
+        """
+        if not self.response_cache.enabled or not question or not answer:
+            return None
+        if not self._initialized:
+            await self.initialize()
+        if self.collection.lookup(question) is not None:
+            return None
+        
+        record_id = await self.add_faq(question, answer, category, tags, source=SOURCE_CACHE)
+        dropped = self.response_cache.track(record_id)
+        if dropped:
+            await self._remove_records(dropped)
+        logging.info(f"Cached response {record_id}, {len(dropped)} dropped")
+        return record_id
+    
+    def write_back(self, question: str, answer: str, category: str = "general", tags: List[str] = None) -> asyncio.Task:
+        """
+        Cache an agent answer in the background, so the caller can respond without waiting for the embedding.
+        
+        Args:
+            question (str): The user question
+            answer (str): The agent answer
+            category (str): The category (default: "general")
+            tags (List[str]): List of tags
+            
+        Returns:
+            asyncio.Task: The write-back task
+        """
+        return self._spawn(self.cache_response(question, answer, category, tags))
+    
+    async def _remove_records(self, record_ids: List[str]):
+        # Same lock as reload, so a reload never carries over a half-removed index
+        async with self._reload_lock:
+            for record_id in record_ids:
+                self.collection.remove(record_id)
+    
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._on_background_done)
+        return task
+    
+    def _on_background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Error updating the FAQ Memory response cache: {str(task.exception())}")
     
     async def close(self):
         """Close and cleanup the collection."""
+        if self._background:
+            # Let pending write-backs finish
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._query_cache is not None:
+            self._query_cache.save()
         if self.collection and self._initialized:
-            await self.collection.ensure_collection_deleted()
+            self.collection = None
             self._initialized = False
 
 
@@ -264,9 +639,6 @@ async def get_faq_memory() -> FAQMemory:
     return _faq_memory_instance
 
 
-records = load_records_from_json()
-
-
 async def main():
     """
     Main function demonstrating the FAQ Memory usage.
@@ -5,14 +5,13 @@ import asyncio
 import json
 import os
 from collections.abc import Sequence
-from dataclasses import dataclass, field
-from typing import Annotated, Optional, List
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import TYPE_CHECKING, Annotated, Dict, Optional, List
 from uuid import uuid4
 
-from semantic_kernel.connectors.ai.open_ai import AzureTextEmbedding
+import sys
 
-from azure.identity import DefaultAzureCredential
-from semantic_kernel.connectors.azure_cosmos_db import CosmosNoSqlCollection, CosmosNoSqlSettings
 from semantic_kernel.data.vector import (
     SearchType,
     VectorSearchProtocol,
@@ -20,29 +19,23 @@ from semantic_kernel.data.vector import (
     VectorStoreField,
     vectorstoremodel,
 )
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.cosmos_ingest import IngestReport, bulk_ingest, with_retry
+from memory.cosmos_mirror import CosmosMirror
+from memory.embedding_cache import QueryEmbeddingCache
+from memory.embedding_coalescer import EmbeddingCoalescer
+from memory.faq_embeddings import content_hash
+from memory.faq_index import FAQVectorIndex, ScoredMatches, split_tags
+from memory.settings import create_embedder, get_settings
+
+if TYPE_CHECKING:
+    from semantic_kernel.connectors.azure_cosmos_db import CosmosNoSqlCollection
 
 # This is an example of a vector store and collection using Azure OpenAI embeddings
 # Make sure to have your environment variables set up or provide credentials directly
 # Using Azure OpenAI endpoint from your Azure AI Foundry project
-
-from dotenv import load_dotenv  
-load_dotenv()  # Load environment variables from .env file
-
-# Load environment variables or use direct configuration
-azure_openai_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-azure_openai_api_key = os.getenv("AZURE_OPENAI_API_KEY")
-embedding_deployment = os.getenv("EMBEDDING_DEPLOYMENT_NAME")
-
-# Cosmos DB config for Caching
-azure_cosmosdb_nosql_url = os.getenv("AZURE_COSMOS_DB_NO_SQL_URL")
-azure_cosmosdb_nosql_database_name = os.getenv("AZURE_COSMOS_DB_NO_SQL_DATABASE_NAME")
-azure_cosmosdb_nosql_key = os.getenv("AZURE_COSMOS_DB_NO_SQL_KEY")
-
-CosmosNoSqlSettings(
-    key=azure_cosmosdb_nosql_key,
-    url=azure_cosmosdb_nosql_url,
-    database_name=azure_cosmosdb_nosql_database_name,
-)
+# Configuration is read lazily by memory.settings.get_settings(), and the Cosmos DB
+# connector is only imported when the collection is created.
 
 
 # cosmos_client = CosmosClient(
@@ -55,12 +48,34 @@ CosmosNoSqlSettings(
 # credential = DefaultAzureCredential()
 # cosmos_client = CosmosClient(azure_cosmosdb_nosql_url, credential=credential)
 
-embedder = AzureTextEmbedding(
-    api_key=azure_openai_api_key,
-    deployment_name=embedding_deployment,
-    endpoint=azure_openai_endpoint,
-    service_id="azure_embedding"
-)
+# Distance function of the vector index. Cosmos DB's VectorDistance returns a similarity
+# (higher is closer) for cosine_similarity and dot_product, a distance for euclidean.
+# Result scores are converted to cosine distance, so thresholds mean the same as with
+# the in-memory FAQMemory whatever the index uses.
+VECTOR_DISTANCE_FUNCTION = "cosine_similarity"
+
+# Dimensions of the embedding vectors, the same as in memory.faq_memory
+EMBEDDING_DIMENSIONS = 1536
+
+
+def to_cosine_distance(score: float, distance_function: str = VECTOR_DISTANCE_FUNCTION) -> float:
+    """
+    Convert a search result score to cosine distance (lower is closer).
+
+    Args:
+        score (float): Score reported by the vector index
+        distance_function (str): Distance function of the index
+
+    Returns:
+        float: The cosine distance, embeddings are unit length so dot product equals cosine similarity
+    """
+    if distance_function in ("cosine_similarity", "dot_prod"):
+        return 1.0 - score
+    if distance_function == "euclidean_distance":
+        return score * score / 2
+    if distance_function == "euclidean_squared_distance":
+        return score / 2
+    return score
 
 # Next, you need to define your data structure
 # In this case, we are using a dataclass to define our data structure
@@ -78,19 +93,113 @@ class DataModel:
     id: Annotated[str, VectorStoreField("key")] = field(default_factory=lambda: str(uuid4()))
     embedding: Annotated[
         list[float] | str | None,
-        VectorStoreField('vector', dimensions=1536, distance_function="cosine_similarity", index_kind="disk_ann"),
+        VectorStoreField('vector', dimensions=EMBEDDING_DIMENSIONS, distance_function=VECTOR_DISTANCE_FUNCTION, index_kind="disk_ann"),
     ] = None
     question: Annotated[str, VectorStoreField("data", is_full_text_indexed=True)] = ""
     answer: Annotated[str, VectorStoreField("data", is_full_text_indexed=True)] = ""
     category: Annotated[str, VectorStoreField("data", is_indexed=True)] = ""
+    item_type: Annotated[str, VectorStoreField("data", is_indexed=True)] = "question"
     tags: Annotated[str, VectorStoreField("data", is_indexed=True)] = ""
+    # Case-folded individual tags, so tag filters run in Cosmos DB with ARRAY_CONTAINS
+    tag_list: Annotated[list[str], VectorStoreField("data", is_indexed=True)] = field(default_factory=list)
+    # Hash of the stored fields and the embedding model, unchanged documents are not ingested again
+    content_hash: Annotated[str, VectorStoreField("data")] = ""
+
+    def __post_init__(self):
+        if not self.tag_list:
+            self.tag_list = split_tags(self.tags)
+
+
+
+# Default FAQ corpus
+FAQ_JSON_FILE_PATH = os.path.join(os.path.dirname(__file__), "cosmosdb-qna-items.json")
+
+# Records that failed to ingest are listed here, FAQMemory.ingest(resume=True) retries them
+INGEST_REPORT_PATH = os.path.join(os.path.dirname(__file__), "cosmosdb-qna-items.ingest-report.json")
+
+
+def document_hash(record: "DataModel", model: Optional[str]) -> str:
+    """
+    Hash everything an ingest would write for a record, including the embedding model.
+    
+    Args:
+        record (DataModel): The FAQ record
+        model (Optional[str]): Embedding deployment the vector comes from
+        
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return content_hash(json.dumps([model, record.content, record.question, record.answer, record.category, record.item_type, record.tags]))
 
 
+def _filter_literal(value: str) -> str:
+    # The connector quotes filter constants without escaping them, escape for Cosmos DB SQL first
+    return repr(value.replace("\\", "\\\\").replace("'", "\\'"))
+
+
+def build_filter(category: Optional[str] = None, item_type: Optional[str] = None, tags: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Build the filter of a Cosmos DB vector search, translated by the connector into its WHERE clause.
+    
+    Args:
+        category (Optional[str]): Required category
+        item_type (Optional[str]): Required item type
+        tags (Optional[List[str]]): Documents must carry at least one of these tags
+        
+    Returns:
+        Optional[str]: The filter lambda as a string, or None when no filter is given
+    """
+    clauses = []
+    if category:
+        clauses.append(f"x.category == {_filter_literal(category)}")
+    if item_type:
+        clauses.append(f"x.item_type == {_filter_literal(item_type)}")
+    if tags:
+        clauses.append("(" + " or ".join(f"{_filter_literal(tag)} in x.tag_list" for tag in split_tags(list(tags))) + ")")
+    return f"lambda x: {' and '.join(clauses)}" if clauses else None
+
+
+def record_from_document(document: dict) -> "DataModel":
+    """
+    Convert a stored Cosmos DB document to a record, without its embedding.
+    
+    Args:
+        document (dict): The document, including Cosmos DB system properties
+        
+    Returns:
+        DataModel: The FAQ record
+    """
+    return DataModel(
+        content=document.get("content", ""),
+        id=document["id"],
+        question=document.get("question", ""),
+        answer=document.get("answer", ""),
+        category=document.get("category", ""),
+        item_type=document.get("item_type", "question"),
+        tags=document.get("tags", ""),
+        tag_list=list(document.get("tag_list") or []),
+        content_hash=document.get("content_hash", ""),
+    )
+
 
 # Load data from JSON file
-def load_records_from_json():
-    json_file_path = os.path.join(os.path.dirname(__file__), "cosmosdb-qna-items.json")
+def load_records_from_json(json_file_path: str = FAQ_JSON_FILE_PATH) -> List["DataModel"]:
+    """
+    Load the FAQ records of a JSON file.
+    Parsed files are cached by path and modification time, so every FAQMemory in the
+    process shares one load until the file changes.
     
+    Args:
+        json_file_path (str): FAQ JSON file
+        
+    Returns:
+        List[DataModel]: A new list of the (shared) records
+    """
+    return list(_load_records_cached(json_file_path, os.path.getmtime(json_file_path)))
+
+
+@lru_cache(maxsize=8)
+def _load_records_cached(json_file_path: str, mtime: float) -> tuple:
     with open(json_file_path, 'r', encoding='utf-8') as file:
         data = json.load(file)
     
@@ -122,13 +231,14 @@ def load_records_from_json():
                 question=question,
                 answer=answer,
                 category=item.get("category", "general") or "general",
+                item_type=item.get("type", "question") or "question",
                 tags=tags_str,
                 # Don't set embedding to None, let the system handle it
                 embedding=[]  # Use empty list instead of None
             )
             records.append(record)
             
-    return records
+    return tuple(records)
 
 
 class FAQMemory:
@@ -137,20 +247,153 @@ class FAQMemory:
     This class provides methods to initialize, search, and manage FAQ collections.
     """
     
-    def __init__(self):
-        """Initialize the FAQ Memory with default configuration."""
+    def __init__(self, query_cache: Optional[QueryEmbeddingCache] = None):
+        """
+        Initialize the FAQ Memory with default configuration.
+        
+        Args:
+            query_cache (Optional[QueryEmbeddingCache]): Cache for query embeddings, configured from the environment by default
+        """
         logging.info("Initializing FAQ Memory")
-        self.embedder = AzureTextEmbedding(
-            api_key=azure_openai_api_key,
-            deployment_name=embedding_deployment,
-            endpoint=azure_openai_endpoint,            
-            service_id="azure_embedding"
-        )
+        # The embedder, records and query cache are created on first use
+        self._embedder = None
+        self._records: Optional[List[DataModel]] = None
+        self._query_cache = query_cache
         self.collection = None
-        self.records = load_records_from_json()
+        self._init_lock = asyncio.Lock()
+        self._init_error: Optional[str] = None
+        # Optional local mirror serving reads, see memory/cosmos_mirror.py
+        self.mirror: Optional[CosmosMirror] = None
+        self._mirror_task: Optional[asyncio.Task] = None
         self._initialized = False
     
-    async def initialize(self) -> CosmosNoSqlCollection[str, DataModel]:
+    @property
+    def is_ready(self) -> bool:
+        """Whether the FAQ memory is initialized and can serve searches."""
+        return self._initialized
+    
+    def warm_up(self) -> asyncio.Task:
+        """
+        Start initializing in the background, typically from an application's startup hook.
+        Searches arriving before it completes wait for the same initialization.
+        
+        Returns:
+            asyncio.Task: The initialization task
+        """
+        task = asyncio.create_task(self.initialize())
+        task.add_done_callback(self._on_warm_up_done)
+        return task
+    
+    def _on_warm_up_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self._init_error = str(task.exception())
+            logging.error(f"Error warming up FAQ Memory: {self._init_error}")
+    
+    def health(self) -> dict:
+        """Report readiness of the FAQ memory for health endpoints."""
+        return {
+            "ready": self._initialized,
+            "error": None if self._initialized else self._init_error,
+            "embedding_coalescer": self._embedder.stats() if isinstance(self._embedder, EmbeddingCoalescer) else None,
+            "mirror": self.mirror.stats() if self.mirror is not None else None,
+        }
+    
+    @property
+    def embedder(self):
+        """The embedding service, created from the settings on first use."""
+        if self._embedder is None:
+            self._embedder = create_embedder()
+        return self._embedder
+    
+    @embedder.setter
+    def embedder(self, embedder):
+        self._embedder = embedder
+    
+    @property
+    def records(self) -> List[DataModel]:
+        """The records of the FAQ JSON file, loaded on first use."""
+        if self._records is None:
+            self._records = load_records_from_json()
+        return self._records
+    
+    @records.setter
+    def records(self, records: List[DataModel]):
+        self._records = records
+    
+    @property
+    def query_cache(self) -> QueryEmbeddingCache:
+        """The query embedding cache, configured from the settings and loaded on first use."""
+        if self._query_cache is None:
+            settings = get_settings()
+            self._query_cache = QueryEmbeddingCache(
+                max_size=settings.query_cache_size,
+                ttl_seconds=settings.query_cache_ttl_seconds,
+                persist_path=settings.query_cache_path,
+                model=settings.embedding_model,
+                dimensions=EMBEDDING_DIMENSIONS,
+            )
+            self._query_cache.load()
+        return self._query_cache
+    
+    async def _embed_query(self, query: str):
+        """Embed a search query, going through the query embedding cache."""
+        vectors = await self.query_cache.embed([query], self.embedder.generate_embeddings)
+        return vectors[0].tolist()
+    
+    def _container(self):
+        """The Cosmos DB container client behind the collection, for queries the connector does not offer."""
+        return self.collection.cosmos_client.get_database_client(
+            self.collection.database_name
+        ).get_container_client(self.collection.collection_name)
+    
+    async def _existing_hashes(self) -> Dict[str, str]:
+        """Fetch the id and content hash of every stored document in one query."""
+        container = self._container()
+        
+        async def query():
+            return {
+                item["id"]: item.get("content_hash") or ""
+                async for item in container.query_items(query="SELECT c.id, c.content_hash FROM c")
+            }
+        
+        return await with_retry(query)
+    
+    async def ingest(self, records: Optional[List[DataModel]] = None, resume: bool = False, force: bool = False) -> IngestReport:
+        """
+        Embed and upsert records into the collection with bounded concurrency and retries.
+        Documents whose stored content hash matches the record are skipped, so ingesting an
+        unchanged corpus makes no embedding calls. Records that still fail are written to
+        the ingest report.
+        
+        Args:
+            records (Optional[List[DataModel]]): Records to ingest, the FAQ JSON records by default
+            resume (bool): Only ingest the records that failed in the previous ingest report
+            force (bool): Ingest every record, even unchanged ones
+            
+        Returns:
+            IngestReport: Counts and the failed record ids with their errors
+        """
+        settings = get_settings()
+        records = self.records if records is None else records
+        # Ingest shallow copies: the loaded records are shared through the JSON cache, and the
+        # copies carrying their vectors are dropped once they are upserted
+        records = [replace(record, content_hash=document_hash(record, settings.embedding_model)) for record in records]
+        
+        existing = {} if force else await self._existing_hashes()
+        changed = [record for record in records if existing.get(record.id) != record.content_hash]
+        
+        report = await bulk_ingest(
+            changed,
+            embed=self.embedder.generate_embeddings,
+            upsert=self.collection.upsert,
+            concurrency=settings.cosmos_ingest_concurrency,
+            report_path=settings.cosmos_ingest_report_path or INGEST_REPORT_PATH,
+            resume=resume,
+        )
+        report.skipped = len(records) - len(changed)
+        return report
+    
+    async def initialize(self) -> "CosmosNoSqlCollection[str, DataModel]":
         """
         Initialize and return the FAQ collection.
         This method sets up the vector store collection and loads the data.
@@ -159,46 +402,50 @@ class FAQMemory:
             CosmosNoSqlCollection: The initialized collection ready for use.
         """
         if not self._initialized:
-            try:
-                self.collection = CosmosNoSqlCollection[str, DataModel](
-                    record_type=DataModel,
-                    url=azure_cosmosdb_nosql_url,
-                    key=azure_cosmosdb_nosql_key,                
-                    collection_name="starbucksqna",
-                    database_name=azure_cosmosdb_nosql_database_name,                
-                    create_database=True,
-                    embedding_generator=self.embedder,
-                )
-                
-                # Ensure collection exists
-                await self.collection.ensure_collection_exists()
-
-                # Process records in smaller batches to avoid overwhelming the embedder
-                batch_size = 5
-                all_keys = []
+            # Single flight: concurrent first callers wait for the initialization in progress
+            async with self._init_lock:
+                if not self._initialized:
+                    try:
+                        from semantic_kernel.connectors.azure_cosmos_db import CosmosNoSqlCollection
                 
-                for i in range(0, len(self.records), batch_size):
-                    batch = self.records[i:i + batch_size]
-                    # Validate batch
-                    valid_batch = [rec for rec in batch if isinstance(rec.content, str) and rec.content.strip()]
-                    if valid_batch:
-                        print(f"Processing batch {i//batch_size + 1} with {len(valid_batch)} records")
-                        try:
-                            batch_keys = await self.collection.upsert(valid_batch)
-                            all_keys.extend(batch_keys)
-                            print(f"Successfully processed batch {i//batch_size + 1}")
-                        except Exception as e:
-                            print(f"Error processing batch {i//batch_size + 1}: {str(e)}")
-                            # Continue with next batch even if this one failed
+                        settings = get_settings()
+                        self.collection = CosmosNoSqlCollection[str, DataModel](
+                            record_type=DataModel,
+                            url=settings.cosmosdb_nosql_url,
+                            key=settings.cosmosdb_nosql_key,                
+                            collection_name="starbucksqna",
+                            database_name=settings.cosmosdb_nosql_database_name,                
+                            create_database=True,
+                        )
                 
-                print(f"FAQ Memory initialized with {len(all_keys)} records out of {len(self.records)} total")
-                self._initialized = True
-            except Exception as e:
-                print(f"Error initializing FAQ Memory: {str(e)}")
-                raise
+                        # Ensure collection exists
+                        await self.collection.ensure_collection_exists()
+
+                        # Embed new or changed records in large batches and upsert them concurrently,
+                        # failed records end up in the ingest report
+                        report = await self.ingest()
+                        print(
+                            f"FAQ Memory initialized with {len(self.records)} records "
+                            f"({report.succeeded} ingested, {report.skipped} unchanged, {len(report.failed)} failed)"
+                        )
+                        
+                        if settings.cosmos_mirror:
+                            # Serve reads locally once the mirror has synced, Cosmos DB until then
+                            self.mirror = CosmosMirror(
+                                self._container(),
+                                record_from_document,
+                                index=FAQVectorIndex(storage=settings.vector_storage),
+                                poll_interval=settings.cosmos_mirror_poll_seconds,
+                                max_staleness_seconds=settings.cosmos_mirror_max_staleness_seconds,
+                            )
+                            self._mirror_task = asyncio.create_task(self.mirror.run())
+                        self._initialized = True
+                    except Exception as e:
+                        print(f"Error initializing FAQ Memory: {str(e)}")
+                        raise
         return self.collection
     
-    async def get_collection(self) -> CosmosNoSqlCollection[str, DataModel]:
+    async def get_collection(self) -> "CosmosNoSqlCollection[str, DataModel]":
         """
         Get the FAQ collection, initializing it if necessary.
         
@@ -209,49 +456,82 @@ class FAQMemory:
             await self.initialize()
         return self.collection
 
-    async def search_faq(self, query: str, category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19) -> List[DataModel]:
+    async def search_faq(self, query: str, category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19, item_type_filter: Optional[str] = None, tags_filter: Optional[List[str]] = None) -> List[DataModel]:
         """
         Search the FAQ collection for relevant answers.
+        Filters and the limit are pushed down into the Cosmos DB query, so only matching
+        documents are scored and at most `limit` of them are returned.
         
         Args:
             query (str): The search query
             category_filter (Optional[str]): Filter by category (e.g., 'coffee', 'general')
             limit (int): Maximum number of results to return
+            score (float): Score threshold of the results
+            item_type_filter (Optional[str]): Filter by item type (e.g., 'question')
+            tags_filter (Optional[List[str]]): Only return records carrying any of these tags
             
         Returns:
-            List[DataModel]: List of matching FAQ records
+            List[DataModel]: List of matching FAQ records, closest first
+        """
+        result = await self.search_faq_scored(query, category_filter, limit, score, item_type_filter, tags_filter)
+        return result.records
+    
+    async def search_faq_scored(self, query: str, category_filter: Optional[str] = None, limit: int = 3, score: float = 0.19, item_type_filter: Optional[str] = None, tags_filter: Optional[List[str]] = None) -> ScoredMatches:
+        """
+        Search the FAQ collection and return the matches with their cosine distances.
+        Results arrive closest first, so reading stops at the first one past the threshold;
+        on a miss best_distance tells how close the closest document was.
+        
+        Args:
+            query (str): The search query
+            category_filter (Optional[str]): Filter by category (e.g., 'coffee', 'general')
+            limit (int): Maximum number of results to return
+            score (float): Cosine distance threshold, only closer records are returned
+            item_type_filter (Optional[str]): Filter by item type (e.g., 'question')
+            tags_filter (Optional[List[str]]): Only return records carrying any of these tags
+            
+        Returns:
+            ScoredMatches: ``(record, distance)`` pairs, closest first, and the best distance
         """
         if not self._initialized:
             await self.initialize()
         
+        if limit <= 0 or (tags_filter is not None and not split_tags(list(tags_filter))):
+            return ScoredMatches([])
+        
+        query_vector = await self._embed_query(query)
+        if self.mirror is not None and self.mirror.is_fresh:
+            return self.mirror.search(query_vector, limit, score, category_filter, item_type_filter, tags_filter)
+        
         # Prepare search options
         options = {
             "vector_property_name": "embedding",  # Use the correct property name
+            "top": limit,
         }
         
-        # Add category filter if specified
-        # if category_filter:
-            # options["filter"] = lambda x: x.category == category_filter
-            # options["filter"] = f"category == '{category_filter}'"
+        # Filter in Cosmos DB instead of discarding results client-side
+        search_filter = build_filter(category_filter, item_type_filter, tags_filter)
+        if search_filter:
+            options["filter"] = search_filter
         
-        # Perform the search
+        # Perform the search with the (possibly cached) query embedding
         search_results = await self.collection.search(
-            values=query,
+            vector=query_vector,
             **options,
         )
 
-        results = []
-        count = 0
-        print(f"Searching for '{query}' with search_results '{search_results}'")
-        async for result in search_results.results:
-            if result.score is not None and result.score >= score:
-                continue
-            if count >= limit:
+        result = ScoredMatches([])
+        logging.info(f"Searching for '{query}' with filter {search_filter}")
+        # The stream holds at most `limit` results, ordered by VectorDistance
+        async for item in search_results.results:
+            distance = to_cosine_distance(item.score) if item.score is not None else 0.0
+            if result.best_distance is None:
+                result.best_distance = distance
+            if distance >= score:
                 break
-            results.append(result.record)
-            count += 1
-            logging.info(f"Found record: {result.record.id} with score: {result.score}")
-        return results
+            result.matches.append((item.record, distance))
+            logging.info(f"Found record: {item.record.id} with distance: {distance}")
+        return result
     
     async def get_answer(self, query: str, category_filter: Optional[str] = None) -> Optional[str]:
         """
@@ -295,17 +575,34 @@ class FAQMemory:
             answer=answer,
             category=category,
             tags=tags_str,
-            embedding=None
         )
+        new_record.content_hash = document_hash(new_record, get_settings().embedding_model)
+        new_record.embedding = (await with_retry(lambda: self.embedder.generate_embeddings([content])))[0].tolist()
 
-        keys = await self.collection.upsert([new_record])
+        keys = await with_retry(lambda: self.collection.upsert([new_record]))
+        if self.mirror is not None:
+            # Read your own write without waiting for the next poll
+            self.mirror.add(new_record, new_record.embedding)
         return keys[0] if keys else new_record.id
     
     async def close(self):
-        """Close and cleanup the collection."""
+        """
+        Close the FAQ memory. The Cosmos DB container is kept, so the next start only
+        ingests what changed; use delete_collection to remove it.
+        """
+        if self._mirror_task is not None:
+            self._mirror_task.cancel()
+            self._mirror_task = None
+        self.mirror = None
+        if self._query_cache is not None:
+            self._query_cache.save()
+        self._initialized = False
+    
+    async def delete_collection(self):
+        """Delete the Cosmos DB container and everything ingested into it."""
         if self.collection and self._initialized:
             await self.collection.ensure_collection_deleted()
-            self._initialized = False
+        await self.close()
 
 
 # Global instance for use in server.py
@@ -326,9 +623,6 @@ async def get_faq_memory() -> FAQMemory:
     return _faq_memory_instance
 
 
-records = load_records_from_json()
-
-
 async def main():
     """
     Main function demonstrating the FAQ Memory usage.
@@ -377,7 +671,7 @@ async def main():
     
     # Cleanup
     print("Cleaning up...")
-    await faq_memory.close()
+    await faq_memory.delete_collection()
     print("Done!")
 
 
@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Deterministic local embedding generator for offline runs and benchmarks.
+# Texts are embedded with signed feature hashing: every word contributes a feature for
+# itself and for each of its character trigrams, hashed into one of `dimensions`
+# buckets with a random sign. Texts sharing words or word fragments get a high cosine
+# similarity, so lexical paraphrases of a question still match it. The same text
+# always gets the same vector, on every machine, with no network call.
+# Select it with FAQ_EMBEDDING_PROVIDER=local.
+
+_WORD = re.compile(r"\w+")
+
+
+class HashEmbedding:
+    """
+    Embedding service with the generate_embeddings interface of AzureTextEmbedding, computed locally.
+    """
+
+    def __init__(self, dimensions: int = 1536, ngram: int = 3, word_weight: float = 1.0, ngram_weight: float = 0.5, seed: int = 0):
+        """
+        Create the embedder.
+
+        Args:
+            dimensions (int): Size of the embedding vectors
+            ngram (int): Length of the character n-grams, 0 disables them
+            word_weight (float): Weight of the whole-word feature
+            ngram_weight (float): Weight of each character n-gram feature
+            seed (int): Seed mixed into the hashes, different seeds give unrelated embeddings
+        """
+        self.dimensions = dimensions
+        self.ngram = ngram
+        self.word_weight = word_weight
+        self.ngram_weight = ngram_weight
+        self.seed = seed
+        self.calls = 0
+        self.texts = 0
+        # word -> (bucket indexes, signed weights)
+        self._features: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _hash(self, feature: str) -> int:
+        digest = hashlib.blake2b(f"{self.seed}:{feature}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def _word_features(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        features = self._features.get(word)
+        if features is None:
+            names = [f"w:{word}"]
+            weights = [self.word_weight]
+            if self.ngram:
+                padded = f"#{word}#"
+                grams = [padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1))]
+                names += [f"c:{gram}" for gram in grams]
+                weights += [self.ngram_weight] * len(grams)
+            hashes = [self._hash(name) for name in names]
+            indexes = np.array([h % self.dimensions for h in hashes], dtype=np.int64)
+            signs = np.array([1.0 if h >> 63 else -1.0 for h in hashes])
+            features = (indexes, signs * np.array(weights))
+            self._features[word] = features
+        return features
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """
+        Embed a single text.
+
+        Args:
+            text (str): The text
+
+        Returns:
+            np.ndarray: Its L2-normalized float32 embedding, all zeros for a text without words
+        """
+        words = _WORD.findall(text.casefold())
+        if not words:
+            return np.zeros(self.dimensions, dtype=np.float32)
+        features = [self._word_features(word) for word in words]
+        vector = np.bincount(
+            np.concatenate([indexes for indexes, _ in features]),
+            weights=np.concatenate([weights for _, weights in features]),
+            minlength=self.dimensions,
+        ).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    async def generate_embeddings(self, texts: List[str], settings: Optional[Any] = None, batch_size: Optional[int] = None, **kwargs: Any) -> np.ndarray:
+        """
+        Embed texts, like AzureTextEmbedding.generate_embeddings.
+
+        Args:
+            texts (List[str]): The texts
+            settings (Optional[Any]): Ignored
+            batch_size (Optional[int]): Ignored, there is no request size limit
+
+        Returns:
+            np.ndarray: One embedding per text
+        """
+        self.calls += 1
+        self.texts += len(texts)
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        return np.stack([self.embed_text(text) for text in texts])
+
+    async def generate_raw_embeddings(self, texts: List[str], settings: Optional[Any] = None, **kwargs: Any) -> List[List[float]]:
+        """Embed texts and return plain lists, like the Semantic Kernel embedding generators."""
+        return (await self.generate_embeddings(texts)).tolist()
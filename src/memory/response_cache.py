@@ -0,0 +1,131 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Bookkeeping of the semantic response cache.
+# Agent answers are written back into the FAQ memory as records whose provenance is
+# SOURCE_CACHE. Only those records are tracked here: curated FAQ records are never
+# tracked, so they can never be expired or evicted. Tracked entries expire after a
+# time-to-live and, once the cache is full, are evicted least-recently-used ("lru")
+# or least-frequently-used ("lfu", ties broken by recency).
+
+# Provenance of FAQ records
+SOURCE_FAQ = "faq"
+SOURCE_CACHE = "cache"
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+class ResponseCache:
+    """
+    Tracks the cached responses stored in the FAQ memory and decides which ones to drop.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: Optional[float] = 900, policy: str = "lru"):
+        """
+        Create the bookkeeping.
+
+        Args:
+            max_size (int): Maximum number of cached responses, 0 disables the cache
+            ttl_seconds (Optional[float]): Seconds a cached response stays valid, None to never expire
+            policy (str): Eviction policy once full, "lru" or "lfu"
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {list(EVICTION_POLICIES)}")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.policy = policy
+        self.hits = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expirations = 0
+        # record id -> [wall-clock time stored, hit count], in recency order
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._entries
+
+    def track(self, record_id: str) -> List[str]:
+        """
+        Start tracking a newly cached response.
+
+        Args:
+            record_id (str): Id of the cached FAQ record
+
+        Returns:
+            List[str]: Ids of the expired or evicted records to remove from the FAQ memory
+        """
+        self._entries[record_id] = [time.time(), 0]
+        self._entries.move_to_end(record_id)
+        self.writes += 1
+        dropped = self.expired()
+        while len(self._entries) > self.max_size:
+            victim = self._victim(record_id)
+            del self._entries[victim]
+            self.evictions += 1
+            dropped.append(victim)
+        return dropped
+
+    def touch(self, record_id: str) -> bool:
+        """
+        Record a hit on a cached response.
+
+        Args:
+            record_id (str): Id of the cached FAQ record that answered a query
+
+        Returns:
+            bool: False when the response has expired or was already dropped, it must not be served
+        """
+        entry = self._entries.get(record_id)
+        if entry is None:
+            return False
+        if self._expired(entry[0]):
+            del self._entries[record_id]
+            self.expirations += 1
+            return False
+        entry[1] += 1
+        self._entries.move_to_end(record_id)
+        self.hits += 1
+        return True
+
+    def expired(self) -> List[str]:
+        """Stop tracking and return the ids of all expired responses."""
+        if self.ttl_seconds is None:
+            return []
+        # Entries are stored in recency order, not age order, so scan them all
+        expired = [record_id for record_id, (stored, _) in self._entries.items() if self._expired(stored)]
+        for record_id in expired:
+            del self._entries[record_id]
+        self.expirations += len(expired)
+        return expired
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "policy": self.policy,
+            "hits": self.hits,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _victim(self, newest: str) -> str:
+        if self.policy == "lfu" and len(self._entries) > 1:
+            # The newest entry has no hits yet, never evict it first. min() keeps the
+            # first of equal counts, i.e. the least recently used
+            candidates = (record_id for record_id in self._entries if record_id != newest)
+            return min(candidates, key=lambda record_id: self._entries[record_id][1])
+        return next(iter(self._entries))
+
+    def _expired(self, stored: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored > self.ttl_seconds
@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+# Configuration of the FAQ memory modules.
+# Nothing is read at import time: the .env file and the environment are only
+# consulted on the first call to get_settings(), and the result is cached.
+
+
+@dataclass(frozen=True)
+class FAQMemorySettings:
+    # Azure OpenAI embeddings
+    azure_openai_endpoint: Optional[str] = None
+    azure_openai_api_key: Optional[str] = None
+    embedding_deployment: Optional[str] = None
+    # "azure" for Azure OpenAI, "local" for the deterministic offline HashEmbedding
+    embedding_provider: str = "azure"
+    # Micro-batching of concurrent embedding requests, off by default (a window of 0). Each lookup
+    # waits up to the window, so it only pays off when the number of embedding calls is the limit,
+    # e.g. an Azure OpenAI deployment throttling requests (429) under many concurrent searches
+    embedding_coalesce_window_ms: float = 0.0
+    embedding_coalesce_max_batch: int = 64
+    # Query embedding cache
+    query_cache_size: int = 4096
+    query_cache_ttl_seconds: float = 3600
+    query_cache_path: Optional[str] = None
+    # FAQ index, "exact" scans every record, "ivf" uses the approximate IVF-flat index
+    index_kind: str = "exact"
+    ivf_nlist: int = 256
+    ivf_nprobe: int = 8
+    # Vector storage of the index: float32, float16 or int8, and the full-precision re-ranking factor.
+    # float16 and int8 trade search latency for memory, float16 being the slowest to score
+    vector_storage: str = "float32"
+    rerank: int = 0
+    # Semantic response cache of agent answers, opt-in (0 disables it); policy is "lru" or "lfu".
+    # A cached answer is served to every user asking a similar question until it expires, so
+    # only enable it when agent answers do not depend on live data
+    response_cache_size: int = 0
+    response_cache_ttl_seconds: float = 900
+    response_cache_policy: str = "lru"
+    # Cosmos DB config for Caching
+    cosmosdb_nosql_url: Optional[str] = None
+    cosmosdb_nosql_database_name: Optional[str] = None
+    cosmosdb_nosql_key: Optional[str] = None
+    # Bulk ingest into Cosmos DB: calls in flight per stage, and the failure report (next to the FAQ JSON by default)
+    cosmos_ingest_concurrency: int = 8
+    cosmos_ingest_report_path: Optional[str] = None
+    # Local mirror of the Cosmos DB container serving reads, polled every few seconds
+    cosmos_mirror: bool = False
+    cosmos_mirror_poll_seconds: float = 5.0
+    cosmos_mirror_max_staleness_seconds: float = 60.0
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        """Identifies where stored embeddings come from, so vectors of another model are never reused."""
+        return "local-hash" if self.embedding_provider == "local" else self.embedding_deployment
+
+    @classmethod
+    def from_env(cls) -> "FAQMemorySettings":
+        """Read the settings from environment variables."""
+        return cls(
+            azure_openai_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            azure_openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            embedding_deployment=os.getenv("EMBEDDING_DEPLOYMENT_NAME"),
+            embedding_provider=os.getenv("FAQ_EMBEDDING_PROVIDER", "azure"),
+            embedding_coalesce_window_ms=float(os.getenv("FAQ_EMBEDDING_COALESCE_WINDOW_MS", "0")),
+            embedding_coalesce_max_batch=int(os.getenv("FAQ_EMBEDDING_COALESCE_MAX_BATCH", "64")),
+            query_cache_size=int(os.getenv("FAQ_QUERY_CACHE_SIZE", "4096")),
+            query_cache_ttl_seconds=float(os.getenv("FAQ_QUERY_CACHE_TTL_SECONDS", "3600")),
+            query_cache_path=os.getenv("FAQ_QUERY_CACHE_PATH"),
+            index_kind=os.getenv("FAQ_INDEX_KIND", "exact"),
+            ivf_nlist=int(os.getenv("FAQ_IVF_NLIST", "256")),
+            ivf_nprobe=int(os.getenv("FAQ_IVF_NPROBE", "8")),
+            vector_storage=os.getenv("FAQ_VECTOR_STORAGE", "float32"),
+            rerank=int(os.getenv("FAQ_RERANK", "0")),
+            response_cache_size=int(os.getenv("FAQ_RESPONSE_CACHE_SIZE", "0")),
+            response_cache_ttl_seconds=float(os.getenv("FAQ_RESPONSE_CACHE_TTL_SECONDS", "900")),
+            response_cache_policy=os.getenv("FAQ_RESPONSE_CACHE_POLICY", "lru"),
+            cosmosdb_nosql_url=os.getenv("AZURE_COSMOS_DB_NO_SQL_URL"),
+            cosmosdb_nosql_database_name=os.getenv("AZURE_COSMOS_DB_NO_SQL_DATABASE_NAME"),
+            cosmosdb_nosql_key=os.getenv("AZURE_COSMOS_DB_NO_SQL_KEY"),
+            cosmos_ingest_concurrency=int(os.getenv("COSMOS_INGEST_CONCURRENCY", "8")),
+            cosmos_ingest_report_path=os.getenv("COSMOS_INGEST_REPORT_PATH"),
+            cosmos_mirror=os.getenv("COSMOS_MIRROR", "false").lower() in ("1", "true", "yes"),
+            cosmos_mirror_poll_seconds=float(os.getenv("COSMOS_MIRROR_POLL_SECONDS", "5")),
+            cosmos_mirror_max_staleness_seconds=float(os.getenv("COSMOS_MIRROR_MAX_STALENESS_SECONDS", "60")),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> FAQMemorySettings:
+    """
+    Load the .env file and return the FAQ memory settings, once per process.
+
+    Returns:
+        FAQMemorySettings: The cached settings
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()  # Load environment variables from .env file
+    return FAQMemorySettings.from_env()
+
+
+def create_embedder(settings: Optional[FAQMemorySettings] = None):
+    """
+    Create the embedding service: Azure OpenAI, or the local HashEmbedding when
+    FAQ_EMBEDDING_PROVIDER is "local", wrapped in an EmbeddingCoalescer unless its
+    window is 0.
+    The Semantic Kernel OpenAI connector is imported here so importing the memory modules stays cheap.
+
+    Args:
+        settings (Optional[FAQMemorySettings]): Settings to use, the cached settings by default
+
+    Returns:
+        AzureTextEmbedding: The embedding service
+    """
+    settings = settings or get_settings()
+    if settings.embedding_provider == "local":
+        from memory.local_embedding import HashEmbedding
+
+        embedder = HashEmbedding()
+    else:
+        from semantic_kernel.connectors.ai.open_ai import AzureTextEmbedding
+
+        embedder = AzureTextEmbedding(
+            api_key=settings.azure_openai_api_key,
+            deployment_name=settings.embedding_deployment,
+            endpoint=settings.azure_openai_endpoint,
+            service_id="azure_embedding"
+        )
+
+    if settings.embedding_coalesce_window_ms > 0:
+        from memory.embedding_coalescer import EmbeddingCoalescer
+
+        return EmbeddingCoalescer(
+            embedder,
+            window_ms=settings.embedding_coalesce_window_ms,
+            max_batch_size=settings.embedding_coalesce_max_batch,
+        )
+    return embedder
@@ -2,12 +2,12 @@ import sys
 import os
 import logging
 import asyncio
-from fastapi import FastAPI, HTTPException
-from azure.identity.aio import DefaultAzureCredential
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
-from azure.ai.agents.models import AzureAISearchTool, CodeInterpreterTool
-from azure.ai.projects.models import ConnectionType
+from azure.ai.agents.models import CodeInterpreterTool
 from semantic_kernel.agents import AgentGroupChat, AzureAIAgent, AzureAIAgentThread, AzureAIAgentSettings
 from semantic_kernel.agents.strategies import TerminationStrategy
 from semantic_kernel.contents.chat_history import ChatHistory
@@ -18,13 +18,36 @@ from semantic_kernel.connectors.mcp import MCPStreamableHttpPlugin
 from pydantic import BaseModel
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from memory.faq_memory import FAQMemory
+from agent_runtime.azure_clients import get_project_client, AzureClients
+from agent_runtime.agent_registry import get_agent_registry, AgentProfile, AgentRegistry
+from agent_runtime.search_tools import get_search_tools, SearchToolCache
+from agent_runtime.mcp_pool import get_mcp_pool, MCPSessionPool
 from semantic_kernel.functions import kernel_function
 
 logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the FAQ memory, create the shared Azure credential and project client and connect
+    the MCP session pool at startup, so requests do not pay for loading the FAQ, token
+    acquisition, connection setup or MCP handshakes.
+    """
+    warm_up = faq_memory.warm_up()
+    app.state.azure_clients = await AzureClients().start()
+    app.state.mcp_pool = MCPSessionPool().start()
+    yield
+    if not warm_up.done():
+        warm_up.cancel()
+    await app.state.mcp_pool.close()
+    await app.state.azure_clients.close()
+    await faq_memory.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 class ChatRequest(BaseModel):
     user_input: str
@@ -35,9 +58,6 @@ class ChatRequest(BaseModel):
 RAG_AGENT_NAME = "Coffee-Knowledge-Expert"
 MCP_AGENT_NAME = "Systemadmin-Expert"
 
-# Azure AI Search index name
-AZURE_AI_SEARCH_INDEX_NAME = os.getenv("AZURE_SEARCH_INDEX")
-
 # FAQ memory instance
 faq_memory = FAQMemory()
 
@@ -48,9 +68,12 @@ faq_memory = FAQMemory()
 async def get_faq_memory(query: str = None, category: str = None, limit: int = 1, score: float = 0.21):
     """Get the FAQ memory instance."""
     if query is not None:
-        results = await faq_memory.search_faq(query, category, limit, score)
-        if results is None or len(results) == 0:
+        result = await faq_memory.search_faq_scored(query, category, limit, score)
+        if not result.matches:
+            if result.best_distance is not None:
+                logging.info(f"No FAQ match for '{query}', closest distance {result.best_distance:.3f} (threshold {score})")
             return None
+        results = result.records
     else:
         results = None
     return results
@@ -77,31 +100,11 @@ class ConsensusTerminationStrategy(TerminationStrategy):
             
         return False
 
-class AgentFactory:
-    """Factory for creating different types of agents."""
-    
-    def __init__(self, client):
-        self.client = client
-        
-    async def create_rag_agent(self) -> AzureAIAgent:
-        """Create a RAG agent with Azure AI Search capabilities."""
-        ai_search_conn_id = ""
-        async for connection in self.client.connections.list():
-            if connection.type == ConnectionType.AZURE_AI_SEARCH:
-                ai_search_conn_id = connection.id
-                logging.info(f"Found Azure AI Search connection: {connection.id}")
-                break
-        
-        if not ai_search_conn_id:
-            raise HTTPException(status_code=500, detail="Azure AI Search connection not found")
-        
-        ai_search = AzureAISearchTool(index_connection_id=ai_search_conn_id, index_name=AZURE_AI_SEARCH_INDEX_NAME)
-        
-        agent_def = await self.client.agents.create_agent(
-            model=os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME"),
-            name=RAG_AGENT_NAME,
-            description="A knowledge expert, and Starbucks coffee enthusiast, that can search through documents to find information.",
-            instructions="""You are a knowledge expert who can search through memories, documents and knowledge bases to find information.
+# Agent profiles, each one is created once and shared by all group chats
+RAG_AGENT_PROFILE = AgentProfile(
+    name=RAG_AGENT_NAME,
+    description="A knowledge expert, and Starbucks coffee enthusiast, that can search through documents to find information.",
+    instructions="""You are a knowledge expert who can search through memories, documents and knowledge bases to find information.
             
             When asked a question:
             1. Starbucks related questions should be answered using the FAQ memory
@@ -110,27 +113,11 @@ class AgentFactory:
             4. When you're confident in your final answer, begin your response with "FINAL ANSWER:" 
             5. Collaborate with the System Expert to provide the most comprehensive answer
             """,
-            temperature=0.1,
-            top_p=0.1,                            
-        )
-        
-        return AzureAIAgent(
-            client=self.client,
-            definition=agent_def,
-            tools=ai_search.definitions,
-            tool_resources=ai_search.resources,
-            headers={"x-ms-enable-preview": "true"},
-        )
-        
-    async def create_mcp_agent(self, plugins: List[MCPStreamableHttpPlugin]) -> AzureAIAgent:
-        """Create an MCP Plugin agent with system capabilities."""
-        code_interpreter = CodeInterpreterTool()
-        
-        agent_def = await self.client.agents.create_agent(
-            model=os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME"),
-            name=MCP_AGENT_NAME,
-            description="A system expert who can access system information and perform system operations.",
-            instructions="""You are a system expert who can retrieve weather information, system time, and monitor system operations.
+)
+MCP_AGENT_PROFILE = AgentProfile(
+    name=MCP_AGENT_NAME,
+    description="A system expert who can access system information and perform system operations.",
+    instructions="""You are a system expert who can retrieve weather information, system time, and monitor system operations.
             
             When asked a question:
             1. If it relates to weather, use the Weather plugin to get current weather information
@@ -140,28 +127,79 @@ class AgentFactory:
             5. When you're confident in your final answer, begin your response with "FINAL ANSWER:"
             6. Collaborate with the Knowledge Expert to provide the most comprehensive answer
             """,
-            temperature=0.1,
-            top_p=0.1,                            
+)
+
+class AgentFactory:
+    """Factory for the different types of agents, backed by the process-wide agent registry."""
+    
+    def __init__(self, client, registry: AgentRegistry, search_tools: SearchToolCache):
+        self.client = client
+        self.registry = registry
+        self.search_tools = search_tools
+        
+    async def create_rag_agent(self) -> AzureAIAgent:
+        """Get the RAG agent with Azure AI Search capabilities."""
+        # The AI Search connection is looked up once and cached, not on every request
+        ai_search = await self.search_tools.tool()
+        
+        return await self.registry.agent(
+            RAG_AGENT_PROFILE,
+            tools=ai_search.definitions,
+            tool_resources=ai_search.resources,
+            headers={"x-ms-enable-preview": "true"},
         )
         
-        return AzureAIAgent(
-            client=self.client,
-            definition=agent_def,
+    async def create_mcp_agent(self, plugins: List[MCPStreamableHttpPlugin]) -> AzureAIAgent:
+        """Get the MCP Plugin agent with system capabilities."""
+        code_interpreter = CodeInterpreterTool()
+        
+        return await self.registry.agent(
+            MCP_AGENT_PROFILE,
             plugins=plugins,
             tools=code_interpreter.definitions,
             tool_resources=code_interpreter.resources
         )
 
+@app.get("/health")
+async def health(request: Request):
+    """
+    Readiness check, returns 503 until the FAQ memory is initialized.
+    """
+    faq = faq_memory.health()
+    registry = getattr(request.app.state, "agent_registry", None)
+    search_tools = getattr(request.app.state, "search_tools", None)
+    return JSONResponse(
+        status_code=200 if faq["ready"] else 503,
+        content={
+            "status": "ready" if faq["ready"] else "starting",
+            "faq_memory": faq,
+            "azure_clients": request.app.state.azure_clients.health(),
+            "agent_registry": registry.stats() if registry is not None else None,
+            "search_tools": search_tools.stats() if search_tools is not None else None,
+            "mcp": request.app.state.mcp_pool.health(),
+        },
+    )
+
+
+@app.post("/faq/reload")
+async def reload_faq_memory():
+    """
+    Reload the FAQ JSON file into the FAQ memory.
+    Only new or changed items are embedded; searches keep running on the previous index until the new one is ready.
+    """
+    logging.info("Reloading FAQ memory")
+    return await faq_memory.reload()
+
+
 @app.post("/reset_threads")
-async def reset_threads(thread_id: Optional[str] = None):
+async def reset_threads(thread_id: Optional[str] = None, client=Depends(get_project_client)):
     """Reset agent threads."""
-    async with DefaultAzureCredential() as creds, AzureAIAgent.create_client(credential=creds) as client:
-        if thread_id:
-            try:
-                await client.agents.threads.delete(thread_id=thread_id)
-                logging.info(f"Deleted thread {thread_id}")
-            except Exception as e:
-                logging.error(f"Error deleting thread {thread_id}: {str(e)}")
+    if thread_id:
+        try:
+            await client.agents.threads.delete(thread_id=thread_id)
+            logging.info(f"Deleted thread {thread_id}")
+        except Exception as e:
+            logging.error(f"Error deleting thread {thread_id}: {str(e)}")
     
     return {
         "message": "Reset completed successfully",
@@ -169,7 +207,7 @@ async def reset_threads(thread_id: Optional[str] = None):
     }
 
 @app.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """Handle chat requests using a collaborative agent approach."""
     user_input = request.user_input
     thread_id = request.thread_id
@@ -186,76 +224,71 @@ async def chat(request: ChatRequest):
             "thread_id": thread_id
         }
     
-    async with (
-        DefaultAzureCredential() as creds,
-        AzureAIAgent.create_client(credential=creds) as client,
-        MCPStreamableHttpPlugin(
-            name="Weather",
-            description="Get current weather information",
-            url="http://localhost:8086/mcp"
-        ) as weather_plugin,
-        MCPStreamableHttpPlugin(
-            name="GetSystemLocalTime",
-            description="System local time plugin for retrieving current system time",
-            url="http://localhost:8087/mcp"
-        ) as time_plugin,
-        MCPStreamableHttpPlugin(
-            name="SystemLogRepository",
-            description="System log repository for monitoring and debugging",
-            url="http://localhost:8089/mcp"
-        ) as syslog_plugin,
-    ):
-        try:
-            # Create agents
-            agent_factory = AgentFactory(client)
-            rag_agent = await agent_factory.create_rag_agent()
-            mcp_agent = await agent_factory.create_mcp_agent([weather_plugin, time_plugin, syslog_plugin])
-            
-            # Set up the group chat
-            group_chat = AgentGroupChat(
-                agents=[rag_agent, mcp_agent],
-                termination_strategy=ConsensusTerminationStrategy(agents=[rag_agent, mcp_agent], maximum_iterations=5)
-            )
-            
-            # Start the conversation
-            await group_chat.add_chat_message(message=user_input)
-            
-            # Collect all messages from the group chat
-            responses = []
-            async for content in group_chat.invoke():
-                responses.append({
-                    "role": content.role,
-                    "name": content.name,
-                    "content": content.content
-                })
-                logging.info(f"Agent response - {content.name}: {content.content}")
-            
-            # Extract the final answer
-            final_answer = None
-            for response in reversed(responses):
-                if "FINAL ANSWER:" in response["content"]:
-                    final_answer = response["content"].replace("FINAL ANSWER:", "").strip()
-                    break
-            
-            if not final_answer and responses:
-                # If no final answer was explicitly marked, use the last response
-                final_answer = responses[-1]["content"]
-            
-            # Cleanup resources
-            await group_chat.reset()
-            
-            # Return the thread_id from the group chat for future reference
-            chat_thread_id = thread_id  # In this implementation we don't use thread_id
-            
-            return {
-                "response": final_answer,
-                "thread_id": chat_thread_id,
-                "full_conversation": responses
-            }
-            
-        except Exception as e:
-            logging.error(f"Error in group chat: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    # All Azure and MCP setup happens after the FAQ lookup, so cache hits never wait for it
+    # The Azure AI Project Client is created once in the lifespan and shared by all requests
+    client = get_project_client(http_request)
+    agent_registry = get_agent_registry(http_request, client)
+    search_tools = get_search_tools(http_request, client)
+    # Borrow the MCP plugins, connected once at startup
+    mcp_plugins = await get_mcp_pool(http_request).plugins()
+    try:
+        # Create agents
+        agent_factory = AgentFactory(client, agent_registry, search_tools)
+        rag_agent = await agent_factory.create_rag_agent()
+        mcp_agent = await agent_factory.create_mcp_agent(mcp_plugins)
+        
+        # Set up the group chat
+        group_chat = AgentGroupChat(
+            agents=[rag_agent, mcp_agent],
+            termination_strategy=ConsensusTerminationStrategy(agents=[rag_agent, mcp_agent], maximum_iterations=5)
+        )
+        
+        # Start the conversation
+        await group_chat.add_chat_message(message=user_input)
+        
+        # Collect all messages from the group chat
+        responses = []
+        async for content in group_chat.invoke():
+            responses.append({
+                "role": content.role,
+                "name": content.name,
+                "content": content.content
+            })
+            logging.info(f"Agent response - {content.name}: {content.content}")
+        
+        # Extract the final answer
+        final_answer = None
+        for response in reversed(responses):
+            if "FINAL ANSWER:" in response["content"]:
+                final_answer = response["content"].replace("FINAL ANSWER:", "").strip()
+                break
+        
+        if not final_answer and responses:
+            # If no final answer was explicitly marked, use the last response
+            final_answer = responses[-1]["content"]
+        
+        # Cleanup resources
+        await group_chat.reset()
+        
+        # Cache the answer in the FAQ memory, repeat questions skip the group chat.
+        # Answers the MCP agent took part in come from live tools (weather, time, logs) and are not cached
+        if final_answer and not any(response["name"] == MCP_AGENT_NAME for response in responses):
+            faq_memory.write_back(user_input, final_answer)
+        
+        # Return the thread_id from the group chat for future reference
+        chat_thread_id = thread_id  # In this implementation we don't use thread_id
+        
+        return {
+            "response": final_answer,
+            "thread_id": chat_thread_id,
+            "full_conversation": responses
+        }
+        
+    except Exception as e:
+        logging.error(f"Error in group chat: {str(e)}")
+        # The search connection may have changed, look it up again on the next request
+        search_tools.invalidate()
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 if __name__ == "__main__":
     import uvicorn